@@ -3,14 +3,93 @@
 Serveur d'agents IA.
 Ce script expose une interface pour interagir avec les agents via des commandes en ligne de commande.
 Il peut être appelé par le serveur Node.js pour traiter les messages des utilisateurs.
+
+Trois modes d'exécution sont disponibles :
+- mode commande (par défaut) : un message par processus via ``--message`` ;
+- mode démon (``--serve``) : un processus long qui garde les agents et leurs
+  bases de connaissances en mémoire et répond à des requêtes JSON (une par ligne)
+  sur un socket Unix (``--socket``) ou TCP (``--host``/``--port``) ;
+- mode lot (``--batch FICHIER``, ou ``-`` pour l'entrée standard) : traite un
+  fichier JSONL de requêtes dans un seul processus et écrit un résultat JSON
+  par ligne (sur la sortie standard ou dans ``--output``).
+
+Types d'agents : le champ "type" d'une configuration (ou ``agent_type``) et les
+noms de son champ "knowledge_bases" sont résolus par le registre des plugins
+(config/plugins.json, manifestes de JAMONO_PLUGINS et points d'entrée, voir
+models/plugins.py) ; seul le module d'un type effectivement utilisé est importé.
+``--list-plugins`` affiche les déclarations.
+
+Chaque requête des modes démon et lot a la forme
+``{"agent_type": ..., "agent_name": ..., "config": {...}, "message": ...}``
+et reçoit la même enveloppe que le mode commande : ``{"response": ...}`` ou
+``{"error": ...}``. Si la requête contient un champ ``id``, il est recopié
+dans la réponse. En mode démon, une ligne de requête est limitée à
+MAX_REQUEST_BYTES : au-delà, elle reçoit une erreur et la connexion reste
+ouverte. Une requête ``{"op": "evict", "agent_type": ..., "agent_name": ...,
+"config": {...}}`` retire l'agent correspondant du registre partagé.
+
+Conversations : une requête peut porter un champ ``conversation_id`` (par
+exemple l'identifiant du canal). L'agent garde alors, pour cette conversation,
+un contexte compressé (résumé des anciens échanges et derniers tours, voir
+models/conversation.py) mis à jour à chaque message, au lieu de retraiter
+l'historique complet à chaque tour.
+
+Pool de processus : avec ``--serve --workers N``, les messages sont traités par
+N processus préchauffés (un par cœur) au lieu de threads du processus principal
+limités par le GIL ; file d'attente bornée (``--queue-size``), délai maximal par
+requête (``--worker-timeout``, ou champ ``timeout`` de la requête) et
+remplacement automatique d'un processus arrêté. La requête ``{"op": "pool"}``
+retourne l'état du pool (voir worker_pool.py). Les index des bases de
+connaissances intégrées sont publiés une fois dans un répertoire partagé
+(``--shared-index``, répertoire temporaire par défaut) et projetés en mémoire
+par tous les processus ; une nouvelle version publiée dans ce répertoire
+(``python -m knowledge_base.shared_index publish``) est prise en compte sans
+redémarrage.
+
+Streaming : avec ``--stream`` (mode commande), ou ``"stream": true`` dans une
+requête du mode démon, la réponse est écrite au fur et à mesure de sa génération
+en JSON délimité par des sauts de ligne : ``{"delta": "..."}`` pour chaque
+morceau, puis ``{"done": true}`` (ou ``{"error": ...}`` en cas d'échec). Le
+client peut ainsi afficher le début de la réponse avant la fin de la génération.
+
+Mesures : avec ``--metrics`` (mode commande) ou ``"metrics": true`` dans une
+requête, la réponse (ou l'objet ``{"done": true}`` en streaming) contient un
+champ ``metrics`` : durée totale et de chaque étape (conversation, keywords,
+search, context, generation), délai avant le premier morceau, nombre de
+mots-clés, de passages trouvés et retenus, taille du contexte en octets. Les
+modes démon et lot agrègent les mesures de tous les messages en histogrammes
+au format texte de Prometheus : ``GET /metrics`` sur ``--metrics-port`` ou
+requête ``{"op": "metrics"}`` en mode démon, fichier ``--metrics-file`` à la fin
+du mode lot. Sans mesures demandées (mode commande par défaut), l'agent ne lit
+pas l'horloge.
+
+Journalisation : les journaux sont écrits par un thread d'arrière-plan, sur la
+sortie d'erreur (ou ``--log-file``), jamais sur la sortie standard qui porte les
+réponses ; voir models/logs.py pour les options ``--log-level``,
+``--log-format`` et ``--log-sample``.
+
+Démarrage à froid : le mode commande n'importe que le nécessaire (asyncio, le
+registre d'agents et les bases de connaissances sont chargés à la demande ; la
+base DevOps est importée et indexée à la première recherche). L'option
+``--startup-report`` écrit sur la sortie d'erreur la durée de chaque phase
+(imports, arguments, configuration, agent, import de la base, construction de
+l'index, message) ; ``--startup-budget MS`` termine avec le code 3 si le total
+dépasse le budget, pour détecter les régressions. Le budget de référence du mode
+commande est STARTUP_BUDGET_MS : 100 ms mesurés dans le processus, hors démarrage
+de l'interpréteur (60 à 80 ms observés après le passage au chargement différé,
+pour un temps total par message passé d'environ 160 ms à 100 ms).
 """
 
+import time
+
+# Début du chargement du script, pour le rapport de démarrage
+_process_started = time.perf_counter()
+
 import sys
 import json
 import argparse
-import importlib.util
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 
 # Import des modules d'agents
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,11 +97,22 @@ sys.path.append(current_dir)
 
 try:
     from models.agent import create_agent, Agent
-    from knowledge_base import devops_knowledge_base
+    from models.metrics import MetricsRegistry, RequestMetrics
+    from models.plugins import get_plugin_registry
+    from models.logs import configure_logging
+    from knowledge_base.lazy import LazyKnowledgeBase
+    from knowledge_base.loader import load_knowledge_base
 except ImportError as e:
     print(f"Erreur d'importation: {e}", file=sys.stderr)
     sys.exit(1)
 
+# Budget de démarrage de référence du mode commande, en millisecondes
+STARTUP_BUDGET_MS = 100
+
+# Taille maximale d'une ligne de requête du mode démon (le bloc "Contexte récent
+# du canal" dépasse souvent la limite de 64 Kio d'asyncio)
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
 def load_agent_from_config(config_path: str) -> Agent:
     """
     Charge un agent à partir d'un fichier de configuration JSON.
@@ -40,20 +130,16 @@ def load_agent_from_config(config_path: str) -> Agent:
         agent_type = config.get("type", "devops")
         name = config.get("name", "Generic Agent")
         
-        agent = create_agent(agent_type, name, config)
-        
-        # Charger les bases de connaissances configurées
-        if agent_type.lower() == "devops":
-            agent.add_knowledge_base(devops_knowledge_base)
-        
-        return agent
+        return load_agent(agent_type, name, config)
     except Exception as e:
         print(f"Erreur lors du chargement de la configuration de l'agent: {str(e)}", file=sys.stderr)
         raise
 
 def load_agent(agent_type: str, name: str, config: Dict[str, Any]) -> Agent:
     """
-    Charge un agent avec sa base de connaissances.
+    Charge un agent avec les bases de connaissances listées dans le champ
+    "knowledge_bases" de sa configuration. Sans ce champ, l'agent reçoit les
+    bases de connaissances déclarées pour son type (voir models.plugins).
     
     Args:
         agent_type (str): Type d'agent à charger
@@ -64,37 +150,732 @@ def load_agent(agent_type: str, name: str, config: Dict[str, Any]) -> Agent:
         Agent: Instance de l'agent chargé
     """
     agent = create_agent(agent_type, name, config)
+    plugins = get_plugin_registry()
     
-    # Charger la base de connaissances appropriée
-    if agent_type.lower() == "devops":
-        agent.add_knowledge_base(devops_knowledge_base)
+    # Charger les bases de connaissances configurées, par nom
+    knowledge_bases = config.get("knowledge_bases")
+    if knowledge_bases is None:
+        knowledge_bases = plugins.default_knowledge_bases(agent_type)
+    for kb_name in knowledge_bases:
+        agent.add_knowledge_base(load_knowledge_base(kb_name, module_name=plugins.knowledge_base_module(kb_name)))
     
     return agent
 
-def process_message(agent: Agent, message: str) -> str:
+def process_message(agent: Agent, message: str, conversation_id: Optional[str] = None,
+                    metrics: Optional[RequestMetrics] = None) -> str:
     """
     Traite un message avec l'agent spécifié.
     
     Args:
         agent (Agent): Agent à utiliser pour traiter le message
         message (str): Message à traiter
+        conversation_id (Optional[str]): Conversation à laquelle appartient le message
+        metrics (Optional[RequestMetrics]): Mesures à compléter (aucune mesure si None)
         
     Returns:
         str: Réponse de l'agent
     """
-    return agent.process_message(message)
+    return agent.process_message(message, conversation_id, metrics)
+
+def process_message_stream(agent: Agent, message: str, conversation_id: Optional[str] = None,
+                           metrics: Optional[RequestMetrics] = None) -> Iterator[str]:
+    """
+    Traite un message avec l'agent spécifié et produit la réponse par morceaux.
+    
+    Args:
+        agent (Agent): Agent à utiliser pour traiter le message
+        message (str): Message à traiter
+        conversation_id (Optional[str]): Conversation à laquelle appartient le message
+        metrics (Optional[RequestMetrics]): Mesures à compléter (aucune mesure si None)
+        
+    Yields:
+        str: Morceaux successifs de la réponse
+    """
+    return agent.process_message_stream(message, conversation_id, metrics)
+
+# Pool de processus de travail du mode démon (--workers), None sinon
+_worker_pool = None
+
+# Agrégation des mesures des modes démon et lot (None en mode commande)
+_metrics_registry: Optional[MetricsRegistry] = None
+
+def enable_metrics_registry() -> MetricsRegistry:
+    """
+    Active l'agrégation des mesures de tous les messages traités par le processus.
+    
+    Returns:
+        MetricsRegistry: Registre des mesures
+    """
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry()
+    return _metrics_registry
+
+def _request_metrics(request: Dict[str, Any]) -> Optional[RequestMetrics]:
+    """Crée les mesures d'une requête si elles sont demandées ou agrégées."""
+    if request.get("metrics") or _metrics_registry is not None:
+        return RequestMetrics()
+    return None
+
+def _record_metrics(agent: Agent, metrics: Optional[RequestMetrics], failed: bool = False) -> None:
+    """Ajoute les mesures d'un message traité au registre, s'il est actif."""
+    if _metrics_registry is None or metrics is None:
+        return
+    if failed:
+        _metrics_registry.record_error()
+    else:
+        _metrics_registry.observe(agent.name, metrics)
+
+# Agents déjà initialisés, partagés entre les requêtes des modes démon et lot
+_agent_registry = None
+_max_agents = 32
+
+def get_agent_registry():
+    """
+    Retourne le registre d'agents partagé, créé au premier appel.
+    
+    Returns:
+        AgentRegistry: Registre des agents initialisés
+    """
+    global _agent_registry
+    if _agent_registry is None:
+        from models.registry import AgentRegistry
+        _agent_registry = AgentRegistry(load_agent, max_instances=_max_agents)
+    return _agent_registry
+
+# Configurations des agents par défaut, lues une seule fois
+_default_configs: Dict[str, Dict[str, Any]] = {}
+
+def _load_default_config(default_agent: str) -> Dict[str, Any]:
+    """
+    Retourne la configuration de l'agent par défaut, lue depuis config/<nom>_config.json.
+    
+    Args:
+        default_agent (str): Nom de l'agent par défaut
+        
+    Returns:
+        Dict[str, Any]: Configuration de l'agent
+    """
+    default_agent = default_agent.lower()
+    config = _default_configs.get(default_agent)
+    if config is None:
+        config_path = os.path.join(current_dir, "config", f"{default_agent}_config.json")
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        _default_configs[default_agent] = config
+    return config
+
+def get_agent(agent_type: Optional[str], name: Optional[str], config: Dict[str, Any],
+              default_agent: str = "nox") -> Agent:
+    """
+    Retourne un agent initialisé depuis le registre, en le créant seulement s'il
+    n'existe pas déjà pour ce type, ce nom et cette configuration.
+    
+    Args:
+        agent_type (Optional[str]): Type d'agent, ou None pour l'agent par défaut
+        name (Optional[str]): Nom de l'agent
+        config (Dict[str, Any]): Configuration de l'agent
+        default_agent (str): Agent par défaut à utiliser si aucun type n'est fourni
+        
+    Returns:
+        Agent: Instance de l'agent, partagée entre les requêtes
+    """
+    return get_agent_registry().get(*_resolve_agent(agent_type, name, config, default_agent))
+
+def _resolve_agent(agent_type: Optional[str], name: Optional[str], config: Dict[str, Any],
+                   default_agent: str) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Résout le type, le nom et la configuration d'un agent demandé : sans type,
+    ceux de l'agent par défaut. Les créations et les évictions du registre
+    utilisent ainsi la même empreinte.
+    
+    Args:
+        agent_type (Optional[str]): Type d'agent, ou None pour l'agent par défaut
+        name (Optional[str]): Nom de l'agent
+        config (Dict[str, Any]): Configuration de l'agent
+        default_agent (str): Agent par défaut à utiliser si aucun type n'est fourni
+        
+    Returns:
+        Tuple[str, str, Dict[str, Any]]: Type, nom et configuration
+    """
+    if not agent_type:
+        config = _load_default_config(default_agent)
+        agent_type = config.get("type", "devops")
+        name = config.get("name", "Generic Agent")
+    return agent_type, name or "Agent", config
+
+def handle_request(request: Dict[str, Any], default_agent: str = "nox") -> Dict[str, Any]:
+    """
+    Traite une requête du mode démon et retourne l'enveloppe de réponse.
+    
+    Args:
+        request (Dict[str, Any]): Requête contenant agent_type, agent_name, config et message
+        default_agent (str): Agent par défaut à utiliser si aucun type n'est fourni
+        
+    Returns:
+        Dict[str, Any]: {"response": ...} en cas de succès, {"error": ...} sinon
+    """
+    if not isinstance(request, dict):
+        return {"error": "La requête doit être un objet JSON"}
+    
+    result = _process_request(request, default_agent)
+    if "id" in request:
+        result["id"] = request["id"]
+    return result
+
+def _process_request(request: Dict[str, Any], default_agent: str) -> Dict[str, Any]:
+    """Traite une requête déjà validée comme objet JSON (voir handle_request)."""
+    resolved = _resolve_request(request, default_agent)
+    if isinstance(resolved, dict):
+        return resolved
+    agent, message = resolved
+    
+    metrics = _request_metrics(request)
+    try:
+        result = {"response": process_message(agent, message, _conversation_id(request), metrics)}
+    except Exception as e:
+        _record_metrics(agent, metrics, failed=True)
+        return {"error": str(e)}
+    _record_metrics(agent, metrics)
+    if request.get("metrics"):
+        result["metrics"] = metrics.to_dict()
+    return result
+
+def _resolve_request(request: Dict[str, Any], default_agent: str):
+    """
+    Retrouve l'agent et le message d'une requête. Retourne le couple (agent, message),
+    ou directement l'enveloppe de réponse pour une requête d'éviction ou invalide.
+    """
+    config = request.get("config") or {}
+    if isinstance(config, str):
+        try:
+            config = json.loads(config)
+        except json.JSONDecodeError:
+            return {"error": "La configuration JSON n'est pas valide"}
+    if not isinstance(config, dict):
+        return {"error": "La configuration JSON n'est pas valide"}
+    
+    if request.get("op") == "evict":
+        try:
+            resolved = _resolve_agent(request.get("agent_type"), request.get("agent_name"), config, default_agent)
+        except Exception as e:
+            return {"error": f"Erreur lors de la résolution de l'agent: {str(e)}"}
+        return {"evicted": get_agent_registry().evict(*resolved)}
+    if request.get("op") == "metrics":
+        return {"metrics": _metrics_registry.render() if _metrics_registry is not None else ""}
+    
+    try:
+        agent = get_agent(request.get("agent_type"), request.get("agent_name"), config, default_agent)
+    except Exception as e:
+        return {"error": f"Erreur lors de la création de l'agent: {str(e)}"}
+    
+    message = request.get("message")
+    if not isinstance(message, str):
+        return {"error": "Le champ 'message' est obligatoire"}
+    return agent, message
+
+def _conversation_id(request: Dict[str, Any]) -> Optional[str]:
+    """Retourne l'identifiant de conversation d'une requête, s'il est fourni."""
+    conversation_id = request.get("conversation_id")
+    return None if conversation_id is None else str(conversation_id)
+
+def handle_request_stream(request: Dict[str, Any], default_agent: str = "nox") -> Iterator[Dict[str, Any]]:
+    """
+    Traite une requête en streaming : produit un objet {"delta": ...} par morceau
+    de réponse, puis {"done": true}. Une requête invalide ou un échec produit une
+    seule enveloppe {"error": ...} (après les morceaux déjà émis le cas échéant).
+    
+    Args:
+        request (Dict[str, Any]): Requête contenant agent_type, agent_name, config et message
+        default_agent (str): Agent par défaut à utiliser si aucun type n'est fourni
+        
+    Yields:
+        Dict[str, Any]: Objets à écrire, un par ligne
+    """
+    def envelope(result: Dict[str, Any]) -> Dict[str, Any]:
+        if "id" in request:
+            result["id"] = request["id"]
+        return result
+    
+    if not isinstance(request, dict):
+        yield {"error": "La requête doit être un objet JSON"}
+        return
+    
+    resolved = _resolve_request(request, default_agent)
+    if isinstance(resolved, dict):
+        yield envelope(resolved)
+        return
+    agent, message = resolved
+    
+    metrics = _request_metrics(request)
+    try:
+        for delta in process_message_stream(agent, message, _conversation_id(request), metrics):
+            yield envelope({"delta": delta})
+    except Exception as e:
+        _record_metrics(agent, metrics, failed=True)
+        yield envelope({"error": str(e)})
+        return
+    _record_metrics(agent, metrics)
+    done = {"done": True}
+    if request.get("metrics"):
+        done["metrics"] = metrics.to_dict()
+    yield envelope(done)
+
+async def _read_request_line(reader: "asyncio.StreamReader") -> Optional[bytes]:
+    """
+    Lit une ligne de requête. Une ligne plus longue que la limite du lecteur
+    (MAX_REQUEST_BYTES) est lue jusqu'à sa fin sans être conservée.
+    
+    Returns:
+        Optional[bytes]: Ligne lue (vide en fin de connexion), ou None si elle dépasse la limite
+    """
+    import asyncio
+    
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        consumed = e.consumed
+    # Abandonner la ligne par tranches, sans dépasser le saut de ligne qui la termine
+    while True:
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b"\n")
+            return None
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+
+async def _handle_connection(reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter",
+                             default_agent: str) -> None:
+    """
+    Traite les requêtes d'une connexion cliente : une requête JSON par ligne,
+    une réponse JSON par ligne, dans l'ordre de réception. Une requête trop
+    volumineuse reçoit une erreur, et la connexion reste ouverte.
+    """
+    import asyncio
+    
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await _read_request_line(reader)
+            if line is None:
+                result = {"error": f"Requête trop volumineuse (limite de {MAX_REQUEST_BYTES} octets)"}
+                writer.write(json.dumps(result).encode("utf-8") + b"\n")
+                await writer.drain()
+                continue
+            if not line:
+                break
+            if not line.strip():
+                continue
+            
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                result = {"error": "Requête JSON invalide"}
+            else:
+                if isinstance(request, dict) and request.get("stream"):
+                    if _worker_pool is not None:
+                        async for item in _worker_pool.stream(request):
+                            writer.write(json.dumps(item).encode("utf-8") + b"\n")
+                            await writer.drain()
+                    else:
+                        await _stream_response(writer, request, default_agent)
+                    continue
+                if _worker_pool is not None:
+                    result = await _pool_request(request, default_agent)
+                else:
+                    # Le traitement est synchrone : on le déporte dans un thread pour
+                    # continuer à servir les autres connexions pendant ce temps
+                    result = await loop.run_in_executor(None, handle_request, request, default_agent)
+            
+            writer.write(json.dumps(result).encode("utf-8") + b"\n")
+            await writer.drain()
+    except (ConnectionResetError, BrokenPipeError):
+        pass
+    finally:
+        writer.close()
+
+async def _pool_request(request: Any, default_agent: str) -> Dict[str, Any]:
+    """
+    Traite une requête du mode démon avec le pool de processus : les requêtes de
+    service (mesures, état du pool, éviction) sont traitées par le processus
+    principal, les messages par un processus de travail.
+    """
+    op = request.get("op") if isinstance(request, dict) else None
+    if op == "metrics":
+        return handle_request(request, default_agent)
+    if op == "pool":
+        result = {"pool": _worker_pool.stats()}
+    elif op == "evict":
+        results = await _worker_pool.broadcast(request)
+        result = {"evicted": any(r.get("evicted") for r in results)}
+    else:
+        return await _worker_pool.submit(request)
+    if "id" in request:
+        result["id"] = request["id"]
+    return result
+
+async def _stream_response(writer: "asyncio.StreamWriter", request: Dict[str, Any],
+                           default_agent: str) -> None:
+    """
+    Écrit la réponse d'une requête en streaming : la génération s'exécute dans un
+    thread et chaque morceau est transmis au client dès qu'il est produit.
+    """
+    import asyncio
+    
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+    
+    def produce() -> None:
+        try:
+            for item in handle_request_stream(request, default_agent):
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+    
+    producer = loop.run_in_executor(None, produce)
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        writer.write(json.dumps(item).encode("utf-8") + b"\n")
+        await writer.drain()
+    await producer
+
+def start_metrics_server(host: str, port: int, registry: MetricsRegistry):
+    """
+    Expose les mesures agrégées au format texte de Prometheus (GET /metrics),
+    dans un thread d'arrière-plan.
+    
+    Args:
+        host (str): Adresse d'écoute
+        port (int): Port d'écoute
+        registry (MetricsRegistry): Registre des mesures
+        
+    Returns:
+        ThreadingHTTPServer: Serveur démarré
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+async def serve(socket_path: Optional[str], host: str, port: Optional[int], default_agent: str,
+                metrics_port: Optional[int] = None, workers: int = 0,
+                worker_timeout: Optional[float] = None, queue_size: Optional[int] = None,
+                log_settings: tuple = (), shared_index: Optional[str] = None) -> None:
+    """
+    Lance le mode démon et traite les requêtes jusqu'à réception de SIGINT/SIGTERM.
+    
+    Args:
+        socket_path (Optional[str]): Chemin du socket Unix à utiliser
+        host (str): Adresse d'écoute TCP (si aucun socket Unix n'est fourni)
+        port (Optional[int]): Port d'écoute TCP
+        default_agent (str): Agent par défaut à utiliser si aucun type n'est fourni
+        metrics_port (Optional[int]): Port HTTP d'exposition des mesures (/metrics)
+        workers (int): Nombre de processus de travail (0 : traitement dans des
+                       threads du processus principal)
+        worker_timeout (Optional[float]): Délai maximal par requête avec le pool, en secondes
+        queue_size (Optional[int]): Nombre maximal de requêtes en attente avec le pool
+        log_settings (tuple): Arguments de configure_logging pour les processus de travail
+        shared_index (Optional[str]): Répertoire des index partagés par les processus
+                                      de travail (None : répertoire temporaire,
+                                      chaîne vide : index propre à chaque processus)
+    """
+    import asyncio
+    import signal
+    global _worker_pool
+    
+    registry = enable_metrics_registry()
+    metrics_server = start_metrics_server(host, metrics_port, registry) if metrics_port is not None else None
+    
+    def client_connected(reader, writer):
+        return _handle_connection(reader, writer, default_agent)
+    
+    temp_index = None
+    if workers > 0:
+        from worker_pool import DEFAULT_TIMEOUT, WorkerPool
+        
+        if shared_index is None:
+            import tempfile
+            # /dev/shm : fichiers en mémoire, sans écriture sur disque
+            temp_index = tempfile.mkdtemp(prefix="jamono-index-",
+                                          dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+            shared_index = temp_index
+        
+        # Chaque processus préchauffe l'agent par défaut et sa base de connaissances
+        _worker_pool = WorkerPool(workers, default_agent, _max_agents, queue_size,
+                                  worker_timeout or DEFAULT_TIMEOUT, log_settings, registry,
+                                  shared_index or None)
+        try:
+            await _worker_pool.start()
+        except Exception:
+            if temp_index is not None:
+                import shutil
+                shutil.rmtree(temp_index, ignore_errors=True)
+            raise
+    else:
+        # Préchauffer l'agent par défaut et sa base de connaissances avant d'accepter des requêtes
+        get_agent(None, None, {}, default_agent)
+    
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = await asyncio.start_unix_server(client_connected, path=socket_path, limit=MAX_REQUEST_BYTES)
+        address = socket_path
+    else:
+        server = await asyncio.start_server(client_connected, host=host, port=port, limit=MAX_REQUEST_BYTES)
+        address = f"{host}:{port}"
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    
+    print(f"Serveur d'agents en écoute sur {address}", file=sys.stderr)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        if _worker_pool is not None:
+            await _worker_pool.close()
+            _worker_pool = None
+        if temp_index is not None:
+            import shutil
+            shutil.rmtree(temp_index, ignore_errors=True)
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def run_batch(input_path: str, output_path: Optional[str], default_agent: str,
+              metrics_path: Optional[str] = None) -> int:
+    """
+    Traite un fichier JSONL de requêtes dans le processus courant.
+    Les agents sont réutilisés entre les requêtes ayant la même configuration,
+    et chaque ligne non vide produit exactement une ligne de résultat.
+    
+    Args:
+        input_path (str): Fichier JSONL à traiter, ou "-" pour l'entrée standard
+        output_path (Optional[str]): Fichier de sortie, ou None pour la sortie standard
+        default_agent (str): Agent par défaut à utiliser si aucun type n'est fourni
+        metrics_path (Optional[str]): Fichier où écrire les mesures agrégées
+                                      (format texte de Prometheus) à la fin du lot
+        
+    Returns:
+        int: Nombre de requêtes en erreur
+    """
+    registry = enable_metrics_registry()
+    errors = 0
+    source = sys.stdin if input_path == "-" else open(input_path, 'r', encoding='utf-8')
+    output = sys.stdout if output_path is None else open(output_path, 'w', encoding='utf-8')
+    try:
+        for line_number, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                result = {"error": f"Requête JSON invalide (ligne {line_number})"}
+            else:
+                result = handle_request(request, default_agent)
+            
+            if "error" in result:
+                errors += 1
+            output.write(json.dumps(result) + "\n")
+        output.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    if metrics_path:
+        with open(metrics_path, 'w', encoding='utf-8') as f:
+            f.write(registry.render())
+    return errors
+
+class StartupReport:
+    """
+    Mesure la durée des phases de démarrage du mode commande (--startup-report).
+    """
+    
+    def __init__(self, started: float):
+        """
+        Initialise le rapport.
+        
+        Args:
+            started (float): Instant de début du chargement du script (time.perf_counter)
+        """
+        self.started = started
+        self.phases: Dict[str, float] = {}
+        self._last = started
+    
+    def mark(self, phase: str) -> None:
+        """
+        Termine une phase et enregistre sa durée.
+        
+        Args:
+            phase (str): Nom de la phase qui vient de se terminer
+        """
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+    
+    def split(self, phase: str, seconds: Optional[float], parent: str) -> None:
+        """
+        Isole une sous-phase mesurée ailleurs de la durée de sa phase parente.
+        
+        Args:
+            phase (str): Nom de la sous-phase
+            seconds (Optional[float]): Durée de la sous-phase, None si elle n'a pas eu lieu
+            parent (str): Phase qui contient la sous-phase
+        """
+        if seconds is None or parent not in self.phases:
+            return
+        self.phases[parent] -= seconds
+        self.phases[phase] = seconds
+    
+    def to_dict(self, budget_ms: Optional[float]) -> Dict[str, Any]:
+        """
+        Retourne le rapport sous forme de dictionnaire (durées en millisecondes).
+        
+        Args:
+            budget_ms (Optional[float]): Budget de démarrage à comparer au total
+            
+        Returns:
+            Dict[str, Any]: Durées par phase, total et respect du budget
+        """
+        total_ms = (self._last - self.started) * 1000
+        report = {
+            "phases_ms": {phase: round(seconds * 1000, 3) for phase, seconds in self.phases.items()},
+            "total_ms": round(total_ms, 3),
+            "budget_ms": budget_ms
+        }
+        if budget_ms is not None:
+            report["within_budget"] = total_ms <= budget_ms
+        return report
+
+def _knowledge_load_times(agent: Agent) -> tuple:
+    """
+    Retourne les durées d'import et d'indexation des bases de connaissances
+    chargées à la demande par l'agent.
+    
+    Args:
+        agent (Agent): Agent dont on inspecte les bases de connaissances
+        
+    Returns:
+        tuple: (durée d'import, durée de construction de l'index), en secondes ou None
+    """
+    import_seconds = None
+    index_seconds = None
+    for kb in agent.knowledge_bases:
+        if isinstance(kb, LazyKnowledgeBase) and kb.loaded:
+            import_seconds = (import_seconds or 0.0) + (kb.load_seconds or 0.0)
+            build = getattr(kb, "index_build_seconds", None)
+            if build is not None:
+                index_seconds = (index_seconds or 0.0) + build
+    return import_seconds, index_seconds
 
 def main():
     """Fonction principale pour l'exécution en ligne de commande."""
+    report = StartupReport(_process_started)
+    report.mark("imports")
+    
     parser = argparse.ArgumentParser(description="Interface pour interagir avec les agents IA")
     parser.add_argument("--agent-type", help="Type d'agent (devops, cloud, etc.)")
     parser.add_argument("--agent-name", help="Nom de l'agent")
     parser.add_argument("--config", help="Configuration de l'agent au format JSON")
-    parser.add_argument("--message", required=True, help="Message à traiter")
+    parser.add_argument("--message", help="Message à traiter")
     parser.add_argument("--config-file", help="Fichier de configuration de l'agent")
     parser.add_argument("--default-agent", default="nox", help="Agent par défaut à utiliser si aucun n'est spécifié")
+    parser.add_argument("--serve", action="store_true", help="Lancer le serveur en mode démon")
+    parser.add_argument("--socket", help="Socket Unix d'écoute du mode démon")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute TCP du mode démon")
+    parser.add_argument("--port", type=int, help="Port d'écoute TCP du mode démon")
+    parser.add_argument("--stream", action="store_true", help="Écrire la réponse par morceaux, en JSON délimité par des sauts de ligne")
+    parser.add_argument("--batch", help="Fichier JSONL de requêtes à traiter (- pour l'entrée standard)")
+    parser.add_argument("--output", help="Fichier de sortie du mode lot (sortie standard par défaut)")
+    parser.add_argument("--metrics", action="store_true", help="Ajouter les mesures du traitement (champ \"metrics\") à la réponse")
+    parser.add_argument("--metrics-port", type=int, help="Port HTTP d'exposition des mesures agrégées du mode démon (/metrics)")
+    parser.add_argument("--metrics-file", help="Fichier où écrire les mesures agrégées à la fin du mode lot")
+    parser.add_argument("--workers", type=int, default=0, help="Nombre de processus de travail du mode démon (0 : threads du processus principal)")
+    parser.add_argument("--worker-timeout", type=float, help="Délai maximal de traitement d'une requête par un processus de travail, en secondes")
+    parser.add_argument("--queue-size", type=int, help="Nombre maximal de requêtes en attente des processus de travail")
+    parser.add_argument("--shared-index", help="Répertoire des index de bases de connaissances partagés par les processus de travail (répertoire temporaire par défaut)")
+    parser.add_argument("--no-shared-index", action="store_true", help="Construire l'index des bases de connaissances dans chaque processus de travail")
+    parser.add_argument("--max-agents", type=int, default=32, help="Nombre maximal d'agents gardés en mémoire (modes démon et lot)")
+    parser.add_argument("--log-level", help="Niveau de journalisation : DEBUG, INFO, WARNING, ERROR ou OFF (JAMONO_LOG_LEVEL)")
+    parser.add_argument("--log-file", help="Fichier de journalisation, sortie d'erreur par défaut (JAMONO_LOG_FILE)")
+    parser.add_argument("--log-format", choices=("json", "text"), help="Format des journaux (JAMONO_LOG_FORMAT)")
+    parser.add_argument("--log-sample", help="Proportion de journaux gardée par niveau, ex. INFO=0.1 (JAMONO_LOG_SAMPLE)")
+    parser.add_argument("--startup-report", action="store_true", help="Écrire la durée de chaque phase de démarrage sur la sortie d'erreur")
+    parser.add_argument("--startup-budget", type=float, help="Budget de démarrage en ms (code de sortie 3 en cas de dépassement)")
+    parser.add_argument("--list-plugins", action="store_true", help="Afficher les types d'agents et les bases de connaissances déclarés")
     
     args = parser.parse_args()
+    try:
+        configure_logging(args.log_level, args.log_file, args.log_format, args.log_sample)
+    except (ValueError, OSError) as e:
+        parser.error(f"configuration de la journalisation invalide: {e}")
+    global _max_agents
+    _max_agents = args.max_agents
+    
+    if args.list_plugins:
+        plugins = get_plugin_registry()
+        print(json.dumps({
+            "agent_types": {name: plugins.agent_type(name) for name in plugins.agent_types()},
+            "knowledge_bases": {name: plugins.knowledge_base_module(name) for name in plugins.knowledge_bases()}
+        }, ensure_ascii=False, indent=2))
+        return
+    
+    if args.serve:
+        if not args.socket and args.port is None:
+            parser.error("--serve nécessite --socket ou --port")
+        import asyncio
+        
+        try:
+            asyncio.run(serve(args.socket, args.host, args.port, args.default_agent, args.metrics_port,
+                              args.workers, args.worker_timeout, args.queue_size,
+                              (args.log_level, args.log_file, args.log_format, args.log_sample),
+                              "" if args.no_shared_index else args.shared_index))
+        except Exception as e:
+            print(f"Erreur du serveur d'agents: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    if args.batch:
+        try:
+            errors = run_batch(args.batch, args.output, args.default_agent, args.metrics_file)
+        except OSError as e:
+            print(f"Erreur lors du traitement du lot: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+        if errors:
+            print(f"{errors} requête(s) en erreur", file=sys.stderr)
+        return
+    
+    if args.message is None:
+        parser.error("l'argument --message est obligatoire")
+    report.mark("arguments")
     
     agent = None
     
@@ -115,6 +896,7 @@ def main():
             except Exception as e:
                 print(f"Erreur lors du chargement du fichier de configuration: {str(e)}", file=sys.stderr)
                 sys.exit(1)
+        report.mark("config")
         
         # Créer et initialiser l'agent
         try:
@@ -132,14 +914,42 @@ def main():
         except Exception as e:
             print(f"Erreur lors du chargement de l'agent par défaut: {str(e)}", file=sys.stderr)
             sys.exit(1)
+    report.mark("agent")
     
     # Traiter le message
-    try:
-        response = process_message(agent, args.message)
-        print(json.dumps({"response": response}))
-    except Exception as e:
-        print(json.dumps({"error": str(e)}))
-        sys.exit(1)
+    metrics = RequestMetrics() if args.metrics else None
+    if args.stream:
+        try:
+            for delta in process_message_stream(agent, args.message, metrics=metrics):
+                print(json.dumps({"delta": delta}), flush=True)
+            done = {"done": True}
+            if metrics is not None:
+                done["metrics"] = metrics.to_dict()
+            print(json.dumps(done), flush=True)
+        except Exception as e:
+            print(json.dumps({"error": str(e)}), flush=True)
+            sys.exit(1)
+    else:
+        try:
+            result = {"response": process_message(agent, args.message, metrics=metrics)}
+            if metrics is not None:
+                result["metrics"] = metrics.to_dict()
+            print(json.dumps(result))
+        except Exception as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
+    report.mark("message")
+    
+    if args.startup_report or args.startup_budget is not None:
+        import_seconds, index_seconds = _knowledge_load_times(agent)
+        report.split("knowledge_base_import", import_seconds, "message")
+        report.split("index_build", index_seconds, "message")
+        result = report.to_dict(args.startup_budget if args.startup_budget is not None else STARTUP_BUDGET_MS)
+        if args.startup_report:
+            print(json.dumps({"startup_report": result}), file=sys.stderr)
+        if args.startup_budget is not None and not result["within_budget"]:
+            print(f"Budget de démarrage dépassé: {result['total_ms']} ms > {args.startup_budget} ms", file=sys.stderr)
+            sys.exit(3)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
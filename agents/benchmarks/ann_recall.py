@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Banc d'essai de l'index IVF (knowledge_base.ann_index) face à la recherche
+exacte : rappel@k et latence par requête pour une grille de réglages
+(n_lists, nprobe).
+
+Le corpus est synthétique : des passages générés autour de sujets (chaque
+sujet a son vocabulaire, mêlé à un vocabulaire commun), vectorisés par le
+HashingEmbedder, comme les bases de connaissances réelles.
+
+Usage :
+    python agents/benchmarks/ann_recall.py --passages 100000 --queries 200 --k 5
+"""
+
+import os
+import sys
+import time
+import argparse
+from typing import List, Sequence
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge_base.ann_index import IVFIndex
+from knowledge_base.vector_index import HashingEmbedder
+
+
+def synthetic_texts(count: int, topics: int, rng: np.random.Generator, words: int = 30) -> List[str]:
+    """
+    Génère des textes thématiques : environ deux tiers des mots viennent du
+    vocabulaire du sujet, le reste d'un vocabulaire commun.
+
+    Args:
+        count (int): Nombre de textes
+        topics (int): Nombre de sujets
+        rng (np.random.Generator): Générateur aléatoire
+        words (int): Nombre de mots par texte
+
+    Returns:
+        List[str]: Textes générés
+    """
+    texts = []
+    for topic in rng.integers(0, topics, count):
+        topic_words = rng.integers(0, 50, words)
+        common_words = rng.integers(0, 2000, words)
+        from_topic = rng.random(words) < 0.66
+        texts.append(" ".join(
+            f"t{topic}w{t}" if own else f"c{c}"
+            for own, t, c in zip(from_topic, topic_words, common_words)
+        ))
+    return texts
+
+
+def exact_top_k(matrix: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    """
+    Calcule les k plus proches voisins exacts de chaque requête.
+
+    Args:
+        matrix (np.ndarray): Vecteurs du corpus
+        queries (np.ndarray): Vecteurs des requêtes
+        k (int): Nombre de voisins
+
+    Returns:
+        List[set]: Identifiants des voisins de chaque requête
+    """
+    results = []
+    for query in queries:
+        scores = matrix @ query
+        results.append(set(np.argpartition(-scores, k - 1)[:k].tolist()))
+    return results
+
+
+def parse_grid(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rappel et latence de l'index IVF face à la recherche exacte")
+    parser.add_argument("--passages", type=int, default=50000, help="Nombre de passages du corpus")
+    parser.add_argument("--topics", type=int, default=500, help="Nombre de sujets du corpus")
+    parser.add_argument("--dim", type=int, default=256, help="Dimension des vecteurs")
+    parser.add_argument("--queries", type=int, default=200, help="Nombre de requêtes")
+    parser.add_argument("--k", type=int, default=5, help="Nombre de voisins recherchés")
+    parser.add_argument("--lists", default="", help="Valeurs de n_lists, séparées par des virgules "
+                                                   "(racine carrée du corpus par défaut)")
+    parser.add_argument("--nprobe", default="1,2,4,8,16,32", help="Valeurs de nprobe, séparées par des virgules")
+    parser.add_argument("--iterations", type=int, default=10, help="Itérations du k-means")
+    parser.add_argument("--seed", type=int, default=0, help="Graine aléatoire")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    embedder = HashingEmbedder(args.dim)
+
+    started = time.perf_counter()
+    matrix = embedder.embed(synthetic_texts(args.passages, args.topics, rng))
+    queries = embedder.embed([" ".join(text.split()[:6]) for text in synthetic_texts(args.queries, args.topics, rng)])
+    print(f"corpus: {args.passages} passages, dim {args.dim}, vectorisé en {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    expected = exact_top_k(matrix, queries, args.k)
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    print(f"exact: {exact_ms:.3f} ms/requête")
+    print()
+    print(f"{'n_lists':>8} {'nprobe':>7} {'rappel@' + str(args.k):>9} {'ms/req':>8} {'accél.':>7} {'entraîn.':>9}")
+
+    for n_lists in parse_grid(args.lists) or [max(1, int(np.sqrt(args.passages)))]:
+        started = time.perf_counter()
+        index = IVFIndex(args.dim, n_lists, seed=args.seed)
+        index.train(matrix, args.iterations)
+        index.add(matrix, np.arange(len(matrix)))
+        build_seconds = time.perf_counter() - started
+        # Consolide les listes avant de mesurer
+        index.search(queries[0], args.k, nprobe=index.n_lists)
+
+        for nprobe in parse_grid(args.nprobe):
+            if nprobe > index.n_lists:
+                continue
+            hits = 0
+            started = time.perf_counter()
+            for query, truth in zip(queries, expected):
+                ids, _ = index.search(query, args.k, nprobe=nprobe)
+                hits += len(truth.intersection(ids.tolist()))
+            elapsed_ms = (time.perf_counter() - started) * 1000 / len(queries)
+            recall = hits / (len(queries) * args.k)
+            print(f"{index.n_lists:>8} {nprobe:>7} {recall:>9.3f} {elapsed_ms:>8.3f} "
+                  f"{exact_ms / elapsed_ms:>6.1f}x {build_seconds:>8.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+"""
+Banc d'essai des chemins critiques de l'agent : chargement d'une base de
+connaissances, search_knowledge_base, search_ranked, _extract_keywords,
+_prepare_context, process_message, et démarrage à froid du mode commande.
+
+Les bases de connaissances et les messages sont synthétiques (voir
+benchmarks/synthetic.py) ; chaque échelle (``shipped`` : base DevOps fournie,
+``10k``, ``100k``, ``1m`` passages) est écrite dans un fichier JSON temporaire
+et chargée par FileKnowledgeBase, comme une base de fichiers réelle.
+
+Pour chaque opération, le banc mesure la durée de chaque appel (médiane et
+95e centile) sans instrumentation, puis, dans une seconde passe sous
+tracemalloc, le pic de mémoire allouée par appel. Pour le démarrage à froid
+(processus séparés), la mémoire est le pic de mémoire résidente du processus.
+
+Les références sont enregistrées dans benchmarks/baselines.json
+(``--update-baseline``). Avec ``--check``, une opération plus lente ou plus
+gourmande que sa référence au-delà de la tolérance (25 % par défaut) est
+signalée et le script termine avec le code 1 : à lancer avant et après une
+modification d'un chemin critique. Les références dépendent de la machine ;
+elles se comparent sur la même machine.
+
+Usage :
+    python agents/benchmarks/hot_paths.py --scales shipped,10k --check
+    python agents/benchmarks/hot_paths.py --scales shipped,10k --update-baseline
+    python agents/benchmarks/hot_paths.py --scales 1m --ops search_ranked,process_message
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import resource
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(AGENTS_DIR)
+
+from synthetic import synthetic_knowledge, synthetic_messages, write_knowledge
+from models.agent import create_agent
+from models.conversation import split_channel_context
+from knowledge_base.file_knowledge_base import FileKnowledgeBase
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+SCALES = {"shipped": 0, "10k": 10000, "100k": 100000, "1m": 1000000}
+DEFAULT_SCALES = "shipped,10k"
+OPERATIONS = ("kb_load", "search_knowledge_base", "search_ranked", "extract_keywords",
+              "prepare_context", "process_message", "cli_cold_start")
+# Opérations indépendantes de la taille de la base de connaissances
+SCALE_FREE_OPERATIONS = ("extract_keywords", "cli_cold_start")
+
+DEFAULT_TOLERANCE = 0.25
+# Écarts absolus ignorés (bruit de mesure des opérations très courtes)
+MIN_REGRESSION_MS = 0.05
+MIN_REGRESSION_KIB = 64
+# Nombre d'appels de la passe mémoire (tracemalloc ralentit fortement l'exécution)
+MEMORY_CALLS = 20
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(function: Callable[[Any], Any], inputs: Sequence[Any], calls: int,
+            memory_calls: int = MEMORY_CALLS) -> Dict[str, Any]:
+    """
+    Mesure une opération appelée successivement sur les entrées (reprises
+    cycliquement) : durée par appel, puis pic de mémoire par appel.
+
+    Args:
+        function (Callable[[Any], Any]): Opération à mesurer
+        inputs (Sequence[Any]): Entrées de l'opération
+        calls (int): Nombre d'appels chronométrés
+        memory_calls (int): Nombre d'appels de la passe mémoire
+
+    Returns:
+        Dict[str, Any]: calls, median_ms, p95_ms, peak_kib
+    """
+    timings = []
+    for i in range(calls):
+        argument = inputs[i % len(inputs)]
+        started = time.perf_counter()
+        function(argument)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for i in range(min(calls, memory_calls)):
+            argument = inputs[i % len(inputs)]
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            function(argument)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": calls,
+        "median_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(_percentile(timings, 0.95), 4),
+        "peak_kib": round(peak / 1024, 1)
+    }
+
+
+def measure_cold_start(runs: int, message: str = "Comment déployer sur kubernetes ?") -> Dict[str, Any]:
+    """
+    Mesure le temps total d'un appel du mode commande (processus complet,
+    démarrage de l'interpréteur compris), comme l'appelle le serveur Node.js.
+
+    Args:
+        runs (int): Nombre de processus lancés
+        message (str): Message traité
+
+    Returns:
+        Dict[str, Any]: calls, median_ms, p95_ms, peak_kib (mémoire résidente maximale)
+    """
+    command = [sys.executable, os.path.join(AGENTS_DIR, "agent_server.py"),
+               "--agent-type", "devops", "--agent-name", "Bench", "--message", message]
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "calls": runs,
+        "median_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(_percentile(timings, 0.95), 4),
+        "peak_kib": float(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    }
+
+
+def run_scale(scale: str, operations: Sequence[str], messages: List[str], calls: int,
+              workdir: str, seed: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Exécute les opérations dépendantes de la base de connaissances pour une échelle.
+
+    Args:
+        scale (str): Nom de l'échelle (clé de SCALES)
+        operations (Sequence[str]): Opérations à mesurer
+        messages (List[str]): Messages synthétiques
+        calls (int): Nombre d'appels par opération
+        workdir (str): Répertoire des fichiers temporaires
+        seed (int): Graine du générateur de base de connaissances
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Mesures par nom d'opération (``opération@échelle``)
+    """
+    path = os.path.join(workdir, f"bench_{scale}.json")
+    knowledge = synthetic_knowledge(SCALES[scale], seed)
+    write_knowledge(knowledge, path)
+    del knowledge
+
+    results = {}
+    if "kb_load" in operations:
+        # Une base d'un million de passages se charge en plusieurs dizaines de secondes
+        load_calls = 3 if SCALES[scale] < 100000 else 1
+        results["kb_load"] = measure(lambda p: FileKnowledgeBase(p), [path], load_calls, memory_calls=1)
+    kb = FileKnowledgeBase(path)
+
+    agent = create_agent("devops", "Bench", {})
+    agent.add_knowledge_base(kb)
+    questions = [split_channel_context(message)[0] for message in messages]
+    queries = [keyword for question in questions for keyword in agent._extract_keywords(question)
+               if keyword != "general"] or ["kubernetes"]
+
+    if "search_knowledge_base" in operations:
+        results["search_knowledge_base"] = measure(kb.search_knowledge_base, queries, calls)
+    if "search_ranked" in operations:
+        results["search_ranked"] = measure(lambda query: kb.search_ranked(query, 5), queries, calls)
+    if "prepare_context" in operations:
+        contexts = []
+        for question in questions:
+            knowledge = {}
+            for keyword in agent._extract_keywords(question):
+                passages = agent.search_knowledge(keyword)
+                if passages:
+                    knowledge[keyword] = passages
+            contexts.append((question, knowledge))
+        results["prepare_context"] = measure(lambda item: agent._prepare_context(*item), contexts, calls)
+    if "process_message" in operations:
+        def process(message: str) -> str:
+            # Recherches non mises en cache, comme pour un message nouveau
+            agent._search_cache.clear()
+            return agent.process_message(message)
+        results["process_message"] = measure(process, messages, calls)
+
+    return {f"{name}@{scale}": result for name, result in results.items()}
+
+
+def compare(results: Dict[str, Dict[str, Any]], baselines: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """
+    Compare les mesures aux références.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): Mesures par opération
+        baselines (Dict[str, Dict[str, Any]]): Références par opération
+        tolerance (float): Dégradation relative tolérée (0.25 pour 25 %)
+
+    Returns:
+        List[str]: Régressions constatées, une description par ligne
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        for field, minimum in (("median_ms", MIN_REGRESSION_MS), ("peak_kib", MIN_REGRESSION_KIB)):
+            reference, value = baseline[field], result[field]
+            if value > reference * (1 + tolerance) and value - reference > minimum:
+                regressions.append(f"{name}: {field} {value:g} (référence {reference:g})")
+    return regressions
+
+
+def load_baselines(path: str = BASELINE_PATH) -> Dict[str, Dict[str, Any]]:
+    """
+    Lit les références enregistrées.
+
+    Args:
+        path (str): Fichier des références
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Références par opération (vide si le fichier n'existe pas)
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+
+def save_baselines(results: Dict[str, Dict[str, Any]], path: str = BASELINE_PATH) -> None:
+    """
+    Enregistre les mesures comme références, en conservant les références des
+    opérations qui n'ont pas été mesurées.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): Mesures par opération
+        path (str): Fichier des références
+    """
+    merged = load_baselines(path)
+    merged.update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                        "processor": platform.machine()},
+            "results": dict(sorted(merged.items()))
+        }, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Banc d'essai des chemins critiques de l'agent")
+    parser.add_argument("--scales", default=DEFAULT_SCALES,
+                        help=f"Échelles de base de connaissances, séparées par des virgules ({', '.join(SCALES)})")
+    parser.add_argument("--ops", default=",".join(OPERATIONS), help="Opérations à mesurer, séparées par des virgules")
+    parser.add_argument("--messages", type=int, default=200, help="Nombre de messages synthétiques")
+    parser.add_argument("--calls", type=int, default=200, help="Nombre d'appels chronométrés par opération")
+    parser.add_argument("--cold-runs", type=int, default=5, help="Nombre de démarrages à froid mesurés")
+    parser.add_argument("--seed", type=int, default=0, help="Graine des générateurs")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Fichier des références")
+    parser.add_argument("--check", action="store_true", help="Comparer aux références (code 1 en cas de régression)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Dégradation relative tolérée")
+    parser.add_argument("--update-baseline", action="store_true", help="Enregistrer les mesures comme références")
+    parser.add_argument("--json", action="store_true", help="Écrire les mesures en JSON")
+    args = parser.parse_args()
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    operations = [op.strip() for op in args.ops.split(",") if op.strip()]
+    unknown = [name for name in scales if name not in SCALES] + [op for op in operations if op not in OPERATIONS]
+    if unknown:
+        parser.error(f"Échelle ou opération inconnue: {', '.join(unknown)}")
+
+    # Les journaux de chaque message fausseraient la sortie du banc
+    logging.getLogger("agent").setLevel(logging.WARNING)
+    messages = synthetic_messages(args.messages, args.seed)
+    results: Dict[str, Dict[str, Any]] = {}
+
+    if "extract_keywords" in operations:
+        agent = create_agent("devops", "Bench", {})
+        results["extract_keywords"] = measure(agent._extract_keywords, messages, args.calls)
+    if "cli_cold_start" in operations:
+        results["cli_cold_start"] = measure_cold_start(args.cold_runs)
+    scale_operations = [op for op in operations if op not in SCALE_FREE_OPERATIONS]
+    if scale_operations:
+        with tempfile.TemporaryDirectory(prefix="jamono-bench-") as workdir:
+            for scale in scales:
+                results.update(run_scale(scale, scale_operations, messages, args.calls, workdir, args.seed))
+
+    baselines = load_baselines(args.baseline)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        print(f"{'opération':<36}{'appels':>8}{'médiane ms':>13}{'p95 ms':>11}{'pic Kio':>11}{'réf. ms':>11}")
+        for name, result in results.items():
+            reference = baselines.get(name, {}).get("median_ms")
+            print(f"{name:<36}{result['calls']:>8}{result['median_ms']:>13.4f}{result['p95_ms']:>11.4f}"
+                  f"{result['peak_kib']:>11.1f}{'' if reference is None else format(reference, '.4f'):>11}")
+
+    status = 0
+    if args.check:
+        regressions = compare(results, baselines, args.tolerance)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}", file=sys.stderr)
+        status = 1 if regressions else 0
+    if args.update_baseline:
+        save_baselines(results, args.baseline)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
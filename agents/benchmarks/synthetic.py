@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+"""
+Générateurs de données synthétiques pour les bancs d'essai.
+
+- synthetic_knowledge : base de connaissances au format des bases de fichiers
+  (``{sujet: {"definition": ..., sous_sujet: {clé: texte}}}``), de la taille
+  de la base DevOps fournie jusqu'à un million de passages. Le vocabulaire et
+  sa distribution (fréquences des mots) sont repris de la base DevOps, pour que
+  les recherches par mot-clé trouvent des passages comme en production.
+- synthetic_messages : messages modelés sur le trafic Slack réel (voir
+  conversation-history/) : salutations, arrivées dans le canal, mentions
+  ``<@U...>``, questions techniques plus ou moins longues, fautes de frappe,
+  suivis du bloc « Contexte récent du canal » ajouté par le serveur Node.js.
+
+Les deux générateurs sont déterministes pour une graine donnée.
+
+Usage :
+    python agents/benchmarks/synthetic.py knowledge --passages 100000 --output kb.json
+    python agents/benchmarks/synthetic.py messages --count 20
+"""
+
+import os
+import re
+import sys
+import json
+import random
+import argparse
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge_base.devops_knowledge_data import DEVOPS_KNOWLEDGE
+from models.agent import DEFAULT_DEVOPS_KEYWORDS
+
+_WORD_RE = re.compile(r"[^\W\d_][\w'-]*")
+
+# Structure des sujets générés : sous-sujets par sujet, passages par sous-sujet
+SUBTOPICS_PER_TOPIC = 20
+PASSAGES_PER_SUBTOPIC = 50
+# Longueur des passages, en mots
+PASSAGE_WORDS = (20, 80)
+
+# Répartition des messages, d'après l'historique des canaux
+MESSAGE_KINDS = (
+    ("greeting", 0.20),
+    ("presence", 0.05),
+    ("short_question", 0.35),
+    ("long_question", 0.25),
+    ("chatter", 0.15),
+)
+# Nombre de lignes du bloc « Contexte récent du canal »
+CHANNEL_WINDOW = 3
+
+_GREETINGS = ["salut", "bonjour", "hello", "coucou", "bienvenu", "Bienvenue à tous", "salut guys", "yo"]
+_QUESTION_TEMPLATES = [
+    "comment configurer {kw} ?",
+    "tu peux m'expliquer {kw} ?",
+    "on a un problème avec {kw}, une idée ?",
+    "c'est quoi la différence entre {kw} et {kw2} ?",
+    "qui es tu ?",
+    "{kw} plante en prod depuis ce matin",
+]
+_LONG_QUESTION_TEMPLATES = [
+    "on va demander a {mention} de nous creer un manifest de base pour {kw}. Vasy",
+    "salut {mention}, on a besoin de deployer {kw} avec {kw2} pour le projet, tu peux nous proposer "
+    "une config de départ et les étapes ?",
+    "le pipeline échoue à l'étape {kw} avec une erreur de timeout, les logs montrent que {kw2} ne "
+    "répond plus après le déploiement, comment debugger ça ?",
+]
+_CHATTER = ["ok merci", "top", "je regarde", "ça marche", "on en parle demain", "+1", "vasy", "d'accord, merci !"]
+
+
+def _vocabulary() -> Tuple[List[str], List[int]]:
+    """Mots de la base DevOps et leurs fréquences cumulées."""
+    counts: Counter = Counter()
+
+    def walk(value: Any) -> None:
+        if isinstance(value, str):
+            counts.update(word.lower() for word in _WORD_RE.findall(value) if len(word) > 1)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                counts[str(key).lower()] += 1
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    walk(DEVOPS_KNOWLEDGE)
+    words = sorted(counts, key=lambda word: (-counts[word], word))
+    cumulative, total = [], 0
+    for word in words:
+        total += counts[word]
+        cumulative.append(total)
+    return words, cumulative
+
+
+def synthetic_knowledge(passages: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """
+    Génère une base de connaissances d'environ ``passages`` passages. En dessous
+    d'un sujet complet, la base DevOps fournie est retournée telle quelle.
+
+    Args:
+        passages (int): Nombre de passages souhaité
+        seed (int): Graine du générateur
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Base de connaissances
+    """
+    per_topic = SUBTOPICS_PER_TOPIC * PASSAGES_PER_SUBTOPIC
+    if passages < per_topic:
+        return DEVOPS_KNOWLEDGE
+
+    rng = random.Random(seed)
+    words, cumulative = _vocabulary()
+    base_topics = list(DEVOPS_KNOWLEDGE)
+
+    def text(low: int, high: int) -> str:
+        return " ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(low, high)))
+
+    knowledge: Dict[str, Dict[str, Any]] = {}
+    for t in range(-(-passages // per_topic)):
+        topic = f"{base_topics[t % len(base_topics)]}_{t}"
+        topic_data: Dict[str, Any] = {"definition": text(30, 60)}
+        remaining = min(per_topic, passages - t * per_topic)
+        for s in range(-(-remaining // PASSAGES_PER_SUBTOPIC)):
+            count = min(PASSAGES_PER_SUBTOPIC, remaining - s * PASSAGES_PER_SUBTOPIC)
+            topic_data[f"{words[rng.randrange(200)]}_{s}"] = {
+                f"{words[rng.randrange(500)]}_{p}": text(*PASSAGE_WORDS) for p in range(count)
+            }
+        knowledge[topic] = topic_data
+    return knowledge
+
+
+def write_knowledge(knowledge: Dict[str, Dict[str, Any]], path: str) -> None:
+    """
+    Écrit une base de connaissances au format JSON des bases de fichiers.
+
+    Args:
+        knowledge (Dict[str, Dict[str, Any]]): Base de connaissances
+        path (str): Fichier de sortie (.json)
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(knowledge, f, ensure_ascii=False)
+
+
+def _user_id(rng: random.Random) -> str:
+    return "U0" + "".join(rng.choices("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=9))
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    """Inverse deux lettres voisines (une faute de frappe)."""
+    positions = [i for i in range(len(text) - 1) if text[i].isalpha() and text[i + 1].isalpha()]
+    if not positions:
+        return text
+    i = rng.choice(positions)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def synthetic_messages(count: int, seed: int = 0, users: int = 6,
+                       keywords: Optional[List[str]] = None) -> List[str]:
+    """
+    Génère les messages successifs d'un canal, chacun suivi du bloc de contexte
+    du canal comme ceux que reçoit l'agent.
+
+    Args:
+        count (int): Nombre de messages
+        seed (int): Graine du générateur
+        users (int): Nombre de participants du canal
+        keywords (Optional[List[str]]): Vocabulaire technique (mots-clés de
+                                        l'agent DevOps par défaut)
+
+    Returns:
+        List[str]: Messages
+    """
+    rng = random.Random(seed)
+    keywords = keywords or list(DEFAULT_DEVOPS_KEYWORDS)
+    members = [_user_id(rng) for _ in range(users)]
+    agent_id = _user_id(rng)
+    kinds = [kind for kind, _ in MESSAGE_KINDS]
+    weights = [weight for _, weight in MESSAGE_KINDS]
+    channel: List[str] = []
+    messages = []
+
+    for _ in range(count):
+        user = rng.choice(members)
+        mention = f"<@{agent_id}>"
+        kind = rng.choices(kinds, weights)[0]
+        kw, kw2 = rng.sample(keywords, 2)
+        if kind == "greeting":
+            text = f"{rng.choice(_GREETINGS)} {mention}"
+        elif kind == "presence":
+            user = rng.choice(members + [agent_id])
+            text = f"<@{user}> has joined the channel"
+        elif kind == "short_question":
+            text = rng.choice(_QUESTION_TEMPLATES).format(kw=kw, kw2=kw2)
+        elif kind == "long_question":
+            text = rng.choice(_LONG_QUESTION_TEMPLATES).format(kw=kw, kw2=kw2, mention=mention)
+        else:
+            text = rng.choice(_CHATTER)
+        if rng.random() < 0.15:
+            text = _typo(text, rng)
+
+        channel.append(f"{user}: {text}")
+        window = channel[-CHANNEL_WINDOW:]
+        messages.append(f"{text}\nContexte récent du canal:\n" + "\n".join(window) + "\n")
+    return messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Génère des données synthétiques pour les bancs d'essai")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    knowledge_parser = subparsers.add_parser("knowledge", help="Base de connaissances JSON")
+    knowledge_parser.add_argument("--passages", type=int, default=10000, help="Nombre de passages")
+    knowledge_parser.add_argument("--output", required=True, help="Fichier JSON de sortie")
+    knowledge_parser.add_argument("--seed", type=int, default=0, help="Graine du générateur")
+    messages_parser = subparsers.add_parser("messages", help="Messages de canal (un JSON par ligne)")
+    messages_parser.add_argument("--count", type=int, default=100, help="Nombre de messages")
+    messages_parser.add_argument("--seed", type=int, default=0, help="Graine du générateur")
+    args = parser.parse_args()
+
+    if args.command == "knowledge":
+        write_knowledge(synthetic_knowledge(args.passages, args.seed), args.output)
+    else:
+        for message in synthetic_messages(args.count, args.seed):
+            print(json.dumps({"message": message}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
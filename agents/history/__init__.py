@@ -0,0 +1,3 @@
+"""
+Package pour l'historique des conversations des agents.
+"""
\ No newline at end of file
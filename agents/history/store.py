@@ -0,0 +1,410 @@
+#!/usr/bin/env python
+"""
+Historique des conversations, en ajout seul et indexé.
+
+L'historique de server/conversation-history.ts est un document JSON par agent
+(conversation-history/agent-N-history.json) : chaque ajout réécrit tout le
+fichier et chaque lecture l'analyse en entier. Ici, les messages sont ajoutés
+à une table SQLite (mode WAL) indexée par agent, canal et horodatage :
+- un ajout est une seule insertion, quelle que soit la taille de l'historique ;
+- « les N derniers messages » et « les messages entre deux dates » sont lus
+  directement dans l'index, sans parcourir le reste de l'historique.
+
+La migration des fichiers JSON existants est faite une seule fois par fichier
+(les fichiers migrés sont mémorisés dans la base).
+
+Usage :
+    python agents/history/store.py migrate conversation-history
+    python agents/history/store.py tail 1 --limit 10
+"""
+
+import os
+import glob
+import json
+import sqlite3
+import contextlib
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+_repo_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HISTORY_DIR = os.path.join(_repo_dir, "conversation-history")
+DEFAULT_PATH = os.environ.get("JAMONO_HISTORY_DB", os.path.join(HISTORY_DIR, "history.sqlite"))
+
+ROLES = ("user", "assistant", "system")
+
+AgentId = Union[int, str]
+Timestamp = Union[float, str, datetime]
+
+
+def to_epoch(value: Timestamp) -> float:
+    """
+    Convertit un horodatage (secondes epoch, ISO 8601 ou datetime) en secondes epoch.
+
+    Args:
+        value (Timestamp): Horodatage ; un datetime ou une date ISO sans fuseau est en UTC
+
+    Returns:
+        float: Secondes depuis l'epoch
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def to_iso(epoch: float) -> str:
+    """
+    Convertit des secondes epoch en date ISO 8601 UTC, au format de
+    JSON.stringify(new Date()) (millisecondes et suffixe Z).
+
+    Args:
+        epoch (float): Secondes depuis l'epoch
+
+    Returns:
+        str: Date ISO 8601
+    """
+    moment = datetime.fromtimestamp(epoch, tz=timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+class HistoryStore:
+    """
+    Historique des conversations dans une base SQLite, sûr entre threads.
+    Les messages sont retournés dans l'ordre chronologique, sous la forme
+    {"id", "agent_id", "channel", "role", "content", "timestamp", "metadata"}.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """
+        Ouvre (ou crée) la base de l'historique.
+
+        Args:
+            path (str): Chemin du fichier SQLite (":memory:" pour un historique non persistant)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " agent_id TEXT NOT NULL,"
+            " channel TEXT NOT NULL DEFAULT '',"
+            " role TEXT NOT NULL,"
+            " content TEXT NOT NULL,"
+            " ts REAL NOT NULL,"
+            " metadata TEXT);"
+            "CREATE INDEX IF NOT EXISTS messages_agent_channel_ts ON messages (agent_id, channel, ts, id);"
+            "CREATE INDEX IF NOT EXISTS messages_agent_ts ON messages (agent_id, ts, id);"
+            "CREATE TABLE IF NOT EXISTS migrations ("
+            " source TEXT PRIMARY KEY,"
+            " messages INTEGER NOT NULL,"
+            " migrated REAL NOT NULL);"
+        )
+
+    @staticmethod
+    def _row(row: Sequence[Any]) -> Dict[str, Any]:
+        message_id, agent_id, channel, role, content, ts, metadata = row
+        return {
+            "id": message_id,
+            "agent_id": agent_id,
+            "channel": channel,
+            "role": role,
+            "content": content,
+            "timestamp": to_iso(ts),
+            "metadata": json.loads(metadata) if metadata else None
+        }
+
+    @staticmethod
+    def _record(agent_id: AgentId, role: str, content: str, channel: str,
+                timestamp: Optional[Timestamp], metadata: Optional[Dict[str, Any]]) -> tuple:
+        if role not in ROLES:
+            raise ValueError(f"Rôle de message non reconnu: {role}")
+        ts = to_epoch(timestamp) if timestamp is not None else datetime.now(timezone.utc).timestamp()
+        return (
+            str(agent_id), channel or "", role, content, ts,
+            json.dumps(metadata, ensure_ascii=False) if metadata else None
+        )
+
+    def append(self, agent_id: AgentId, role: str, content: str, channel: str = "",
+               timestamp: Optional[Timestamp] = None, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Ajoute un message à l'historique.
+
+        Args:
+            agent_id (AgentId): Identifiant de l'agent
+            role (str): "user", "assistant" ou "system"
+            content (str): Contenu du message
+            channel (str): Canal ou conversation ("" si l'historique n'est pas découpé par canal)
+            timestamp (Optional[Timestamp]): Horodatage (maintenant par défaut)
+            metadata (Optional[Dict[str, Any]]): Données associées (auteur, identifiant Slack...)
+
+        Returns:
+            int: Identifiant du message
+
+        Raises:
+            ValueError: Si le rôle n'est pas reconnu
+        """
+        record = self._record(agent_id, role, content, channel, timestamp, metadata)
+        with self._lock:
+            return self._db.execute(
+                "INSERT INTO messages (agent_id, channel, role, content, ts, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+                record
+            ).lastrowid
+
+    def append_many(self, messages: Iterable[Dict[str, Any]]) -> int:
+        """
+        Ajoute plusieurs messages en une transaction.
+
+        Args:
+            messages (Iterable[Dict[str, Any]]): Messages (agent_id, role, content et,
+                                                 facultativement, channel, timestamp, metadata)
+
+        Returns:
+            int: Nombre de messages ajoutés
+
+        Raises:
+            ValueError: Si un rôle n'est pas reconnu (aucun message n'est alors ajouté)
+        """
+        records = [
+            self._record(m["agent_id"], m["role"], m["content"], m.get("channel", ""),
+                         m.get("timestamp"), m.get("metadata"))
+            for m in messages
+        ]
+        with self._lock:
+            with self._transaction():
+                self._db.executemany(
+                    "INSERT INTO messages (agent_id, channel, role, content, ts, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+                    records
+                )
+        return len(records)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self._db.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _filters(self, agent_id: AgentId, channel: Optional[str], roles: Optional[Sequence[str]]):
+        clauses = ["agent_id = ?"]
+        params: List[Any] = [str(agent_id)]
+        if channel is not None:
+            clauses.append("channel = ?")
+            params.append(channel)
+        if roles:
+            clauses.append(f"role IN ({', '.join('?' * len(roles))})")
+            params.extend(roles)
+        return " AND ".join(clauses), params
+
+    def last(self, agent_id: AgentId, n: int, channel: Optional[str] = None,
+             roles: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Retourne les n derniers messages, dans l'ordre chronologique.
+
+        Args:
+            agent_id (AgentId): Identifiant de l'agent
+            n (int): Nombre de messages
+            channel (Optional[str]): Canal (None : tous les canaux)
+            roles (Optional[Sequence[str]]): Rôles retenus (None : tous)
+
+        Returns:
+            List[Dict[str, Any]]: Messages
+        """
+        if n <= 0:
+            return []
+        where, params = self._filters(agent_id, channel, roles)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT id, agent_id, channel, role, content, ts, metadata FROM messages "
+                f"WHERE {where} ORDER BY ts DESC, id DESC LIMIT ?", params + [n]
+            ).fetchall()
+        return [self._row(row) for row in reversed(rows)]
+
+    def last_exchanges(self, agent_id: AgentId, max_exchanges: int = 10,
+                       channel: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Retourne les derniers échanges (messages user et assistant), comme
+        getRecentExchanges de server/conversation-history.ts.
+
+        Args:
+            agent_id (AgentId): Identifiant de l'agent
+            max_exchanges (int): Nombre d'échanges (question et réponse)
+            channel (Optional[str]): Canal (None : tous les canaux)
+
+        Returns:
+            List[Dict[str, Any]]: Au plus 2 × max_exchanges messages
+        """
+        return self.last(agent_id, max_exchanges * 2, channel, roles=("user", "assistant"))
+
+    def range(self, agent_id: AgentId, start: Optional[Timestamp] = None, end: Optional[Timestamp] = None,
+              channel: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retourne les messages d'un intervalle de temps [start, end[, dans l'ordre chronologique.
+
+        Args:
+            agent_id (AgentId): Identifiant de l'agent
+            start (Optional[Timestamp]): Début de l'intervalle (inclus), None pour le début de l'historique
+            end (Optional[Timestamp]): Fin de l'intervalle (exclue), None pour la fin de l'historique
+            channel (Optional[str]): Canal (None : tous les canaux)
+            limit (Optional[int]): Nombre maximal de messages (les plus anciens d'abord)
+
+        Returns:
+            List[Dict[str, Any]]: Messages
+        """
+        where, params = self._filters(agent_id, channel, None)
+        if start is not None:
+            where += " AND ts >= ?"
+            params.append(to_epoch(start))
+        if end is not None:
+            where += " AND ts < ?"
+            params.append(to_epoch(end))
+        sql = f"SELECT id, agent_id, channel, role, content, ts, metadata FROM messages WHERE {where} ORDER BY ts, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [self._row(row) for row in rows]
+
+    def count(self, agent_id: AgentId, channel: Optional[str] = None) -> int:
+        """
+        Compte les messages d'un agent.
+
+        Args:
+            agent_id (AgentId): Identifiant de l'agent
+            channel (Optional[str]): Canal (None : tous les canaux)
+
+        Returns:
+            int: Nombre de messages
+        """
+        where, params = self._filters(agent_id, channel, None)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM messages WHERE {where}", params).fetchone()[0]
+
+    def channels(self, agent_id: AgentId) -> List[str]:
+        """
+        Liste les canaux d'un agent.
+
+        Args:
+            agent_id (AgentId): Identifiant de l'agent
+
+        Returns:
+            List[str]: Canaux, triés
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT channel FROM messages WHERE agent_id = ? ORDER BY channel", (str(agent_id),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self, agent_id: AgentId, channel: Optional[str] = None) -> int:
+        """
+        Efface l'historique d'un agent (ou d'un de ses canaux).
+
+        Args:
+            agent_id (AgentId): Identifiant de l'agent
+            channel (Optional[str]): Canal (None : tous les canaux)
+
+        Returns:
+            int: Nombre de messages supprimés
+        """
+        where, params = self._filters(agent_id, channel, None)
+        with self._lock:
+            return self._db.execute(f"DELETE FROM messages WHERE {where}", params).rowcount
+
+    def migrate_json(self, history_dir: str = HISTORY_DIR, channel: str = "") -> Dict[str, int]:
+        """
+        Importe les fichiers agent-N-history.json de server/conversation-history.ts.
+        Chaque fichier n'est importé qu'une fois ; les fichiers ne sont pas modifiés.
+
+        Args:
+            history_dir (str): Répertoire des fichiers d'historique
+            channel (str): Canal attribué aux messages importés
+
+        Returns:
+            Dict[str, int]: Nombre de messages importés par fichier (fichiers nouvellement migrés)
+
+        Raises:
+            ValueError: Si un fichier n'a pas le format attendu (aucun message n'est
+                        alors importé pour ce fichier)
+        """
+        migrated = {}
+        for path in sorted(glob.glob(os.path.join(history_dir, "agent-*-history.json"))):
+            source = os.path.realpath(path)
+            with self._lock:
+                done = self._db.execute("SELECT 1 FROM migrations WHERE source = ?", (source,)).fetchone()
+            if done:
+                continue
+
+            with open(path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+            if not isinstance(history, dict) or not isinstance(history.get("messages"), list):
+                raise ValueError(f"Le fichier {path} n'est pas un historique de conversation")
+            agent_id = history.get("agentId", os.path.basename(path)[len("agent-"):-len("-history.json")])
+            records = [
+                self._record(agent_id, m["role"], m["content"], channel, m.get("timestamp"), None)
+                for m in history["messages"]
+            ]
+
+            with self._lock:
+                with self._transaction():
+                    self._db.executemany(
+                        "INSERT INTO messages (agent_id, channel, role, content, ts, metadata) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", records
+                    )
+                    self._db.execute(
+                        "INSERT INTO migrations (source, messages, migrated) VALUES (?, ?, ?)",
+                        (source, len(records), datetime.now(timezone.utc).timestamp())
+                    )
+            migrated[path] = len(records)
+        return migrated
+
+    def close(self) -> None:
+        """Ferme la base."""
+        with self._lock:
+            self._db.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Historique des conversations des agents")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="Fichier SQLite de l'historique")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser("migrate", help="Importer les fichiers agent-N-history.json")
+    migrate.add_argument("history_dir", nargs="?", default=HISTORY_DIR, help="Répertoire des fichiers JSON")
+    migrate.add_argument("--channel", default="", help="Canal attribué aux messages importés")
+    tail = commands.add_parser("tail", help="Afficher les derniers messages d'un agent")
+    tail.add_argument("agent_id", help="Identifiant de l'agent")
+    tail.add_argument("--channel", help="Canal")
+    tail.add_argument("--limit", type=int, default=20, help="Nombre de messages")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.db)
+    try:
+        if args.command == "migrate":
+            migrated = store.migrate_json(args.history_dir, args.channel)
+            for path, count in migrated.items():
+                print(f"{path}: {count} message(s) importé(s)")
+            if not migrated:
+                print("Aucun nouveau fichier à importer")
+        else:
+            for message in store.last(args.agent_id, args.limit, args.channel):
+                print(json.dumps(message, ensure_ascii=False))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+"""
+Index de plus proches voisins approché (IVF) pour les vecteurs de passages.
+Les vecteurs (normalisés, similarité cosinus) sont répartis en ``n_lists``
+listes par un k-means sphérique ; une requête ne parcourt que les ``nprobe``
+listes dont le centroïde est le plus proche.
+
+Réglages :
+- n_lists : nombre de listes (≈ racine carrée du nombre de passages) ;
+- nprobe : listes parcourues par requête ; plus il est grand, meilleur est le
+  rappel et plus la requête est lente (nprobe = n_lists équivaut à la
+  recherche exacte) ;
+- iterations / sample_size : coût de l'entraînement du k-means.
+
+L'index accepte l'insertion incrémentale (chaque vecteur rejoint la liste de
+son centroïde le plus proche, sans réentraînement) et se sauvegarde dans un
+répertoire de fichiers .npy, rechargeables en mmap. Le script
+benchmarks/ann_recall.py mesure le rappel face à la recherche exacte pour
+choisir les réglages.
+"""
+
+import os
+import json
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+_ASSIGN_BATCH = 8192
+
+# Part des listes parcourues par défaut (voir benchmarks/ann_recall.py)
+DEFAULT_NPROBE_RATIO = 0.1
+
+
+class IVFIndex:
+    """
+    Index à fichiers inversés (IVF) sur des vecteurs float32 normalisés.
+    """
+
+    def __init__(self, dim: int, n_lists: int = 256, nprobe: int = 8, seed: int = 0):
+        """
+        Initialise un index vide, à entraîner avant la première insertion.
+
+        Args:
+            dim (int): Dimension des vecteurs
+            n_lists (int): Nombre de listes (centroïdes)
+            nprobe (int): Nombre de listes parcourues par requête
+            seed (int): Graine du générateur aléatoire (entraînement reproductible)
+        """
+        self.dim = dim
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._vectors: List[np.ndarray] = []
+        self._ids: List[np.ndarray] = []
+        # Insertions en attente de consolidation, par liste
+        self._pending: List[List[Tuple[np.ndarray, np.ndarray]]] = []
+        self.size = 0
+
+    @property
+    def trained(self) -> bool:
+        """Indique si les centroïdes ont été calculés."""
+        return self.centroids is not None
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), _ASSIGN_BATCH):
+            batch = vectors[start:start + _ASSIGN_BATCH]
+            labels[start:start + len(batch)] = np.argmax(batch @ self.centroids.T, axis=1)
+        return labels
+
+    def train(self, vectors: np.ndarray, iterations: int = 10, sample_size: Optional[int] = None) -> None:
+        """
+        Calcule les centroïdes par k-means sphérique sur un échantillon.
+
+        Args:
+            vectors (np.ndarray): Vecteurs d'entraînement (n, dim), normalisés
+            iterations (int): Nombre d'itérations du k-means
+            sample_size (Optional[int]): Taille de l'échantillon (64 vecteurs par liste par défaut)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rng = np.random.default_rng(self.seed)
+        n_lists = min(self.n_lists, len(vectors))
+        if n_lists == 0:
+            raise ValueError("Impossible d'entraîner l'index sans vecteurs")
+
+        sample_size = min(len(vectors), sample_size or n_lists * 64)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        self.centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = self._assign(sample)
+            order = np.argsort(labels, kind="stable")
+            counts = np.bincount(labels, minlength=n_lists)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            non_empty = counts > 0
+            sums = np.add.reduceat(sample[order], starts[non_empty], axis=0)
+
+            centroids = self.centroids.copy()
+            centroids[non_empty] = sums
+            # Les listes vides repartent d'un vecteur tiré au hasard
+            empty = np.flatnonzero(~non_empty)
+            if len(empty):
+                centroids[empty] = sample[rng.choice(sample_size, len(empty), replace=False)]
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            np.divide(centroids, norms, out=centroids, where=norms > 0)
+            self.centroids = centroids.astype(np.float32)
+
+        self.n_lists = n_lists
+        self._vectors = [np.zeros((0, self.dim), dtype=np.float32) for _ in range(n_lists)]
+        self._ids = [np.zeros(0, dtype=np.int64) for _ in range(n_lists)]
+        self._pending = [[] for _ in range(n_lists)]
+        self.size = 0
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        """
+        Insère des vecteurs dans la liste de leur centroïde le plus proche.
+
+        Args:
+            vectors (np.ndarray): Vecteurs (n, dim), normalisés
+            ids (np.ndarray): Identifiants associés (n,)
+        """
+        if not self.trained:
+            raise ValueError("L'index doit être entraîné avant l'insertion")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        ids = np.asarray(ids, dtype=np.int64)
+        labels = self._assign(vectors)
+        for list_id in np.unique(labels):
+            mask = labels == list_id
+            self._pending[list_id].append((vectors[mask], ids[mask]))
+        self.size += len(vectors)
+
+    def _list(self, list_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        pending = self._pending[list_id]
+        if pending:
+            self._vectors[list_id] = np.concatenate([self._vectors[list_id]] + [v for v, _ in pending])
+            self._ids[list_id] = np.concatenate([self._ids[list_id]] + [i for _, i in pending])
+            pending.clear()
+        return self._vectors[list_id], self._ids[list_id]
+
+    def search(self, query: np.ndarray, k: int = 5, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Recherche les k vecteurs les plus proches de la requête.
+
+        Args:
+            query (np.ndarray): Vecteur de requête (dim,), normalisé
+            k (int): Nombre de résultats
+            nprobe (Optional[int]): Listes parcourues (self.nprobe par défaut)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Identifiants et similarités, par similarité décroissante
+        """
+        if not self.trained or self.size == 0 or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        query = np.asarray(query, dtype=np.float32)
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        centroid_scores = self.centroids @ query
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        vectors, ids = [], []
+        for list_id in probes:
+            list_vectors, list_ids = self._list(int(list_id))
+            if len(list_ids):
+                vectors.append(list_vectors)
+                ids.append(list_ids)
+        if not ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        candidate_ids = np.concatenate(ids)
+        scores = np.concatenate([v @ query for v in vectors])
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        # À similarité égale, l'identifiant le plus petit d'abord (comme la recherche exacte)
+        top = top[np.lexsort((candidate_ids[top], -scores[top]))]
+        return candidate_ids[top], scores[top]
+
+    def save(self, path: str) -> None:
+        """
+        Sauvegarde l'index dans un répertoire (centroïdes, vecteurs et
+        identifiants triés par liste, positions des listes, paramètres).
+
+        Args:
+            path (str): Répertoire de destination
+        """
+        os.makedirs(path, exist_ok=True)
+        lists = [self._list(list_id) for list_id in range(self.n_lists)]
+        offsets = np.cumsum([0] + [len(list_ids) for _, list_ids in lists], dtype=np.int64)
+        np.save(os.path.join(path, "centroids.npy"), self.centroids)
+        np.save(os.path.join(path, "vectors.npy"),
+                np.concatenate([v for v, _ in lists]) if lists else np.zeros((0, self.dim), np.float32))
+        np.save(os.path.join(path, "ids.npy"),
+                np.concatenate([i for _, i in lists]) if lists else np.zeros(0, np.int64))
+        np.save(os.path.join(path, "offsets.npy"), offsets)
+        with open(os.path.join(path, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump({"dim": self.dim, "n_lists": self.n_lists, "nprobe": self.nprobe,
+                       "seed": self.seed, "size": self.size}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "IVFIndex":
+        """
+        Recharge un index sauvegardé par save().
+
+        Args:
+            path (str): Répertoire de l'index
+            mmap (bool): Projeter les vecteurs en mémoire au lieu de les lire
+
+        Returns:
+            IVFIndex: Index prêt pour la recherche et l'insertion
+        """
+        with open(os.path.join(path, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        index = cls(meta["dim"], meta["n_lists"], meta["nprobe"], meta["seed"])
+        mode = "r" if mmap else None
+        index.centroids = np.load(os.path.join(path, "centroids.npy"))
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mode)
+        ids = np.load(os.path.join(path, "ids.npy"), mmap_mode=mode)
+        offsets = np.load(os.path.join(path, "offsets.npy"))
+        index._vectors = [vectors[offsets[i]:offsets[i + 1]] for i in range(index.n_lists)]
+        index._ids = [ids[offsets[i]:offsets[i + 1]] for i in range(index.n_lists)]
+        index._pending = [[] for _ in range(index.n_lists)]
+        index.size = int(meta["size"])
+        return index
+
+
+def build_ivf(vectors: np.ndarray, n_lists: Optional[int] = None, nprobe: Optional[int] = None,
+              iterations: int = 10, seed: int = 0) -> IVFIndex:
+    """
+    Entraîne un index IVF sur des vecteurs et les y insère ; l'identifiant de
+    chaque vecteur est son numéro de ligne.
+
+    Args:
+        vectors (np.ndarray): Vecteurs (n, dim), normalisés
+        n_lists (Optional[int]): Nombre de listes (racine carrée de n par défaut)
+        nprobe (Optional[int]): Listes parcourues par requête (DEFAULT_NPROBE_RATIO de n_lists par défaut)
+        iterations (int): Nombre d'itérations du k-means
+        seed (int): Graine du générateur aléatoire
+
+    Returns:
+        IVFIndex: Index prêt pour la recherche
+    """
+    n_lists = n_lists or max(1, int(np.sqrt(len(vectors))))
+    nprobe = nprobe or max(1, int(np.ceil(n_lists * DEFAULT_NPROBE_RATIO)))
+    index = IVFIndex(vectors.shape[1], n_lists, nprobe, seed)
+    index.train(vectors, iterations)
+    index.add(vectors, np.arange(len(vectors), dtype=np.int64))
+    return index
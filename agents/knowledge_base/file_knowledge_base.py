@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+"""
+Bases de connaissances chargées depuis des fichiers de données.
+Une base de connaissances est un répertoire (ou un fichier unique) de fichiers
+JSON, YAML ou Markdown. Chaque fichier est indexé séparément (un segment) :
+lorsqu'un fichier change, seul son segment est reconstruit.
+
+Les dates de modification sont vérifiées au plus toutes les ``check_interval``
+secondes, à l'occasion d'une recherche ; les opérateurs peuvent donc mettre à
+jour les procédures sans redémarrer le processus.
+
+Formats acceptés :
+- JSON / YAML : ``{sujet: {sous_sujet: str | list | {clé: valeur}}}``, comme
+  DEVOPS_KNOWLEDGE (YAML nécessite PyYAML) ;
+- Markdown : ``# Sujet`` ouvre un sujet dont le texte qui suit forme la
+  définition ; ``## Sous-sujet`` ouvre un sous-sujet (une liste si toutes ses
+  lignes sont des puces, un texte sinon) ; les blocs de code sont rangés dans
+  le sous-sujet ``code_examples`` du sujet.
+"""
+
+import os
+import re
+import json
+import time
+import heapq
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .index import KnowledgeIndex, correct_query, tokenize
+except ImportError:
+    # Exécution directe du module
+    from index import KnowledgeIndex, correct_query, tokenize
+
+logger = logging.getLogger("agent")
+
+SUPPORTED_EXTENSIONS = (".json", ".yaml", ".yml", ".md", ".markdown")
+
+_FENCE_RE = re.compile(r"^```([\w+-]*)\s*$")
+_BULLET_RE = re.compile(r"^\s*[-*+]\s+(.*)$")
+
+
+def _slug(text: str) -> str:
+    return "_".join(tokenize(text)) or "section"
+
+
+def parse_markdown(text: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Convertit un document Markdown en base de connaissances.
+
+    Args:
+        text (str): Contenu Markdown
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Sujets extraits du document
+    """
+    knowledge: Dict[str, Dict[str, Any]] = {}
+    topic: Optional[Dict[str, Any]] = None
+    section = "definition"
+    lines: List[str] = []
+    fence: Optional[List[str]] = None
+
+    def flush() -> None:
+        if topic is None:
+            return
+        content = [line for line in lines if line.strip()]
+        if content:
+            bullets = [_BULLET_RE.match(line) for line in content]
+            if all(bullets):
+                topic[section] = [match.group(1).strip() for match in bullets]
+            else:
+                topic[section] = "\n".join(lines).strip()
+        lines.clear()
+
+    for line in text.splitlines():
+        if fence is not None:
+            if line.strip() == "```":
+                if topic is not None:
+                    examples = topic.setdefault("code_examples", {})
+                    examples[f"{_slug(section)}_{len(examples) + 1}"] = "\n".join(fence)
+                fence = None
+            else:
+                fence.append(line)
+            continue
+        if _FENCE_RE.match(line.strip()):
+            fence = []
+            continue
+        if line.startswith("# "):
+            flush()
+            topic = knowledge.setdefault(_slug(line[2:]), {})
+            section = "definition"
+        elif line.startswith("## ") and topic is not None:
+            flush()
+            section = _slug(line[3:])
+        else:
+            lines.append(line)
+    flush()
+    return knowledge
+
+
+def parse_knowledge_file(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Lit un fichier de base de connaissances selon son extension.
+
+    Args:
+        path (str): Chemin du fichier
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Sujets contenus dans le fichier
+
+    Raises:
+        ValueError: Si le contenu ou l'extension n'est pas pris en charge
+        ImportError: Si un fichier YAML est rencontré sans PyYAML installé
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    if extension == ".json":
+        knowledge = json.loads(text)
+    elif extension in (".yaml", ".yml"):
+        import yaml
+        knowledge = yaml.safe_load(text) or {}
+    elif extension in (".md", ".markdown"):
+        knowledge = parse_markdown(text)
+    else:
+        raise ValueError(f"Format de fichier non pris en charge: {path}")
+
+    if not isinstance(knowledge, dict) or not all(isinstance(v, dict) for v in knowledge.values()):
+        raise ValueError(f"Le fichier {path} doit contenir un dictionnaire de sujets")
+    return knowledge
+
+
+class FileKnowledgeBase:
+    """
+    Base de connaissances construite à partir d'un répertoire de fichiers, avec
+    rechargement à chaud. Expose la même interface que les modules de base de
+    connaissances (search_knowledge_base, search_ranked, get_all_topics) ainsi
+    que get_version(), qui change à chaque rechargement.
+    """
+
+    def __init__(self, path: str, check_interval: float = 2.0):
+        """
+        Charge la base de connaissances.
+
+        Args:
+            path (str): Répertoire de fichiers, ou fichier unique
+            check_interval (float): Délai minimal entre deux vérifications des
+                                    dates de modification, en secondes
+        """
+        self.path = os.path.abspath(path)
+        self.name = os.path.splitext(os.path.basename(self.path))[0]
+        self.check_interval = check_interval
+        self.version = 0
+        # Segment par fichier : chemin -> (mtime_ns, taille, index)
+        self._segments: Dict[str, Tuple[int, int, KnowledgeIndex]] = {}
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        # Index vectoriels par segment, construits à la première recherche vectorielle
+        self.embedder = None
+        self._vector_indexes: Dict[str, Tuple[KnowledgeIndex, Any]] = {}
+        self.refresh(force=True)
+
+    def _list_files(self) -> Dict[str, os.stat_result]:
+        if os.path.isfile(self.path):
+            return {self.path: os.stat(self.path)}
+        files = {}
+        if os.path.isdir(self.path):
+            for entry in os.scandir(self.path):
+                if entry.is_file() and entry.name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    files[entry.path] = entry.stat()
+        return files
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Recharge les fichiers ajoutés, modifiés ou supprimés depuis la dernière
+        vérification. Seuls les fichiers modifiés sont réindexés.
+
+        Args:
+            force (bool): Vérifier même si check_interval n'est pas écoulé
+
+        Returns:
+            bool: True si la base de connaissances a changé
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+
+        with self._lock:
+            if not force and now - self._last_check < self.check_interval:
+                return False
+            self._last_check = now
+
+            files = self._list_files()
+            segments = {path: segment for path, segment in self._segments.items() if path in files}
+            changed = len(segments) != len(self._segments)
+
+            for path, stat in files.items():
+                current = segments.get(path)
+                if current is not None and current[:2] == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                try:
+                    index = KnowledgeIndex(parse_knowledge_file(path))
+                except (OSError, ValueError, ImportError) as e:
+                    # On garde la version précédente du fichier en cas d'erreur
+                    logger.error("Impossible de charger la base de connaissances %s: %s", path, e)
+                    continue
+                segments[path] = (stat.st_mtime_ns, stat.st_size, index)
+                changed = True
+                logger.info("Base de connaissances %s indexée", path)
+
+            if changed:
+                self._segments = dict(sorted(segments.items()))
+                self._vector_indexes = {
+                    path: entry for path, entry in self._vector_indexes.items()
+                    if path in self._segments and self._segments[path][2] is entry[0]
+                }
+                self.version += 1
+            return changed
+
+    def _indexes(self) -> List[KnowledgeIndex]:
+        self.refresh()
+        return [index for _, _, index in self._segments.values()]
+
+    def get_version(self) -> int:
+        """
+        Retourne la version de la base de connaissances, incrémentée à chaque rechargement.
+
+        Returns:
+            int: Version courante
+        """
+        self.refresh()
+        return self.version
+
+    def get_fingerprint(self) -> str:
+        """
+        Retourne l'empreinte du contenu chargé (chemin, date de modification et
+        taille de chaque fichier), identique d'un processus à l'autre tant que
+        les fichiers ne changent pas.
+
+        Returns:
+            str: Empreinte SHA-256 hexadécimale
+        """
+        self.refresh()
+        digest = hashlib.sha256()
+        for path, (mtime_ns, size, _) in self._segments.items():
+            digest.update(f"{path}\x00{mtime_ns}\x00{size}\x00".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_all_topics(self) -> List[str]:
+        """
+        Retourne tous les sujets disponibles, dans l'ordre des fichiers.
+
+        Returns:
+            List[str]: Liste des sujets
+        """
+        topics: Dict[str, None] = {}
+        for index in self._indexes():
+            topics.update(dict.fromkeys(index.topic_names()))
+        return list(topics)
+
+    def search_knowledge_base(self, query: str, mode: str = "substring") -> Dict[str, Any]:
+        """
+        Recherche la requête dans tous les fichiers (voir knowledge_base.index).
+        Un sujet présent dans plusieurs fichiers fusionne leurs résultats. Sans
+        résultat, la recherche est refaite avec les fautes de frappe corrigées
+        d'après les termes de tous les fichiers.
+
+        Args:
+            query (str): Terme de recherche
+            mode (str): "substring" ou "term"
+
+        Returns:
+            Dict[str, Any]: Dictionnaire des résultats correspondant à la requête
+        """
+        indexes = self._indexes()
+        results: Dict[str, Any] = {}
+        for index in indexes:
+            for topic, topic_results in index.search(query, mode, fuzzy=False).items():
+                results.setdefault(topic, {}).update(topic_results)
+        if not results:
+            corrected = correct_query(query, indexes)
+            if corrected is not None:
+                return self.search_knowledge_base(corrected, mode)
+        return results
+
+    def search_ranked(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Classe les passages de tous les fichiers par score BM25, avec des
+        statistiques globales (IDF et longueur moyenne calculées sur l'ensemble).
+        Si aucun terme de la requête n'est connu, les fautes de frappe sont corrigées.
+
+        Args:
+            query (str): Requête en texte libre
+            k (int): Nombre maximal de passages à retourner
+
+        Returns:
+            List[Dict[str, Any]]: Passages triés par score décroissant
+        """
+        indexes = self._indexes()
+        passage_count = sum(index.passage_count for index in indexes)
+        if k <= 0 or not passage_count:
+            return []
+
+        average_length = sum(index.total_passage_length for index in indexes) / passage_count
+        idfs = {}
+        for term in set(tokenize(query)):
+            doc_freq = sum(index.doc_freq(term) for index in indexes)
+            if doc_freq:
+                idfs[term] = KnowledgeIndex.bm25_idf(passage_count, doc_freq)
+        if not idfs:
+            corrected = correct_query(query, indexes)
+            if corrected is not None:
+                return self.search_ranked(corrected, k)
+
+        candidates = []
+        for position, index in enumerate(indexes):
+            for unit_id, score in index.score(idfs, average_length).items():
+                candidates.append((-score, position, unit_id))
+
+        return [
+            indexes[position].passage(unit_id, round(-negative_score, 6))
+            for negative_score, position, unit_id in heapq.nsmallest(k, candidates)
+        ]
+
+    def search_vector(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Recherche les passages les plus proches de la requête par similarité
+        cosinus dans tous les fichiers (nécessite NumPy). Seuls les segments
+        rechargés sont revectorisés.
+
+        Args:
+            query (str): Requête en texte libre
+            k (int): Nombre maximal de passages à retourner
+
+        Returns:
+            List[Dict[str, Any]]: Passages triés par similarité décroissante
+        """
+        try:
+            from .vector_index import VectorIndex
+        except ImportError:
+            from vector_index import VectorIndex
+
+        self.refresh()
+        passages = []
+        for path, (_, _, index) in list(self._segments.items()):
+            entry = self._vector_indexes.get(path)
+            if entry is None or entry[0] is not index:
+                entry = (index, VectorIndex(index, self.embedder))
+                # Même verrou que le rechargement, qui reconstruit ce dictionnaire ; un segment
+                # remplacé entre-temps n'est pas mémorisé
+                with self._lock:
+                    current = self._segments.get(path)
+                    if current is not None and current[2] is index:
+                        self._vector_indexes[path] = entry
+            passages.extend(entry[1].search(query, k))
+        passages.sort(key=lambda passage: passage["score"], reverse=True)
+        return passages[:k]
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+"""
+Recherche tolérante aux fautes de frappe ("kubernets", "terrafrom", "promethus").
+
+FuzzyIndex indexe un vocabulaire (mots-clés d'un agent, termes d'une base de
+connaissances) par trigrammes de caractères des mots entourés d'une espace, avec
+leur position. Pour un mot mal orthographié, les seuls candidats sont les mots
+de longueur voisine qui partagent assez de trigrammes avec lui, à leur place à
+quelques caractères près, et dont les lettres diffèrent peu. Leur distance
+d'édition (insertion, suppression, substitution et transposition de deux
+lettres voisines) est ensuite calculée avec une borne, ce qui abandonne un
+candidat dès qu'il la dépasse.
+
+Pour borner le temps d'une recherche sur un grand vocabulaire (100 000 termes),
+un candidat à deux erreurs doit partager au moins MIN_SHARED_GRAMS trigrammes
+avec le mot, et seuls les candidats qui en partagent le plus sont examinés :
+la distance est calculée pour MAX_CANDIDATES d'entre eux au plus à chaque
+palier. Une correction rare (deux erreurs qui défont presque tous les
+trigrammes, ou un mot entouré de nombreux voisins aussi proches) peut donc
+être manquée.
+
+La distance tolérée dépend de la longueur du mot (voir max_edits) : les mots
+courts ne sont jamais corrigés, pour ne pas confondre des mots usuels.
+
+Ces recherches servent uniquement de repli, quand la correspondance exacte ne
+trouve rien.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Longueur minimale d'un mot corrigé, puis longueur à partir de laquelle deux erreurs sont tolérées
+MIN_FUZZY_LENGTH = 5
+TWO_EDITS_LENGTH = 8
+# Trigrammes qu'une opération d'édition peut modifier au plus (transposition)
+_GRAMS_PER_EDIT = 4
+# Trigrammes partagés exigés d'un candidat à deux erreurs
+MIN_SHARED_GRAMS = 2
+# Distances calculées au plus par palier, et mots examinés par distance calculée
+MAX_CANDIDATES = 32
+_SCANNED_PER_CANDIDATE = 8
+
+
+def max_edits(word: str) -> int:
+    """
+    Retourne la distance d'édition tolérée pour un mot.
+
+    Args:
+        word (str): Mot normalisé
+
+    Returns:
+        int: 0 (mot trop court), 1, ou 2 pour les mots longs
+    """
+    if len(word) < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if len(word) < TWO_EDITS_LENGTH else 2
+
+
+def bounded_distance(a: str, b: str, limit: int) -> int:
+    """
+    Calcule la distance d'édition entre deux mots (transposition de deux lettres
+    voisines comprise), sans dépasser une borne.
+
+    Args:
+        a (str): Premier mot
+        b (str): Second mot
+        limit (int): Distance maximale utile
+
+    Returns:
+        int: Distance, ou limit + 1 si elle dépasse la borne
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # Le préfixe et le suffixe communs ne changent pas la distance
+    start, end = 0, min(len(a), len(b))
+    while start < end and a[start] == b[start]:
+        start += 1
+    stop = 0
+    while stop < end - start and a[-1 - stop] == b[-1 - stop]:
+        stop += 1
+    if start or stop:
+        a, b = a[start:len(a) - stop], b[start:len(b) - stop]
+    length = len(b)
+    # Seule la bande |i - j| <= limit est calculée : les autres cases dépassent la borne
+    over = limit + 1
+    before: List[int] = []
+    previous = [j if j <= limit else over for j in range(length + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (length + 1)
+        if i <= limit:
+            current[0] = i
+        char = a[i - 1]
+        row_min = current[0]
+        for j in range(max(1, i - limit), min(length, i + limit) + 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != b[j - 1]))
+            if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            if value > over:
+                value = over
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        before, previous = previous, current
+    return previous[length]
+
+
+def _letters(word: str) -> int:
+    """
+    Retourne l'ensemble des lettres d'un mot sous forme de masque de bits.
+
+    Args:
+        word (str): Mot normalisé
+
+    Returns:
+        int: Masque (un bit par caractère, modulo 64)
+    """
+    mask = 0
+    for char in word:
+        mask |= 1 << (ord(char) & 63)
+    return mask
+
+
+class FuzzyIndex:
+    """
+    Index par trigrammes de caractères d'un vocabulaire, pour retrouver les mots
+    proches d'un mot mal orthographié. Construit une fois, en lecture seule ensuite.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        """
+        Indexe le vocabulaire.
+
+        Args:
+            words (Iterable[str]): Mots du vocabulaire (l'ordre départage les
+                                   mots à égale distance)
+        """
+        self.words: List[str] = list(dict.fromkeys(word.lower() for word in words))
+        # Identifiants internes dans l'ordre des longueurs : une plage de longueurs est une plage d'identifiants
+        order = sorted(range(len(self.words)), key=lambda index: len(self.words[index]))
+        self._ranks: List[int] = order
+        self._sorted: List[str] = [self.words[index] for index in order]
+        self._ids: Dict[str, int] = {word: word_id for word_id, word in enumerate(self._sorted)}
+        self._masks: List[int] = [_letters(word) for word in self._sorted]
+        # _starts[n] : premier identifiant d'un mot de n caractères ou plus
+        self._starts: List[int] = []
+        for word_id, word in enumerate(self._sorted):
+            while len(self._starts) <= len(word):
+                self._starts.append(word_id)
+        # Listes d'identifiants croissants par trigramme et position ("gramme" + chr(position))
+        self._grams: Dict[str, List[int]] = {}
+        for word_id, word in enumerate(self._sorted):
+            if len(word) >= MIN_FUZZY_LENGTH - 1:
+                padded = f" {word} "
+                for position in range(len(padded) - 2):
+                    self._grams.setdefault(padded[position:position + 3] + chr(position), []).append(word_id)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word.lower() in self._ids
+
+    def _first_id(self, length: int) -> int:
+        """
+        Retourne le premier identifiant d'un mot d'au moins length caractères.
+
+        Args:
+            length (int): Longueur
+
+        Returns:
+            int: Identifiant (len(self) si aucun mot n'est assez long)
+        """
+        if length <= 0:
+            return 0
+        return self._starts[length] if length < len(self._starts) else len(self._sorted)
+
+    def lookup(self, word: str, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Retourne les mots du vocabulaire les plus proches d'un mot. Les distances
+        sont essayées dans l'ordre croissant : les candidats d'une distance ne
+        sont examinés que si aucun mot n'est trouvé à une distance plus faible.
+
+        Args:
+            word (str): Mot recherché
+            max_distance (Optional[int]): Distance d'édition maximale (max_edits(word) par défaut)
+
+        Returns:
+            List[Tuple[str, int]]: (mot, distance) à la plus petite distance trouvée,
+                                   dans l'ordre du vocabulaire
+        """
+        word = word.lower()
+        if max_distance is None:
+            max_distance = max_edits(word)
+        if word in self._ids:
+            return [(word, 0)]
+        if max_distance <= 0:
+            return []
+
+        padded = f" {word} "
+        word_grams = [padded[position:position + 3] for position in range(len(padded) - 2)]
+        word_mask = _letters(word)
+        masks = self._masks
+        for limit in range(1, max_distance + 1):
+            # Seuls les mots de longueur voisine sont candidats, et chaque opération
+            # d'édition décale les trigrammes suivants d'une position au plus
+            low, high = self._first_id(len(word) - limit), self._first_id(len(word) + limit + 1)
+            postings = []
+            for position, gram in enumerate(word_grams):
+                for shifted in range(max(0, position - limit), position + limit + 1):
+                    ids = self._grams.get(gram + chr(shifted))
+                    if ids:
+                        first, last = bisect_left(ids, low), bisect_left(ids, high)
+                        if first < last:
+                            postings.append(ids[first:last])
+            shared = Counter(chain.from_iterable(postings))
+
+            # Chaque opération d'édition modifie au plus _GRAMS_PER_EDIT trigrammes
+            # et ajoute ou retire au plus une lettre
+            threshold = len(word_grams) - _GRAMS_PER_EDIT * limit
+            if limit > 1:
+                threshold = max(threshold, MIN_SHARED_GRAMS)
+            # Trop de mots partagent les trigrammes courants (suffixes) : seuls ceux qui en partagent le plus sont examinés
+            histogram = Counter(shared.values())
+            kept = sum(number for count, number in histogram.items() if count >= threshold)
+            while kept > _SCANNED_PER_CANDIDATE * MAX_CANDIDATES and histogram.get(threshold, 0) < kept:
+                kept -= histogram.get(threshold, 0)
+                threshold += 1
+            candidates = []
+            for word_id in [word_id for word_id, count in shared.items() if count >= threshold]:
+                # Au plus limit lettres manquantes et limit lettres en trop (bit de poids faible retiré à chaque tour)
+                missing = word_mask & ~masks[word_id]
+                extra = masks[word_id] & ~word_mask
+                for _ in range(limit):
+                    missing &= missing - 1
+                    extra &= extra - 1
+                if not missing and not extra:
+                    candidates.append(word_id)
+            if len(candidates) > MAX_CANDIDATES:
+                candidates.sort(key=shared.__getitem__, reverse=True)
+                del candidates[MAX_CANDIDATES:]
+
+            matches = []
+            for word_id in candidates:
+                distance = bounded_distance(word, self._sorted[word_id], limit)
+                if distance <= limit:
+                    matches.append((distance, self._ranks[word_id]))
+            if matches:
+                matches.sort()
+                return [(self.words[rank], distance) for distance, rank in matches]
+        return []
+
+    def correct(self, word: str, max_distance: Optional[int] = None) -> Optional[str]:
+        """
+        Retourne le mot du vocabulaire le plus proche d'un mot.
+
+        Args:
+            word (str): Mot recherché
+            max_distance (Optional[int]): Distance d'édition maximale (max_edits(word) par défaut)
+
+        Returns:
+            Optional[str]: Mot le plus proche, ou None si aucun n'est assez proche
+        """
+        matches = self.lookup(word, max_distance)
+        return matches[0][0] if matches else None
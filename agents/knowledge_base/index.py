@@ -0,0 +1,527 @@
+#!/usr/bin/env python
+"""
+Index inversé pour les bases de connaissances des agents.
+La base de connaissances est découpée une seule fois en unités de recherche
+(sujet, sous-sujet, entrée), normalisées en minuscules, puis indexée par
+trigrammes de caractères et par termes.
+
+Deux modes de recherche sont proposés :
+- "substring" (par défaut) : mêmes résultats que la recherche historique par
+  sous-chaîne ; les trigrammes de la requête sélectionnent les candidats, qui
+  sont ensuite vérifiés avec l'opérateur ``in``. Les requêtes de moins de
+  trois caractères n'ont pas de trigramme et vérifient toutes les unités.
+- "term" : la requête est découpée en mots et une unité correspond si elle
+  contient chacun de ces mots en entier (pas de correspondance à l'intérieur
+  d'un mot). Ce mode ne lit que les listes de postings.
+
+Les algorithmes de recherche (BaseKnowledgeIndex) sont indépendants du
+stockage : KnowledgeIndex garde l'index en mémoire, tandis que
+knowledge_base.kbpack le lit depuis un fichier projeté en mémoire (mmap).
+
+Le classement (``rank``) attribue un score BM25 aux passages, c'est-à-dire aux
+unités de type sous-sujet et entrée ; les unités de sujet, qui reprennent la
+définition, n'en font pas partie pour éviter les doublons.
+
+Quand une recherche ou un classement ne trouve rien, les termes de la requête
+absents de l'index sont corrigés vers le terme connu le plus proche (fautes de
+frappe, voir knowledge_base.fuzzy) et la recherche est refaite une fois.
+"""
+
+import re
+import math
+import heapq
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Sequence
+
+# Types d'unités de recherche
+UNIT_TOPIC = 0
+UNIT_SUBTOPIC = 1
+UNIT_ENTRY = 2
+
+SEARCH_MODES = ("substring", "term")
+
+# Paramètres BM25
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Découpe un texte en termes normalisés (minuscules, alphanumériques).
+
+    Args:
+        text (str): Texte à découper
+
+    Returns:
+        List[str]: Termes du texte, dans l'ordre d'apparition
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+def trigrams(text: str) -> Iterable[str]:
+    """
+    Retourne les trigrammes de caractères d'un texte déjà normalisé.
+
+    Args:
+        text (str): Texte en minuscules
+
+    Returns:
+        Iterable[str]: Trigrammes distincts du texte
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class BaseKnowledgeIndex:
+    """
+    Algorithmes de recherche communs aux index de bases de connaissances.
+    Les classes dérivées fournissent l'accès aux unités, aux postings et aux valeurs.
+
+    Chaque unité est identifiée par (sujet, sous-sujet, clé) :
+    - (sujet, None, None) pour le nom du sujet et sa définition ;
+    - (sujet, sous_sujet, None) pour un sous-sujet de type chaîne ou liste ;
+    - (sujet, sous_sujet, clé) pour une entrée d'un sous-sujet de type dictionnaire.
+    """
+
+    unit_count = 0
+    passage_count = 0
+    total_passage_length = 0
+
+    def unit(self, unit_id: int) -> Tuple[str, Optional[str], Optional[str]]:
+        """Retourne (sujet, sous-sujet, clé) d'une unité."""
+        raise NotImplementedError
+
+    def kind(self, unit_id: int) -> int:
+        """Retourne le type d'une unité (UNIT_TOPIC, UNIT_SUBTOPIC ou UNIT_ENTRY)."""
+        raise NotImplementedError
+
+    def length(self, unit_id: int) -> int:
+        """Retourne le nombre de termes d'une unité."""
+        raise NotImplementedError
+
+    def gram_postings(self, gram: str) -> Optional[Sequence[int]]:
+        """Retourne les unités contenant un trigramme, ou None."""
+        raise NotImplementedError
+
+    def term_postings(self, term: str) -> Optional[Sequence[Tuple[int, int]]]:
+        """Retourne les couples (unité, fréquence) d'un terme, ou None."""
+        raise NotImplementedError
+
+    def doc_freq(self, term: str) -> int:
+        """Retourne le nombre de passages contenant un terme."""
+        raise NotImplementedError
+
+    def verify(self, unit_ids: Iterable[int], query: str) -> List[int]:
+        """Retourne, triées, les unités dont un des textes contient la requête."""
+        raise NotImplementedError
+
+    def topic_value(self, topic: str) -> Dict[str, Any]:
+        """Retourne les données complètes d'un sujet."""
+        raise NotImplementedError
+
+    def unit_value(self, unit_id: int) -> Any:
+        """Retourne la valeur d'une unité (la définition pour une unité de sujet)."""
+        raise NotImplementedError
+
+    def topic_names(self) -> List[str]:
+        """Retourne les noms des sujets, dans l'ordre de la base de connaissances."""
+        raise NotImplementedError
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Retourne la base de connaissances complète."""
+        raise NotImplementedError
+
+    def terms(self) -> Iterable[str]:
+        """Retourne tous les termes de l'index."""
+        raise NotImplementedError
+
+    # Index des termes pour la correction des fautes de frappe, construit au premier repli
+    _fuzzy = None
+
+    def fuzzy_terms(self) -> Any:
+        """
+        Retourne l'index par trigrammes des termes (FuzzyIndex), construit une
+        seule fois, à la première correction.
+
+        Returns:
+            FuzzyIndex: Index des termes
+        """
+        if self._fuzzy is None:
+            try:
+                from .fuzzy import FuzzyIndex
+            except ImportError:
+                from fuzzy import FuzzyIndex
+            self._fuzzy = FuzzyIndex(self.terms())
+        return self._fuzzy
+
+    def correct(self, query: str) -> Optional[str]:
+        """
+        Corrige les termes de la requête absents de l'index.
+
+        Args:
+            query (str): Requête
+
+        Returns:
+            Optional[str]: Requête corrigée (en minuscules), ou None si aucun terme n'a été corrigé
+        """
+        return correct_query(query, [self])
+
+    def _substring_matches(self, query: str) -> List[int]:
+        """
+        Retourne les unités dont un des textes contient la requête.
+        """
+        query_grams = trigrams(query)
+        if query_grams:
+            gram_lists = []
+            for gram in query_grams:
+                posting = self.gram_postings(gram)
+                if posting is None:
+                    return []
+                gram_lists.append(posting)
+            gram_lists.sort(key=len)
+            candidates = set(gram_lists[0])
+            for posting in gram_lists[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    return []
+        else:
+            candidates = range(self.unit_count)
+
+        return self.verify(candidates, query)
+
+    def _term_matches(self, query: str) -> List[int]:
+        """
+        Retourne les unités contenant tous les termes de la requête.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        term_lists = []
+        for term in terms:
+            posting = self.term_postings(term)
+            if posting is None:
+                return []
+            term_lists.append(posting)
+        term_lists.sort(key=len)
+        matches = {unit_id for unit_id, _ in term_lists[0]}
+        for posting in term_lists[1:]:
+            matches.intersection_update(unit_id for unit_id, _ in posting)
+        return sorted(matches)
+
+    def match(self, query: str, mode: str = "substring") -> List[int]:
+        """
+        Retourne les identifiants des unités correspondant à la requête, dans
+        l'ordre de la base de connaissances.
+
+        Args:
+            query (str): Terme de recherche
+            mode (str): "substring" ou "term"
+
+        Returns:
+            List[int]: Identifiants des unités correspondantes
+
+        Raises:
+            ValueError: Si le mode de recherche n'est pas reconnu
+        """
+        if mode == "substring":
+            return self._substring_matches(query.lower())
+        if mode == "term":
+            return self._term_matches(query)
+        raise ValueError(f"Mode de recherche non reconnu: {mode}")
+
+    def search(self, query: str, mode: str = "substring", fuzzy: bool = True) -> Dict[str, Any]:
+        """
+        Recherche la requête et regroupe les unités trouvées par sujet, avec la
+        même structure de résultat que la recherche historique.
+
+        Args:
+            query (str): Terme de recherche
+            mode (str): "substring" ou "term"
+            fuzzy (bool): Sans résultat, refaire la recherche avec les fautes de frappe corrigées
+
+        Returns:
+            Dict[str, Any]: Dictionnaire des résultats correspondant à la requête
+        """
+        results: Dict[str, Any] = {}
+        matched_topics = set()
+
+        unit_ids = self.match(query, mode)
+        if not unit_ids and fuzzy:
+            corrected = self.correct(query)
+            if corrected is not None:
+                unit_ids = self.match(corrected, mode)
+
+        for unit_id in unit_ids:
+            topic, subtopic, key = self.unit(unit_id)
+            kind = self.kind(unit_id)
+            if kind == UNIT_TOPIC:
+                # Le sujet entier correspond : ses sous-sujets n'ont pas à être ajoutés
+                results[topic] = self.topic_value(topic)
+                matched_topics.add(topic)
+                continue
+            if topic in matched_topics:
+                continue
+
+            topic_results = results.setdefault(topic, {})
+            if kind == UNIT_SUBTOPIC:
+                topic_results[subtopic] = self.unit_value(unit_id)
+            else:
+                topic_results.setdefault(subtopic, {})[key] = self.unit_value(unit_id)
+
+        return results
+
+    def passage(self, unit_id: int, score: float = 0.0) -> Dict[str, Any]:
+        """
+        Construit la représentation d'un passage à partir d'une unité.
+
+        Args:
+            unit_id (int): Identifiant de l'unité
+            score (float): Score du passage
+
+        Returns:
+            Dict[str, Any]: Passage avec topic, subtopic, key, score et content
+        """
+        topic, subtopic, key = self.unit(unit_id)
+        return {
+            "topic": topic,
+            "subtopic": subtopic,
+            "key": key,
+            "score": score,
+            "content": self.unit_value(unit_id)
+        }
+
+    @staticmethod
+    def bm25_idf(passage_count: int, doc_freq: int) -> float:
+        """
+        Calcule l'IDF BM25 d'un terme.
+
+        Args:
+            passage_count (int): Nombre total de passages
+            doc_freq (int): Nombre de passages contenant le terme
+
+        Returns:
+            float: Inverse document frequency
+        """
+        return math.log(1 + (passage_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def idf(self, term: str) -> float:
+        """
+        Retourne l'IDF BM25 d'un terme d'après les statistiques de cet index.
+
+        Args:
+            term (str): Terme normalisé
+
+        Returns:
+            float: Inverse document frequency
+        """
+        return self.bm25_idf(self.passage_count, self.doc_freq(term))
+
+    def score(self, idfs: Dict[str, float], average_length: float) -> Dict[int, float]:
+        """
+        Calcule le score BM25 des passages contenant au moins un des termes.
+        Les statistiques (IDF, longueur moyenne) sont fournies par l'appelant,
+        ce qui permet de classer ensemble plusieurs index (segments).
+
+        Args:
+            idfs (Dict[str, float]): IDF de chaque terme de la requête
+            average_length (float): Longueur moyenne des passages
+
+        Returns:
+            Dict[int, float]: Score par identifiant d'unité
+        """
+        scores: Dict[int, float] = {}
+        for term, idf in idfs.items():
+            posting = self.term_postings(term)
+            if posting is None:
+                continue
+            for unit_id, count in posting:
+                if self.kind(unit_id) == UNIT_TOPIC:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.length(unit_id) / average_length)
+                scores[unit_id] = scores.get(unit_id, 0.0) + idf * count * (BM25_K1 + 1) / (count + norm)
+        return scores
+
+    def rank(self, query: str, k: int = 5, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """
+        Classe les passages par score BM25 et retourne les k meilleurs.
+
+        Args:
+            query (str): Requête en texte libre
+            k (int): Nombre maximal de passages à retourner
+            fuzzy (bool): Sans résultat, refaire le classement avec les fautes de frappe corrigées
+
+        Returns:
+            List[Dict[str, Any]]: Passages triés par score décroissant
+        """
+        if k <= 0 or not self.passage_count:
+            return []
+
+        average_length = self.total_passage_length / self.passage_count
+        scores = self.score({term: self.idf(term) for term in set(tokenize(query))}, average_length)
+        if not scores and fuzzy:
+            corrected = self.correct(query)
+            if corrected is not None:
+                scores = self.score({term: self.idf(term) for term in set(tokenize(corrected))}, average_length)
+
+        # À score égal, l'ordre de la base de connaissances départage les passages
+        best = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [self.passage(unit_id, round(score, 6)) for unit_id, score in best]
+
+
+def correct_query(query: str, indexes: Sequence[BaseKnowledgeIndex]) -> Optional[str]:
+    """
+    Remplace les termes de la requête absents de tous les index par le terme
+    connu le plus proche (distance d'édition bornée, puis terme le plus fréquent,
+    puis ordre alphabétique : le résultat ne dépend pas de l'ordre de parcours
+    des termes, qui diffère entre un index en mémoire et un fichier .kbpack).
+    Le reste de la requête (ponctuation, termes connus) est conservé.
+
+    Args:
+        query (str): Requête
+        indexes (Sequence[BaseKnowledgeIndex]): Index consultés (segments d'une même base)
+
+    Returns:
+        Optional[str]: Requête corrigée (en minuscules), ou None si aucun terme n'a été corrigé
+    """
+    changed = False
+
+    def replace(match: "re.Match") -> str:
+        nonlocal changed
+        term = match.group(0)
+        if any(index.term_postings(term) is not None for index in indexes):
+            return term
+        best: Optional[Tuple[int, int, str]] = None
+        for index in indexes:
+            for candidate, distance in index.fuzzy_terms().lookup(term):
+                key = (distance, -sum(other.doc_freq(candidate) for other in indexes), candidate)
+                if best is None or key < best:
+                    best = key
+        if best is None:
+            return term
+        changed = True
+        return best[2]
+
+    corrected = _TOKEN_RE.sub(replace, query.lower())
+    return corrected if changed else None
+
+
+class KnowledgeIndex(BaseKnowledgeIndex):
+    """
+    Index en mémoire d'une base de connaissances structurée en
+    ``{sujet: {sous_sujet: str | list | {clé: valeur}}}``.
+    """
+
+    def __init__(self, knowledge: Dict[str, Dict[str, Any]]):
+        """
+        Construit l'index à partir d'une base de connaissances.
+
+        Args:
+            knowledge (Dict[str, Dict[str, Any]]): Base de connaissances à indexer
+        """
+        self.knowledge = knowledge
+        self.units: List[Tuple[str, Optional[str], Optional[str]]] = []
+        self.kinds: List[int] = []
+        self.haystacks: List[Tuple[str, ...]] = []
+        self.grams: Dict[str, List[int]] = {}
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+        self.doc_freqs: Dict[str, int] = {}
+        self.passage_count = 0
+        self.total_passage_length = 0
+
+        for topic, topic_data in knowledge.items():
+            definition = topic_data.get("definition")
+            topic_texts = [topic]
+            if isinstance(definition, str):
+                topic_texts.append(definition)
+            self._add_unit(UNIT_TOPIC, topic, None, None, topic_texts)
+
+            for subtopic, subtopic_data in topic_data.items():
+                if isinstance(subtopic_data, (str, list)):
+                    # str(list) reproduit la recherche historique sur les listes
+                    self._add_unit(UNIT_SUBTOPIC, topic, subtopic, None,
+                                   [subtopic, str(subtopic_data)])
+                elif isinstance(subtopic_data, dict):
+                    for key, value in subtopic_data.items():
+                        texts = [key]
+                        if isinstance(value, str):
+                            texts.append(value)
+                        elif isinstance(value, list):
+                            texts.extend(str(item) for item in value)
+                        self._add_unit(UNIT_ENTRY, topic, subtopic, key, texts)
+
+    @property
+    def unit_count(self) -> int:
+        return len(self.units)
+
+    def _add_unit(self, kind: int, topic: str, subtopic: Optional[str], key: Optional[str],
+                  texts: List[str]) -> None:
+        """
+        Normalise une unité et l'ajoute aux index de trigrammes et de termes.
+        """
+        unit_id = len(self.units)
+        haystack = tuple(text.lower() for text in texts)
+        self.units.append((topic, subtopic, key))
+        self.kinds.append(kind)
+        self.haystacks.append(haystack)
+
+        unit_grams = set()
+        term_counts: Dict[str, int] = {}
+        for text in haystack:
+            unit_grams.update(trigrams(text))
+            for term in tokenize(text):
+                term_counts[term] = term_counts.get(term, 0) + 1
+
+        for gram in unit_grams:
+            self.grams.setdefault(gram, []).append(unit_id)
+        for term, count in term_counts.items():
+            self.postings.setdefault(term, []).append((unit_id, count))
+        self.lengths.append(sum(term_counts.values()))
+
+        if kind != UNIT_TOPIC:
+            self.passage_count += 1
+            self.total_passage_length += self.lengths[-1]
+            for term in term_counts:
+                self.doc_freqs[term] = self.doc_freqs.get(term, 0) + 1
+
+    def unit(self, unit_id: int) -> Tuple[str, Optional[str], Optional[str]]:
+        return self.units[unit_id]
+
+    def kind(self, unit_id: int) -> int:
+        return self.kinds[unit_id]
+
+    def length(self, unit_id: int) -> int:
+        return self.lengths[unit_id]
+
+    def gram_postings(self, gram: str) -> Optional[Sequence[int]]:
+        return self.grams.get(gram)
+
+    def term_postings(self, term: str) -> Optional[Sequence[Tuple[int, int]]]:
+        return self.postings.get(term)
+
+    def doc_freq(self, term: str) -> int:
+        return self.doc_freqs.get(term, 0)
+
+    def verify(self, unit_ids: Iterable[int], query: str) -> List[int]:
+        haystacks = self.haystacks
+        return sorted(i for i in unit_ids if any(query in text for text in haystacks[i]))
+
+    def topic_value(self, topic: str) -> Dict[str, Any]:
+        return self.knowledge[topic]
+
+    def unit_value(self, unit_id: int) -> Any:
+        topic, subtopic, key = self.units[unit_id]
+        if subtopic is None:
+            return self.knowledge[topic].get("definition")
+        if key is None:
+            return self.knowledge[topic][subtopic]
+        return self.knowledge[topic][subtopic][key]
+
+    def topic_names(self) -> List[str]:
+        return list(self.knowledge)
+
+    def terms(self) -> Iterable[str]:
+        return list(self.postings)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return self.knowledge
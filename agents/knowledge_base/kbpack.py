@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+"""
+Format binaire compact des bases de connaissances (fichiers .kbpack).
+Une base de connaissances est compilée une fois, hors ligne, en un fichier qui
+contient une table de chaînes, une table des sujets, les unités de recherche et
+l'index prébâti (trigrammes et termes). À l'exécution, le fichier est projeté
+en mémoire (mmap) en lecture seule : seuls les sujets et les valeurs touchés
+par une requête sont décodés, et plusieurs processus partagent les mêmes pages
+via le cache du système.
+
+Construction :
+    python -m knowledge_base.kbpack build knowledge_base.devops_knowledge_data:DEVOPS_KNOWLEDGE \\
+        knowledge_base/devops_knowledge.kbpack
+
+Disposition du fichier (petit-boutiste) :
+- en-tête (HEADER) : signature, version, compteurs, empreinte de la source et
+  position de chaque section ;
+- chaînes : positions (u64) puis contenu UTF-8 (noms, textes normalisés) ;
+- sujets : (chaîne du nom, position et taille du JSON du sujet) ;
+- unités : (sujet, sous-sujet, clé, type, textes, position et taille du JSON de
+  la valeur, nombre de termes) ;
+- trigrammes et termes : tables triées (recherche dichotomique) vers des listes
+  de postings u32 ;
+- données : valeurs JSON des sujets et des unités.
+"""
+
+import os
+import json
+import mmap
+import struct
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from .index import BaseKnowledgeIndex, KnowledgeIndex
+except ImportError:
+    # Exécution directe du module
+    from index import BaseKnowledgeIndex, KnowledgeIndex
+
+MAGIC = b"JKBP"
+FORMAT_VERSION = 1
+NO_STRING = 0xFFFFFFFF
+
+SECTIONS = (
+    "string_offsets", "string_data", "topics", "units", "haystacks",
+    "gram_table", "gram_postings", "term_table", "term_postings", "data"
+)
+
+# signature, version, chaînes, sujets, unités, trigrammes, termes, passages,
+# longueur totale des passages, empreinte de la source, positions des sections
+HEADER = struct.Struct("<4sI5IIQ32s" + "Q" * len(SECTIONS))
+TOPIC_RECORD = struct.Struct("<IQI")
+UNIT_RECORD = struct.Struct("<IIIBIIQII")
+GRAM_RECORD = struct.Struct("<IQI")
+TERM_RECORD = struct.Struct("<IQII")
+
+
+def source_digest(path: str) -> bytes:
+    """
+    Calcule l'empreinte SHA-256 du fichier source d'une base de connaissances.
+
+    Args:
+        path (str): Chemin du fichier source
+
+    Returns:
+        bytes: Empreinte (32 octets)
+    """
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def _json_bytes(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_pack(knowledge: Dict[str, Dict[str, Any]], output_path: str, digest: bytes = b"") -> None:
+    """
+    Compile une base de connaissances dans un fichier .kbpack.
+    Le fichier est écrit à côté de la destination puis renommé, ce qui rend le
+    remplacement atomique pour les lecteurs.
+
+    Args:
+        knowledge (Dict[str, Dict[str, Any]]): Base de connaissances à compiler
+        output_path (str): Chemin du fichier à produire
+        digest (bytes): Empreinte de la source, vérifiée au chargement
+    """
+    index = KnowledgeIndex(knowledge)
+
+    strings: List[bytes] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(text: Optional[str]) -> int:
+        if text is None:
+            return NO_STRING
+        sid = string_ids.get(text)
+        if sid is None:
+            sid = len(strings)
+            string_ids[text] = sid
+            strings.append(text.encode("utf-8"))
+        return sid
+
+    data = bytearray()
+
+    def store(value: Any) -> Tuple[int, int]:
+        encoded = _json_bytes(value)
+        offset = len(data)
+        data.extend(encoded)
+        return offset, len(encoded)
+
+    topic_ids: Dict[str, int] = {}
+    topics = bytearray()
+    for topic, topic_data in knowledge.items():
+        topic_ids[topic] = len(topic_ids)
+        offset, size = store(topic_data)
+        topics += TOPIC_RECORD.pack(intern(topic), offset, size)
+
+    units = bytearray()
+    haystacks: List[int] = []
+    for unit_id in range(index.unit_count):
+        topic, subtopic, key = index.unit(unit_id)
+        offset, size = store(index.unit_value(unit_id))
+        hay_start = len(haystacks)
+        haystacks.extend(intern(text) for text in index.haystacks[unit_id])
+        units += UNIT_RECORD.pack(topic_ids[topic], intern(subtopic), intern(key), index.kind(unit_id),
+                                  hay_start, len(haystacks) - hay_start, offset, size, index.length(unit_id))
+
+    gram_table = bytearray()
+    gram_postings: List[int] = []
+    for gram in sorted(index.grams, key=lambda g: g.encode("utf-8")):
+        posting = index.grams[gram]
+        gram_table += GRAM_RECORD.pack(intern(gram), len(gram_postings), len(posting))
+        gram_postings.extend(posting)
+
+    term_table = bytearray()
+    term_postings: List[int] = []
+    for term in sorted(index.postings, key=lambda t: t.encode("utf-8")):
+        posting = index.postings[term]
+        term_table += TERM_RECORD.pack(intern(term), len(term_postings) // 2, len(posting), index.doc_freq(term))
+        for unit_id, count in posting:
+            term_postings.extend((unit_id, count))
+
+    string_offsets = [0]
+    for encoded in strings:
+        string_offsets.append(string_offsets[-1] + len(encoded))
+
+    sections = [
+        struct.pack(f"<{len(string_offsets)}Q", *string_offsets),
+        b"".join(strings),
+        bytes(topics),
+        bytes(units),
+        struct.pack(f"<{len(haystacks)}I", *haystacks),
+        bytes(gram_table),
+        struct.pack(f"<{len(gram_postings)}I", *gram_postings),
+        bytes(term_table),
+        struct.pack(f"<{len(term_postings)}I", *term_postings),
+        bytes(data)
+    ]
+
+    positions = []
+    position = HEADER.size
+    for section in sections:
+        positions.append(position)
+        position += len(section)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(strings), len(topic_ids), index.unit_count,
+                         len(index.grams), len(index.postings), index.passage_count,
+                         index.total_passage_length, digest.ljust(32, b"\0")[:32], *positions)
+
+    temp_path = f"{output_path}.tmp{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        for section in sections:
+            f.write(section)
+    os.replace(temp_path, output_path)
+
+
+class PackedKnowledgeIndex(BaseKnowledgeIndex):
+    """
+    Index d'une base de connaissances lu depuis un fichier .kbpack projeté en mémoire.
+    Offre les mêmes recherches que KnowledgeIndex (search, rank, match).
+    """
+
+    def __init__(self, path: str):
+        """
+        Ouvre et projette en mémoire un fichier .kbpack.
+
+        Args:
+            path (str): Chemin du fichier
+
+        Raises:
+            ValueError: Si le fichier n'est pas un .kbpack d'une version prise en charge
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        fields = HEADER.unpack_from(self._mm, 0)
+        magic, version = fields[0], fields[1]
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"Fichier de base de connaissances non reconnu: {path}")
+
+        (self.string_count, self.topic_count, self.unit_count, self.gram_count,
+         self.term_count, self.passage_count, self.total_passage_length) = fields[2:9]
+        self.digest = fields[9]
+        self._sections = dict(zip(SECTIONS, fields[10:]))
+        self._topic_ids: Optional[Dict[str, int]] = None
+
+    def close(self) -> None:
+        """Libère la projection mémoire."""
+        self._mm.close()
+
+    def _string_bounds(self, sid: int) -> Tuple[int, int]:
+        start, end = struct.unpack_from("<QQ", self._mm, self._sections["string_offsets"] + 8 * sid)
+        base = self._sections["string_data"]
+        return base + start, base + end
+
+    def _string(self, sid: int) -> Optional[str]:
+        if sid == NO_STRING:
+            return None
+        start, end = self._string_bounds(sid)
+        return self._mm[start:end].decode("utf-8")
+
+    def _data(self, offset: int, size: int) -> Any:
+        start = self._sections["data"] + offset
+        return json.loads(self._mm[start:start + size].decode("utf-8"))
+
+    def _unit_record(self, unit_id: int) -> tuple:
+        return UNIT_RECORD.unpack_from(self._mm, self._sections["units"] + UNIT_RECORD.size * unit_id)
+
+    def _topic_record(self, topic_id: int) -> tuple:
+        return TOPIC_RECORD.unpack_from(self._mm, self._sections["topics"] + TOPIC_RECORD.size * topic_id)
+
+    def _lookup(self, section: str, record: struct.Struct, count: int, key: str) -> Optional[tuple]:
+        """
+        Recherche dichotomique d'une clé dans une table triée par octets UTF-8.
+        """
+        encoded = key.encode("utf-8")
+        base = self._sections[section]
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            fields = record.unpack_from(self._mm, base + record.size * middle)
+            start, end = self._string_bounds(fields[0])
+            current = self._mm[start:end]
+            if current == encoded:
+                return fields
+            if current < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def topic_names(self) -> List[str]:
+        """
+        Retourne les noms des sujets, dans l'ordre de la base de connaissances.
+
+        Returns:
+            List[str]: Noms des sujets
+        """
+        if self._topic_ids is None:
+            self._topic_ids = {
+                self._string(self._topic_record(topic_id)[0]): topic_id
+                for topic_id in range(self.topic_count)
+            }
+        return list(self._topic_ids)
+
+    def unit(self, unit_id: int) -> Tuple[str, Optional[str], Optional[str]]:
+        topic_id, subtopic_sid, key_sid = self._unit_record(unit_id)[:3]
+        return self._string(self._topic_record(topic_id)[0]), self._string(subtopic_sid), self._string(key_sid)
+
+    def kind(self, unit_id: int) -> int:
+        return self._mm[self._sections["units"] + UNIT_RECORD.size * unit_id + 12]
+
+    def length(self, unit_id: int) -> int:
+        return self._unit_record(unit_id)[8]
+
+    def gram_postings(self, gram: str) -> Optional[Sequence[int]]:
+        fields = self._lookup("gram_table", GRAM_RECORD, self.gram_count, gram)
+        if fields is None:
+            return None
+        _, offset, count = fields
+        return struct.unpack_from(f"<{count}I", self._mm, self._sections["gram_postings"] + 4 * offset)
+
+    def term_postings(self, term: str) -> Optional[Sequence[Tuple[int, int]]]:
+        fields = self._lookup("term_table", TERM_RECORD, self.term_count, term)
+        if fields is None:
+            return None
+        _, offset, count, _ = fields
+        values = struct.unpack_from(f"<{2 * count}I", self._mm, self._sections["term_postings"] + 8 * offset)
+        return list(zip(values[0::2], values[1::2]))
+
+    def doc_freq(self, term: str) -> int:
+        fields = self._lookup("term_table", TERM_RECORD, self.term_count, term)
+        return fields[3] if fields is not None else 0
+
+    def terms(self) -> Iterable[str]:
+        base = self._sections["term_table"]
+        return [self._string(TERM_RECORD.unpack_from(self._mm, base + TERM_RECORD.size * term_id)[0])
+                for term_id in range(self.term_count)]
+
+    def verify(self, unit_ids: Iterable[int], query: str) -> List[int]:
+        # La recherche d'une sous-chaîne UTF-8 valide sur les octets équivaut à la
+        # recherche sur le texte décodé, sans copier ni décoder les textes
+        encoded = query.encode("utf-8")
+        haystacks = self._sections["haystacks"]
+        matches = []
+        for unit_id in unit_ids:
+            hay_start, hay_count = self._unit_record(unit_id)[4:6]
+            sids = struct.unpack_from(f"<{hay_count}I", self._mm, haystacks + 4 * hay_start)
+            for sid in sids:
+                start, end = self._string_bounds(sid)
+                if self._mm.find(encoded, start, end) != -1:
+                    matches.append(unit_id)
+                    break
+        matches.sort()
+        return matches
+
+    def topic_value(self, topic: str) -> Dict[str, Any]:
+        if self._topic_ids is None:
+            self.topic_names()
+        _, offset, size = self._topic_record(self._topic_ids[topic])
+        return self._data(offset, size)
+
+    def unit_value(self, unit_id: int) -> Any:
+        record = self._unit_record(unit_id)
+        return self._data(record[6], record[7])
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Décode la base de connaissances complète.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Tous les sujets et leurs données
+        """
+        return {topic: self.topic_value(topic) for topic in self.topic_names()}
+
+
+def open_pack(path: str, expected_digest: Optional[bytes] = None) -> Optional[PackedKnowledgeIndex]:
+    """
+    Ouvre un fichier .kbpack s'il existe et correspond à la source attendue.
+
+    Args:
+        path (str): Chemin du fichier
+        expected_digest (Optional[bytes]): Empreinte de la source, None pour ne pas la vérifier
+
+    Returns:
+        Optional[PackedKnowledgeIndex]: Index projeté en mémoire, ou None si le
+                                        fichier est absent, invalide ou périmé
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        index = PackedKnowledgeIndex(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    if expected_digest is not None and index.digest != expected_digest:
+        index.close()
+        return None
+    return index
+
+
+def main():
+    """Compile une base de connaissances Python en fichier .kbpack."""
+    import argparse
+    import importlib
+
+    parser = argparse.ArgumentParser(description="Outils pour les bases de connaissances compilées (.kbpack)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Compiler une base de connaissances")
+    build.add_argument("source", help="Base de connaissances au format module:attribut")
+    build.add_argument("output", help="Fichier .kbpack à produire")
+    args = parser.parse_args()
+
+    module_name, _, attribute = args.source.partition(":")
+    module = importlib.import_module(module_name)
+    knowledge = getattr(module, attribute or "KNOWLEDGE")
+    build_pack(knowledge, args.output, source_digest(module.__file__))
+    print(f"Base de connaissances compilée dans {args.output} ({os.path.getsize(args.output)} octets)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Chargement différé des bases de connaissances.
+Un module de base de connaissances n'est importé qu'au premier accès à l'un de
+ses attributs, c'est-à-dire à la première recherche de l'agent.
+"""
+
+import time
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyKnowledgeBase:
+    """
+    Mandataire d'un module de base de connaissances importé à la demande.
+    S'utilise partout où un module est attendu (Agent.add_knowledge_base).
+    """
+
+    def __init__(self, module_name: str):
+        """
+        Initialise le mandataire sans importer le module.
+
+        Args:
+            module_name (str): Nom complet du module (ex. "knowledge_base.devops_knowledge_base")
+        """
+        self.module_name = module_name
+        self.load_seconds: Optional[float] = None
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Indique si le module a déjà été importé."""
+        return self._module is not None
+
+    def load(self) -> ModuleType:
+        """
+        Importe le module s'il ne l'est pas encore et le retourne.
+
+        Returns:
+            ModuleType: Module de base de connaissances
+        """
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self.module_name)
+                    self.load_seconds = time.perf_counter() - started
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, name: str) -> Any:
+        # Appelé uniquement pour les attributs absents du mandataire
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        state = "chargé" if self.loaded else "non chargé"
+        return f"<LazyKnowledgeBase {self.module_name} ({state})>"
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Résolution des bases de connaissances déclarées dans la configuration des agents.
+Le champ "knowledge_bases" d'une configuration (ex. ["devops"]) liste des noms :
+- un nom de base intégrée (BUILTIN_KNOWLEDGE_BASES) désigne un module Python,
+  importé à la première recherche ;
+- tout autre nom désigne un répertoire ou un fichier de données dans
+  KNOWLEDGE_DIR (``<nom>/``, ``<nom>.json``, ``<nom>.yaml``, ``<nom>.md``...),
+  éventuellement dans un sous-répertoire (``equipe/runbooks``).
+
+Les noms viennent des requêtes des modes démon et lot : un nom qui mène hors
+de KNOWLEDGE_DIR (chemin absolu, ``..``, lien symbolique) est refusé.
+
+Les bases de fichiers sont partagées entre tous les agents du processus et se
+rechargent à chaud (voir knowledge_base.file_knowledge_base).
+
+Les bases intégrées qui exposent publish_shared() peuvent être publiées comme
+index partagés entre processus (voir knowledge_base.shared_index).
+"""
+
+import os
+import importlib
+import threading
+from typing import Any, Dict, Optional
+
+try:
+    from .lazy import LazyKnowledgeBase
+    from .file_knowledge_base import FileKnowledgeBase, SUPPORTED_EXTENSIONS
+except ImportError:
+    # Exécution directe du module
+    from lazy import LazyKnowledgeBase
+    from file_knowledge_base import FileKnowledgeBase, SUPPORTED_EXTENSIONS
+
+# Bases de connaissances fournies sous forme de modules Python
+BUILTIN_KNOWLEDGE_BASES = {
+    "devops": "knowledge_base.devops_knowledge_base"
+}
+
+# Répertoire des bases de connaissances sous forme de fichiers
+KNOWLEDGE_DIR = os.environ.get(
+    "JAMONO_KNOWLEDGE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+
+_loaded: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def _is_inside(path: str, root: str) -> bool:
+    real_path = os.path.realpath(path)
+    return real_path != root and os.path.commonpath([root, real_path]) == root
+
+
+def _find_data_path(name: str, knowledge_dir: str) -> Optional[str]:
+    root = os.path.realpath(knowledge_dir)
+    candidate = os.path.join(root, name)
+    # Les noms viennent des requêtes : rien n'est lu hors de knowledge_dir, liens symboliques compris
+    if not _is_inside(candidate, root):
+        raise ValueError(f"Base de connaissances hors du répertoire des bases: {name}")
+    if os.path.isdir(candidate):
+        path = candidate
+    else:
+        path = next((candidate + extension for extension in SUPPORTED_EXTENSIONS
+                     if os.path.isfile(candidate + extension)), None)
+    if path is not None and not _is_inside(path, root):
+        raise ValueError(f"Base de connaissances hors du répertoire des bases: {name}")
+    return path
+
+
+def load_knowledge_base(name: str, knowledge_dir: Optional[str] = None,
+                        module_name: Optional[str] = None) -> Any:
+    """
+    Retourne la base de connaissances correspondant à un nom de la configuration.
+    Une même base n'est chargée qu'une fois par processus.
+
+    Args:
+        name (str): Nom de base intégrée, ou nom de fichier de données relatif à knowledge_dir
+        knowledge_dir (Optional[str]): Répertoire des fichiers de données
+                                       (KNOWLEDGE_DIR par défaut)
+        module_name (Optional[str]): Module déclaré pour ce nom (registre des
+                                     plugins, voir models.plugins), prioritaire
+                                     sur BUILTIN_KNOWLEDGE_BASES
+
+    Returns:
+        Any: Module (chargé à la demande) ou FileKnowledgeBase
+
+    Raises:
+        ValueError: Si aucune base de connaissances ne correspond au nom, ou
+                    s'il désigne un chemin hors de knowledge_dir
+    """
+    with _lock:
+        module_name = module_name or BUILTIN_KNOWLEDGE_BASES.get(name.lower())
+        if module_name is not None:
+            key = module_name
+        else:
+            path = _find_data_path(name, knowledge_dir or KNOWLEDGE_DIR)
+            if path is None:
+                raise ValueError(f"Base de connaissances inconnue: {name}")
+            key = os.path.realpath(path)
+
+        knowledge_base = _loaded.get(key)
+        if knowledge_base is None:
+            if module_name is not None:
+                knowledge_base = LazyKnowledgeBase(module_name)
+            else:
+                knowledge_base = FileKnowledgeBase(key)
+            _loaded[key] = knowledge_base
+        return knowledge_base
+
+
+def publish_shared_indexes(directory: str, modules: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Publie les index partagés des bases de connaissances qui le permettent.
+
+    Args:
+        directory (str): Répertoire de publication
+        modules (Optional[Dict[str, str]]): Module de chaque base, par nom
+                                            (BUILTIN_KNOWLEDGE_BASES par défaut)
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Manifeste publié, par nom de base
+    """
+    manifests = {}
+    for name, module_name in (modules or BUILTIN_KNOWLEDGE_BASES).items():
+        module = importlib.import_module(module_name)
+        if hasattr(module, "publish_shared"):
+            manifests[name] = module.publish_shared(directory)
+    return manifests
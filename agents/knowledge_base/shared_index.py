@@ -0,0 +1,372 @@
+#!/usr/bin/env python
+"""
+Index de base de connaissances partagé entre processus.
+
+L'index construit (table des termes, postings, trigrammes, valeurs) est publié
+une fois dans un répertoire sous forme de fichier .kbpack, accompagné des
+vecteurs des passages (.npy) et, pour les grandes bases, de l'index approché
+(voir knowledge_base.ann_index). Chaque processus de travail projette ces
+fichiers en mémoire en lecture seule : les pages sont partagées via le cache du
+système, et la mémoire reste stable quand on ajoute des processus. Sous Linux,
+placer le répertoire dans /dev/shm évite tout accès disque.
+
+Publication d'une nouvelle version :
+- les fichiers de la version N sont écrits sous des noms propres à la version
+  (``<nom>-vN.kbpack``...), chacun dans un fichier temporaire puis renommé ;
+- le manifeste ``<nom>.json`` (version, empreinte, fichiers) est ensuite
+  remplacé par renommage, ce qui bascule les lecteurs en une seule étape ;
+- les lecteurs relisent le manifeste au plus une fois par ``check_interval`` ;
+  une requête en cours garde la version qu'elle a commencé à lire, dont la
+  projection est libérée avec la dernière référence ;
+- les versions antérieures à N - 1 sont supprimées (un lecteur qui a déjà
+  projeté leurs fichiers n'est pas affecté).
+
+Un seul publieur à la fois par répertoire et par nom.
+
+Publication en ligne de commande :
+    python -m knowledge_base.shared_index publish /dev/shm/jamono-index \\
+        --source knowledge_base.devops_knowledge_data:DEVOPS_KNOWLEDGE --name devops
+"""
+
+import os
+import json
+import time
+import shutil
+import struct
+import threading
+from typing import Any, Dict, Optional
+
+try:
+    from .kbpack import PackedKnowledgeIndex, build_pack
+except ImportError:
+    # Exécution directe du module
+    from kbpack import PackedKnowledgeIndex, build_pack
+
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+def manifest_path(directory: str, name: str) -> str:
+    """
+    Retourne le chemin du manifeste d'un index partagé.
+
+    Args:
+        directory (str): Répertoire de publication
+        name (str): Nom de l'index (ex. "devops")
+
+    Returns:
+        str: Chemin du manifeste
+    """
+    return os.path.join(directory, f"{name}.json")
+
+
+def read_manifest(directory: str, name: str) -> Optional[Dict[str, Any]]:
+    """
+    Lit le manifeste de la version publiée.
+
+    Args:
+        directory (str): Répertoire de publication
+        name (str): Nom de l'index
+
+    Returns:
+        Optional[Dict[str, Any]]: Manifeste, ou None si rien n'est publié
+    """
+    try:
+        with open(manifest_path(directory, name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _replace_with(path: str, write: Any) -> None:
+    """Écrit un fichier dans un fichier temporaire puis le renomme."""
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        write(f)
+    os.replace(temp_path, path)
+
+
+def _publish_vectors(directory: str, prefix: str, pack_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Calcule et écrit les vecteurs des passages d'une version (nécessite NumPy).
+
+    Returns:
+        Optional[Dict[str, Any]]: Entrée "vectors" du manifeste, ou None sans NumPy
+    """
+    try:
+        import numpy as np
+        try:
+            from .vector_index import VectorIndex
+        except ImportError:
+            from vector_index import VectorIndex
+    except ImportError:
+        return None
+
+    index = PackedKnowledgeIndex(pack_path)
+    try:
+        vector_index = VectorIndex(index)
+    finally:
+        index.close()
+
+    entry: Dict[str, Any] = {
+        "matrix": f"{prefix}.vectors.npy",
+        "unit_ids": f"{prefix}.units.npy",
+        "dim": vector_index.embedder.dim,
+        "ann": None
+    }
+    _replace_with(os.path.join(directory, entry["matrix"]), lambda f: np.save(f, vector_index.matrix))
+    _replace_with(os.path.join(directory, entry["unit_ids"]), lambda f: np.save(f, vector_index.unit_ids))
+    if vector_index.ann is not None:
+        entry["ann"] = f"{prefix}.ivf"
+        temp_path = os.path.join(directory, f"{entry['ann']}.tmp{os.getpid()}")
+        vector_index.ann.save(temp_path)
+        os.replace(temp_path, os.path.join(directory, entry["ann"]))
+    return entry
+
+
+def _remove_versions(directory: str, name: str, below: int) -> None:
+    """Supprime les fichiers des versions antérieures à ``below``."""
+    prefix = f"{name}-v"
+    for entry in os.listdir(directory):
+        if not entry.startswith(prefix):
+            continue
+        number = entry[len(prefix):].split(".", 1)[0]
+        if not number.isdigit() or int(number) >= below:
+            continue
+        path = os.path.join(directory, entry)
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def publish_index(knowledge: Dict[str, Dict[str, Any]], directory: str, name: str,
+                  digest: bytes = b"", vectors: bool = True) -> Dict[str, Any]:
+    """
+    Publie une nouvelle version d'un index partagé et y bascule les lecteurs.
+
+    Args:
+        knowledge (Dict[str, Dict[str, Any]]): Base de connaissances à publier
+        directory (str): Répertoire de publication (créé au besoin)
+        name (str): Nom de l'index
+        digest (bytes): Empreinte du contenu (identifie le contenu entre processus)
+        vectors (bool): Publier aussi les vecteurs des passages (si NumPy est disponible)
+
+    Returns:
+        Dict[str, Any]: Manifeste de la version publiée
+    """
+    os.makedirs(directory, exist_ok=True)
+    previous = read_manifest(directory, name)
+    version = previous["version"] + 1 if previous else 1
+    prefix = f"{name}-v{version}"
+
+    pack_path = os.path.join(directory, f"{prefix}.kbpack")
+    build_pack(knowledge, pack_path, digest)
+    manifest = {
+        "name": name,
+        "version": version,
+        "digest": digest.hex(),
+        "pack": os.path.basename(pack_path),
+        "vectors": _publish_vectors(directory, prefix, pack_path) if vectors else None,
+        "published": time.time()
+    }
+
+    encoded = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+    _replace_with(manifest_path(directory, name), lambda f: f.write(encoded))
+    _remove_versions(directory, name, version - 1)
+    return manifest
+
+
+class _Snapshot:
+    """Version publiée projetée en mémoire."""
+
+    def __init__(self, directory: str, manifest: Dict[str, Any], index: PackedKnowledgeIndex):
+        self.directory = directory
+        self.manifest = manifest
+        self.index = index
+        self.vector_index: Any = None
+        self.vectors_loaded = False
+
+
+class SharedIndex:
+    """
+    Lecteur d'un index partagé : projette la version publiée et bascule sur la
+    suivante dès sa publication. Sûr entre threads.
+    """
+
+    def __init__(self, directory: str, name: str, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        """
+        Initialise le lecteur (la version publiée est ouverte au premier accès).
+
+        Args:
+            directory (str): Répertoire de publication
+            name (str): Nom de l'index
+            check_interval (float): Intervalle minimal entre deux lectures du manifeste, en secondes
+        """
+        self.directory = directory
+        self.name = name
+        self.check_interval = check_interval
+        self.switches = 0
+        self._snapshot: Optional[_Snapshot] = None
+        self._manifest_stat: Optional[tuple] = None
+        self._checked: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """
+        Relit le manifeste et projette la version publiée si elle a changé.
+
+        Returns:
+            bool: True si le lecteur a basculé sur une nouvelle version
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                stat = os.stat(manifest_path(self.directory, self.name))
+            except OSError:
+                return False
+            key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if key == self._manifest_stat:
+                return False
+
+            manifest = read_manifest(self.directory, self.name)
+            if manifest is None:
+                return False
+            current = self._snapshot
+            if current is not None and manifest["version"] == current.manifest["version"]:
+                self._manifest_stat = key
+                return False
+            try:
+                index = PackedKnowledgeIndex(os.path.join(self.directory, manifest["pack"]))
+            except (OSError, ValueError, struct.error):
+                # Version déjà remplacée et supprimée : la suivante sera lue au prochain contrôle
+                return False
+            # L'ancienne projection est libérée avec la dernière requête qui l'utilise
+            self._snapshot = _Snapshot(self.directory, manifest, index)
+            self._manifest_stat = key
+            if current is not None:
+                self.switches += 1
+            return True
+
+    def _current(self) -> Optional[_Snapshot]:
+        checked = self._checked
+        if checked is None or time.monotonic() - checked >= self.check_interval:
+            self.refresh()
+        return self._snapshot
+
+    @property
+    def version(self) -> Optional[int]:
+        """Version projetée, ou None si rien n'est publié."""
+        snapshot = self._current()
+        return snapshot.manifest["version"] if snapshot is not None else None
+
+    @property
+    def digest(self) -> Optional[str]:
+        """Empreinte (hexadécimale) du contenu de la version projetée."""
+        snapshot = self._current()
+        return snapshot.manifest["digest"] if snapshot is not None else None
+
+    def index(self) -> Optional[PackedKnowledgeIndex]:
+        """
+        Retourne l'index de la version publiée.
+
+        Returns:
+            Optional[PackedKnowledgeIndex]: Index projeté en mémoire, ou None si rien n'est publié
+        """
+        snapshot = self._current()
+        return snapshot.index if snapshot is not None else None
+
+    def vector_index(self) -> Any:
+        """
+        Retourne l'index vectoriel de la version publiée, sur les vecteurs
+        projetés en mémoire (nécessite NumPy).
+
+        Returns:
+            Any: VectorIndex, ou None si la version n'a pas de vecteurs
+        """
+        snapshot = self._current()
+        if snapshot is None:
+            return None
+        if not snapshot.vectors_loaded:
+            with self._lock:
+                if not snapshot.vectors_loaded:
+                    snapshot.vector_index = _load_vectors(snapshot)
+                    snapshot.vectors_loaded = True
+        return snapshot.vector_index
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne l'état du lecteur.
+
+        Returns:
+            Dict[str, Any]: Répertoire, version projetée et nombre de bascules
+        """
+        snapshot = self._snapshot
+        return {
+            "directory": self.directory,
+            "version": snapshot.manifest["version"] if snapshot is not None else None,
+            "switches": self.switches
+        }
+
+
+def _load_vectors(snapshot: _Snapshot) -> Any:
+    entry = snapshot.manifest.get("vectors")
+    if not entry:
+        return None
+    import numpy as np
+    try:
+        from .vector_index import HashingEmbedder, VectorIndex
+        from .ann_index import IVFIndex
+    except ImportError:
+        from vector_index import HashingEmbedder, VectorIndex
+        from ann_index import IVFIndex
+
+    directory = snapshot.directory
+    try:
+        matrix = np.load(os.path.join(directory, entry["matrix"]), mmap_mode="r")
+        unit_ids = np.load(os.path.join(directory, entry["unit_ids"]), mmap_mode="r")
+        ann = IVFIndex.load(os.path.join(directory, entry["ann"])) if entry.get("ann") else None
+    except (OSError, ValueError):
+        return None
+    return VectorIndex.from_arrays(snapshot.index, np.asarray(matrix), np.asarray(unit_ids),
+                                   HashingEmbedder(entry["dim"]), ann)
+
+
+def main():
+    """Publie une base de connaissances Python comme index partagé."""
+    import argparse
+    import importlib
+
+    parser = argparse.ArgumentParser(description="Index de base de connaissances partagés entre processus")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    publish = subparsers.add_parser("publish", help="Publier une nouvelle version")
+    publish.add_argument("directory", help="Répertoire de publication")
+    publish.add_argument("--source", default="knowledge_base.devops_knowledge_data:DEVOPS_KNOWLEDGE",
+                         help="Base de connaissances au format module:attribut")
+    publish.add_argument("--name", default="devops", help="Nom de l'index")
+    publish.add_argument("--no-vectors", action="store_true", help="Ne pas publier les vecteurs des passages")
+    show = subparsers.add_parser("show", help="Afficher le manifeste de la version publiée")
+    show.add_argument("directory", help="Répertoire de publication")
+    show.add_argument("--name", default="devops", help="Nom de l'index")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        print(json.dumps(read_manifest(args.directory, args.name), ensure_ascii=False, indent=2))
+        return
+
+    try:
+        from .kbpack import source_digest
+    except ImportError:
+        from kbpack import source_digest
+    module_name, _, attribute = args.source.partition(":")
+    module = importlib.import_module(module_name)
+    knowledge = getattr(module, attribute or "KNOWLEDGE")
+    manifest = publish_index(knowledge, args.directory, args.name, source_digest(module.__file__),
+                             not args.no_vectors)
+    print(f"Version {manifest['version']} de {args.name} publiée dans {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
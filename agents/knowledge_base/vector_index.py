@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+Recherche vectorielle dense pour les bases de connaissances.
+Chaque passage est transformé en vecteur par un embedder déterministe, sans
+service externe : hachage des termes (feature hashing) dans un espace de
+dimension fixe, pondération sous-linéaire et normalisation L2. Tous les vecteurs
+sont rangés dans une matrice float32 contiguë ; une requête est un seul produit
+matrice-vecteur suivi d'une sélection top-k.
+
+L'embedder est interchangeable : tout objet exposant ``dim`` et
+``embed(texts) -> numpy.ndarray`` de forme (len(texts), dim) convient.
+
+Au-delà de ANN_MIN_PASSAGES passages (ou si ann_params est fourni), la
+recherche passe par un index IVF approché (voir knowledge_base.ann_index) au
+lieu de parcourir toute la matrice.
+
+NumPy est une dépendance optionnelle, importée uniquement par ce module.
+"""
+
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .index import BaseKnowledgeIndex, UNIT_TOPIC, tokenize
+    from .ann_index import build_ivf
+except ImportError:
+    # Exécution directe du module
+    from index import BaseKnowledgeIndex, UNIT_TOPIC, tokenize
+    from ann_index import build_ivf
+
+# Même dimension que le mode dégradé de server/vector-service.ts
+DEFAULT_DIM = 1536
+
+# Nombre de passages à partir duquel la recherche devient approchée
+ANN_MIN_PASSAGES = 50000
+
+
+class HashingEmbedder:
+    """
+    Embedder hors ligne par hachage des termes.
+    Le hachage CRC32 est stable d'un processus à l'autre (contrairement à hash()),
+    et son bit de poids fort fixe le signe de la contribution pour limiter
+    l'effet des collisions.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        """
+        Initialise l'embedder.
+
+        Args:
+            dim (int): Dimension des vecteurs produits
+        """
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Calcule les vecteurs normalisés d'une liste de textes.
+
+        Args:
+            texts (Sequence[str]): Textes à transformer
+
+        Returns:
+            np.ndarray: Matrice float32 de forme (len(texts), dim)
+        """
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[str, int] = {}
+            for term in tokenize(text):
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                digest = zlib.crc32(term.encode("utf-8"))
+                sign = -1.0 if digest & 0x80000000 else 1.0
+                matrix[row, digest % self.dim] += sign * (1.0 + np.log(count))
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+def passage_text(index: BaseKnowledgeIndex, unit_id: int) -> str:
+    """
+    Construit le texte à vectoriser pour un passage : noms du sujet, du
+    sous-sujet et de la clé, suivis du contenu aplati.
+
+    Args:
+        index (BaseKnowledgeIndex): Index contenant le passage
+        unit_id (int): Identifiant du passage
+
+    Returns:
+        str: Texte du passage
+    """
+    parts = [part for part in index.unit(unit_id) if part]
+
+    def flatten(value: Any) -> None:
+        if isinstance(value, dict):
+            for key, item in value.items():
+                parts.append(str(key))
+                flatten(item)
+        elif isinstance(value, list):
+            for item in value:
+                flatten(item)
+        elif value is not None:
+            parts.append(str(value))
+
+    flatten(index.unit_value(unit_id))
+    return " ".join(parts)
+
+
+class VectorIndex:
+    """
+    Index vectoriel dense des passages d'un index de base de connaissances.
+    """
+
+    def __init__(self, index: BaseKnowledgeIndex, embedder: Optional[Any] = None,
+                 ann_params: Optional[Dict[str, Any]] = None):
+        """
+        Vectorise tous les passages de l'index.
+
+        Args:
+            index (BaseKnowledgeIndex): Index source (en mémoire ou .kbpack)
+            embedder (Optional[Any]): Embedder à utiliser (HashingEmbedder par défaut)
+            ann_params (Optional[Dict[str, Any]]): Paramètres de build_ivf (n_lists,
+                                                   nprobe, iterations) ; force la
+                                                   recherche approchée
+        """
+        self.index = index
+        self.embedder = embedder or HashingEmbedder()
+        self.unit_ids = np.array(
+            [unit_id for unit_id in range(index.unit_count) if index.kind(unit_id) != UNIT_TOPIC],
+            dtype=np.int64
+        )
+        texts = [passage_text(index, int(unit_id)) for unit_id in self.unit_ids]
+        self.matrix = np.ascontiguousarray(
+            self.embedder.embed(texts) if texts else np.zeros((0, self.embedder.dim)),
+            dtype=np.float32
+        )
+        self.ann = None
+        if len(self.unit_ids) and (ann_params is not None or len(self.unit_ids) >= ANN_MIN_PASSAGES):
+            self.ann = build_ivf(self.matrix, **(ann_params or {}))
+
+    @classmethod
+    def from_arrays(cls, index: BaseKnowledgeIndex, matrix: np.ndarray, unit_ids: np.ndarray,
+                    embedder: Optional[Any] = None, ann: Optional[Any] = None) -> "VectorIndex":
+        """
+        Crée l'index à partir de vecteurs déjà calculés, sans les copier (les
+        tableaux peuvent être projetés en mémoire, voir knowledge_base.shared_index).
+
+        Args:
+            index (BaseKnowledgeIndex): Index source des passages
+            matrix (np.ndarray): Vecteurs float32 des passages (n, dim)
+            unit_ids (np.ndarray): Identifiant de passage de chaque ligne
+            embedder (Optional[Any]): Embedder qui a produit les vecteurs (HashingEmbedder par défaut)
+            ann (Optional[Any]): Index approché (IVFIndex) sur les mêmes lignes, ou None
+
+        Returns:
+            VectorIndex: Index prêt pour la recherche
+        """
+        vector_index = cls.__new__(cls)
+        vector_index.index = index
+        vector_index.embedder = embedder or HashingEmbedder(matrix.shape[1])
+        vector_index.unit_ids = unit_ids
+        vector_index.matrix = matrix
+        vector_index.ann = ann
+        return vector_index
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        return self.embedder.embed([query])[0].astype(np.float32, copy=False)
+
+    def scores(self, query: str) -> np.ndarray:
+        """
+        Calcule la similarité cosinus de la requête avec chaque passage.
+
+        Args:
+            query (str): Requête en texte libre
+
+        Returns:
+            np.ndarray: Similarités, dans l'ordre de unit_ids
+        """
+        return self.matrix @ self._embed_query(query)
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Retourne les k passages les plus proches de la requête.
+
+        Args:
+            query (str): Requête en texte libre
+            k (int): Nombre maximal de passages
+
+        Returns:
+            List[Dict[str, Any]]: Passages triés par similarité décroissante
+        """
+        if k <= 0 or not len(self.unit_ids):
+            return []
+        if self.ann is not None:
+            rows, scores = self.ann.search(self._embed_query(query), k)
+            return [
+                self.index.passage(int(self.unit_ids[row]), round(float(score), 6))
+                for row, score in zip(rows, scores) if score > 0
+            ]
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((top, -scores[top]))]
+        return [
+            self.index.passage(int(self.unit_ids[row]), round(float(scores[row]), 6))
+            for row in top if scores[row] > 0
+        ]
@@ -6,20 +6,106 @@ Contient les classes et fonctions pour interagir avec les différents agents.
 
 import os
 import json
-import sys
 import logging
-from typing import Dict, List, Any, Optional, Union
+import threading
+from typing import Callable, Dict, List, Any, Iterator, Optional, Tuple, Union
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+try:
+    from .keyword_matcher import KeywordMatcher, KeywordMatch
+    from .cache import LRUCache
+    from .context import budget_from_config, pack_context
+    from .conversation import CONTEXT_MARKER, RollingContext, rolling_context_from_config, split_channel_context
+    from .metrics import NULL_METRICS, RequestMetrics
+    from .plugins import get_plugin_registry
+except ImportError:
+    # Exécution directe du module
+    from keyword_matcher import KeywordMatcher, KeywordMatch
+    from cache import LRUCache
+    from context import budget_from_config, pack_context
+    from conversation import CONTEXT_MARKER, RollingContext, rolling_context_from_config, split_channel_context
+    from metrics import NULL_METRICS, RequestMetrics
+    from plugins import get_plugin_registry
+
+# Journalisation configurée par le programme principal (voir models.logs) ;
+# rien n'est écrit sur la sortie standard, qui porte les réponses
 logger = logging.getLogger("agent")
 
+# Méthode des bases de connaissances utilisée par chaque moteur de recherche
+RETRIEVAL_BACKENDS = {
+    "bm25": "search_ranked",
+    "vector": "search_vector"
+}
+
+# Vocabulaire DevOps par défaut, complété par les compétences ("skills") de la configuration
+DEFAULT_DEVOPS_KEYWORDS = [
+    "ci/cd", "cicd", "ci-cd", "pipeline", "jenkins", "github actions",
+    "docker", "container", "kubernetes", "k8s", "terraform",
+    "ansible", "monitoring", "prometheus", "grafana", "elk",
+    "cloud", "aws", "azure", "gcp", "infrastructure", "deployment"
+]
+
+class LLMBackend:
+    """
+    Interface des moteurs de génération (API de modèles de langage).
+    Un moteur reçoit le contexte préparé par l'agent (message, system_prompt,
+    knowledge) et produit la réponse, en une fois ou par morceaux.
+    """
+    
+    def complete(self, context: Dict[str, Any]) -> str:
+        """
+        Génère la réponse complète.
+        
+        Args:
+            context (Dict[str, Any]): Contexte préparé par l'agent
+            
+        Returns:
+            str: Réponse générée
+        """
+        raise NotImplementedError("Cette méthode doit être implémentée par une classe dérivée")
+    
+    def stream(self, context: Dict[str, Any]) -> Iterator[str]:
+        """
+        Génère la réponse par morceaux. Par défaut, la réponse complète forme un
+        seul morceau.
+        
+        Args:
+            context (Dict[str, Any]): Contexte préparé par l'agent
+            
+        Yields:
+            str: Morceaux successifs de la réponse
+        """
+        yield self.complete(context)
+
+
+def create_llm_backend(settings: Optional[Dict[str, Any]]) -> Optional[LLMBackend]:
+    """
+    Crée le moteur de génération décrit par la clé "llm" de la configuration.
+    Le module du moteur n'est importé que s'il est utilisé.
+    
+    Args:
+        settings (Optional[Dict[str, Any]]): Paramètres du moteur ("backend" : "openai"
+                                             ou "mock" ; voir models.openai_backend)
+        
+    Returns:
+        Optional[LLMBackend]: Moteur configuré, ou None pour la réponse factice
+        
+    Raises:
+        ValueError: Si le moteur n'est pas reconnu
+    """
+    if not settings:
+        return None
+    backend = settings.get("backend", "openai")
+    if backend == "mock":
+        return None
+    if backend == "openai":
+        try:
+            from .openai_backend import OpenAICompatibleBackend
+        except ImportError:
+            from openai_backend import OpenAICompatibleBackend
+        return OpenAICompatibleBackend.from_config(settings)
+    raise ValueError(f"Moteur de génération non reconnu: {backend}")
+
+
 class Agent:
     """
     Classe abstraite pour tous les agents.
@@ -37,7 +123,35 @@ class Agent:
         self.name = name
         self.config = config
         self.knowledge_bases = []
-        logger.info(f"Agent {name} initialisé avec la configuration: {config}")
+        self.knowledge_version = 0
+        
+        backend = config.get("retrieval_backend", "bm25")
+        if backend not in RETRIEVAL_BACKENDS:
+            raise ValueError(f"Moteur de recherche non reconnu: {backend}")
+        self._search_method = RETRIEVAL_BACKENDS[backend]
+        # Cache des recherches, invalidé à chaque ajout de base de connaissances
+        self._search_cache = LRUCache(
+            max_size=config.get("search_cache_size", 256),
+            ttl=config.get("search_cache_ttl")
+        )
+        # Moteur de génération ("llm" dans la configuration), réponse factice par défaut
+        self.llm = create_llm_backend(config.get("llm"))
+        # État compressé de chaque conversation (voir models.conversation)
+        self._conversations = LRUCache(
+            max_size=config.get("conversation_max", 1024),
+            ttl=config.get("conversation_ttl", 86400)
+        )
+        self._conversation_lock = threading.Lock()
+        # Cache persistant des réponses ("response_cache"), désactivé par défaut
+        self._response_cache = None
+        if config.get("response_cache"):
+            try:
+                from .response_cache import open_response_cache
+            except ImportError:
+                from response_cache import open_response_cache
+            self._response_cache = open_response_cache(config["response_cache"])
+        logger.info("Agent %s initialisé", name, extra={"agent": name})
+        logger.debug("Configuration de l'agent %s: %s", name, config, extra={"agent": name})
     
     def add_knowledge_base(self, kb_module: Any) -> None:
         """
@@ -47,37 +161,215 @@ class Agent:
             kb_module: Module Python contenant la base de connaissances
         """
         self.knowledge_bases.append(kb_module)
-        logger.info(f"Base de connaissances ajoutée à l'agent {self.name}")
+        self.knowledge_version += 1
+        self._search_cache.clear()
+        logger.info("Base de connaissances ajoutée à l'agent %s", self.name, extra={"agent": self.name})
     
-    def process_message(self, message: str) -> str:
+    def process_message(self, message: str, conversation_id: Optional[str] = None,
+                        metrics: Optional[RequestMetrics] = None) -> str:
         """
         Traite un message et génère une réponse.
         À implémenter par les classes dérivées.
         
         Args:
             message (str): Message à traiter
+            conversation_id (Optional[str]): Conversation à laquelle appartient le message
+            metrics (Optional[RequestMetrics]): Mesures à compléter (aucune mesure si None)
             
         Returns:
             str: Réponse de l'agent
         """
         raise NotImplementedError("Cette méthode doit être implémentée par une classe dérivée")
+    
+    def process_message_stream(self, message: str, conversation_id: Optional[str] = None,
+                               metrics: Optional[RequestMetrics] = None) -> Iterator[str]:
+        """
+        Traite un message et produit la réponse par morceaux, au fur et à mesure
+        de sa génération. Par défaut, la réponse complète forme un seul morceau ;
+        les classes dérivées qui génèrent progressivement redéfinissent cette méthode.
+        
+        Args:
+            message (str): Message à traiter
+            conversation_id (Optional[str]): Conversation à laquelle appartient le message
+            metrics (Optional[RequestMetrics]): Mesures à compléter (aucune mesure si None)
+            
+        Yields:
+            str: Morceaux successifs de la réponse
+        """
+        yield self.process_message(message, conversation_id, metrics)
+    
+    def _observe_conversation(self, message: str, conversation_id: Optional[str]) -> Tuple[str, RollingContext]:
+        """
+        Sépare la question du bloc « Contexte récent du canal » et intègre les
+        lignes nouvelles de ce bloc à l'état de la conversation. Sans identifiant
+        de conversation, l'état ne vaut que pour ce message.
+        
+        Args:
+            message (str): Message reçu
+            conversation_id (Optional[str]): Conversation à laquelle appartient le message
+            
+        Returns:
+            Tuple[str, RollingContext]: Question et état de la conversation
+        """
+        question, window = split_channel_context(message)
+        if conversation_id is None:
+            conversation = rolling_context_from_config(self.config)
+        else:
+            with self._conversation_lock:
+                conversation = self._conversations.get(conversation_id)
+                if conversation is None:
+                    conversation = rolling_context_from_config(self.config)
+                    self._conversations.put(conversation_id, conversation)
+        if window:
+            conversation.observe_window(window)
+        return question, conversation
 
-    def search_knowledge(self, query: str) -> Dict[str, Any]:
+    def search_knowledge(self, query: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Recherche des informations dans les bases de connaissances de l'agent.
+        Recherche les passages les plus pertinents dans les bases de connaissances de l'agent,
+        avec le moteur choisi par "retrieval_backend" dans la configuration ("bm25"
+        par défaut, ou "vector" pour la recherche vectorielle dense).
+
+        Les résultats sont mis en cache par requête normalisée et version des
+        bases de connaissances ; les passages retournés ne doivent pas être modifiés.
         
         Args:
             query (str): Terme de recherche
+            k (Optional[int]): Nombre maximal de passages (par défaut "search_top_k"
+                               de la configuration, ou 5)
             
         Returns:
-            Dict[str, Any]: Résultats de la recherche
+            List[Dict[str, Any]]: Passages (topic, subtopic, key, score, content)
+                                  triés par score décroissant
         """
-        results = {}
+        if k is None:
+            k = self.config.get("search_top_k", 5)
+        
+        cache_key = (" ".join(query.lower().split()), k, self._knowledge_fingerprint())
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
+        passages = []
         for kb in self.knowledge_bases:
-            if hasattr(kb, "search_knowledge_base"):
-                kb_results = kb.search_knowledge_base(query)
-                results.update(kb_results)
-        return results
+            search = getattr(kb, self._search_method, None)
+            if search is not None:
+                passages.extend(search(query, k))
+        
+        passages.sort(key=lambda passage: passage["score"], reverse=True)
+        passages = passages[:k]
+        self._search_cache.put(cache_key, passages)
+        return list(passages)
+    
+    def _knowledge_fingerprint(self) -> tuple:
+        """
+        Identifie l'état des bases de connaissances de l'agent : nombre d'ajouts et
+        version propre de chaque base qui expose get_version().
+        
+        Returns:
+            tuple: Empreinte utilisée dans les clés de cache
+        """
+        return (self.knowledge_version,) + tuple(
+            kb.get_version() if hasattr(kb, "get_version") else None
+            for kb in self.knowledge_bases
+        )
+    
+    def _knowledge_content_fingerprint(self) -> tuple:
+        """
+        Identifie le contenu des bases de connaissances de l'agent, de façon stable
+        d'un processus à l'autre : get_fingerprint() pour les bases qui l'exposent,
+        nom et version sinon.
+        
+        Returns:
+            tuple: Empreinte utilisée dans les clés du cache de réponses
+        """
+        return tuple(
+            kb.get_fingerprint() if hasattr(kb, "get_fingerprint")
+            else (getattr(kb, "__name__", type(kb).__name__),
+                  kb.get_version() if hasattr(kb, "get_version") else None)
+            for kb in self.knowledge_bases
+        )
+    
+    def _response_cache_key(self, message: str, conversation_state: str = "") -> str:
+        """
+        Calcule la clé du cache de réponses : message normalisé, empreinte de
+        l'agent (type, nom, configuration dont le prompt système), contenu des
+        bases de connaissances et état de la conversation.
+        
+        Args:
+            message (str): Message de l'utilisateur
+            conversation_state (str): Contexte de conversation rendu (RollingContext.render),
+                                      vide pour un message sans historique
+            
+        Returns:
+            str: Clé de cache
+        """
+        try:
+            from .registry import agent_fingerprint
+            from .response_cache import make_key, normalize_message
+        except ImportError:
+            from registry import agent_fingerprint
+            from response_cache import make_key, normalize_message
+        return make_key(
+            normalize_message(message),
+            agent_fingerprint(type(self).__name__, self.name, self.config),
+            self._knowledge_content_fingerprint(),
+            conversation_state
+        )
+    
+    def _cached_stream(self, message: str, generate: Callable[[str], Iterator[str]],
+                       metrics: Any = NULL_METRICS,
+                       conversation: Optional[RollingContext] = None) -> Iterator[str]:
+        """
+        Sert la réponse depuis le cache de réponses si elle s'y trouve (en un seul
+        morceau, sans recherche ni génération), sinon la génère et l'enregistre
+        une fois complète. La réponse dépend aussi de l'état de la conversation
+        (mots-clés des derniers tours, résumé transmis au moteur) : il fait partie
+        de la clé.
+        
+        Args:
+            message (str): Message de l'utilisateur
+            generate (Callable[[str], Iterator[str]]): Génération de la réponse par morceaux
+            metrics (Any): Mesures du message (RequestMetrics, ou NULL_METRICS)
+            conversation (Optional[RollingContext]): État de la conversation, ou None
+            
+        Yields:
+            str: Morceaux successifs de la réponse
+        """
+        if self._response_cache is None:
+            yield from generate(message)
+            return
+        
+        key = self._response_cache_key(message, conversation.render() if conversation is not None else "")
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            metrics.mark_cache_hit()
+            yield cached
+            return
+        
+        chunks = []
+        for chunk in generate(message):
+            chunks.append(chunk)
+            yield chunk
+        self._response_cache.put(key, "".join(chunks))
+    
+    def response_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Retourne les statistiques du cache de réponses de l'agent.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Taille et compteurs, ou None si le cache est désactivé
+        """
+        return self._response_cache.stats() if self._response_cache is not None else None
+    
+    def search_cache_stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques du cache de recherche de l'agent.
+        
+        Returns:
+            Dict[str, Any]: Taille et compteurs de succès, échecs et évictions
+        """
+        return self._search_cache.stats()
     
     def get_system_prompt(self) -> str:
         """
@@ -128,90 +420,204 @@ class DevOpsAgent(Agent):
             config (Dict[str, Any]): Configuration de l'agent
         """
         super().__init__(name, config)
-        logger.info(f"Agent DevOps {name} initialisé")
+        
+        vocabulary = list(config.get("keywords", DEFAULT_DEVOPS_KEYWORDS))
+        skills = config.get("skills")
+        if isinstance(skills, list):
+            vocabulary.extend(skill for skill in skills if isinstance(skill, str))
+        self._keyword_matcher = KeywordMatcher(vocabulary)
+        
+        logger.info("Agent DevOps %s initialisé", name, extra={"agent": name})
     
-    def process_message(self, message: str) -> str:
+    def process_message(self, message: str, conversation_id: Optional[str] = None,
+                        metrics: Optional[RequestMetrics] = None) -> str:
         """
         Traite un message et génère une réponse spécifique au domaine DevOps.
         
         Args:
             message (str): Message à traiter
+            conversation_id (Optional[str]): Conversation à laquelle appartient le message
+            metrics (Optional[RequestMetrics]): Mesures à compléter (aucune mesure si None)
             
         Returns:
             str: Réponse de l'agent
         """
-        # 1. Extraire les mots-clés importants du message
-        keywords = self._extract_keywords(message)
+        return "".join(self.process_message_stream(message, conversation_id, metrics))
+    
+    def process_message_stream(self, message: str, conversation_id: Optional[str] = None,
+                               metrics: Optional[RequestMetrics] = None) -> Iterator[str]:
+        """
+        Traite un message et produit la réponse par morceaux : la recherche dans
+        les bases de connaissances précède le premier morceau, qui est émis dès
+        que la génération commence. Une réponse présente dans le cache de
+        réponses est servie directement.
+        
+        Avec un identifiant de conversation, l'état compressé de la conversation
+        (models.conversation) est conservé d'un message à l'autre, et la réponse
+        y est ajoutée.
+        
+        Avec des mesures (models.metrics), la durée de chaque étape et les
+        compteurs (mots-clés, passages, taille du contexte) y sont enregistrés.
         
-        # 2. Rechercher des informations dans la base de connaissances
-        knowledge = {}
-        for keyword in keywords:
-            results = self.search_knowledge(keyword)
-            if results:
-                knowledge[keyword] = results
+        Args:
+            message (str): Message à traiter
+            conversation_id (Optional[str]): Conversation à laquelle appartient le message
+            metrics (Optional[RequestMetrics]): Mesures à compléter (aucune mesure si None)
+            
+        Yields:
+            str: Morceaux successifs de la réponse
+        """
+        if metrics is None:
+            metrics = NULL_METRICS
+        with metrics.stage("conversation"):
+            question, conversation = self._observe_conversation(message, conversation_id)
+        chunks = []
+        generate = lambda _: self._generate_stream(question, conversation, metrics)
+        for chunk in self._cached_stream(message, generate, metrics, conversation):
+            chunks.append(chunk)
+            yield chunk
+        
+        if conversation_id is not None:
+            with metrics.stage("conversation"):
+                if CONTEXT_MARKER not in message:
+                    conversation.add_turn("utilisateur", question)
+                conversation.add_turn(self.name, "".join(chunks))
+        metrics.finish()
+    
+    def _generate_stream(self, question: str, conversation: RollingContext,
+                         metrics: Any = NULL_METRICS) -> Iterator[str]:
+        """
+        Recherche les connaissances utiles, prépare le contexte et génère la réponse.
+        
+        Args:
+            question (str): Question de l'utilisateur (sans le bloc de contexte du canal)
+            conversation (RollingContext): État compressé de la conversation
+            metrics (Any): Mesures du message (RequestMetrics, ou NULL_METRICS)
+            
+        Yields:
+            str: Morceaux successifs de la réponse
+        """
+        # 1. Extraire les mots-clés de la question, ou à défaut des derniers échanges
+        with metrics.stage("keywords"):
+            keywords = self._extract_keywords(question)
+            if keywords == ["general"]:
+                recent_keywords = self._extract_keywords(conversation.recent_text())
+                if recent_keywords != ["general"]:
+                    keywords = recent_keywords
+        
+        # 2. Rechercher les passages les plus pertinents pour chaque mot-clé
+        with metrics.stage("search"):
+            knowledge = {}
+            for keyword in keywords:
+                passages = self.search_knowledge(keyword)
+                if passages:
+                    knowledge[keyword] = passages
         
         # 3. Préparer le contexte pour l'API IA
-        context = self._prepare_context(message, knowledge)
+        with metrics.stage("context"):
+            context = self._prepare_context(question, knowledge)
+            summary = conversation.render()
+            if summary:
+                context["conversation"] = summary
         
-        # 4. Générer la réponse (à remplacer par l'appel à l'API IA)
-        response = self._mock_ai_response(context)
+        if metrics.enabled:
+            metrics.count("keywords", len(keywords))
+            metrics.count("hits", sum(len(passages) for passages in knowledge.values()))
+            metrics.count("passages", len(context["knowledge"]))
+            metrics.count("context_bytes", len(summary.encode("utf-8")) + sum(
+                len(passage["text"].encode("utf-8")) for passage in context["knowledge"]
+            ))
         
-        logger.info(f"Message traité: '{message[:50]}...' - Réponse générée")
-        return response
+        # 4. Générer la réponse
+        if self.llm is not None:
+            yield from metrics.timed("generation", self.llm.stream(context))
+        else:
+            yield from metrics.timed("generation", self._mock_ai_stream(context))
+        
+        logger.info("Message traité: '%.50s...' - Réponse générée", question, extra={"agent": self.name})
     
-    def _extract_keywords(self, message: str) -> List[str]:
+    def _match_keywords(self, message: str) -> List[KeywordMatch]:
         """
-        Extrait les mots-clés importants d'un message.
-        Implémentation simplifiée pour l'exemple.
+        Repère les mots-clés du vocabulaire de l'agent dans un message, en une
+        seule passe, en début de mot (pluriels et mots dérivés compris, voir
+        models.keyword_matcher).
         
         Args:
             message (str): Message à analyser
             
         Returns:
-            List[str]: Mots-clés extraits
+            List[KeywordMatch]: Occurrences (mot-clé, début, fin), dans l'ordre du message
         """
-        # Implémentation naïve pour l'exemple
-        devops_keywords = [
-            "ci/cd", "cicd", "ci-cd", "pipeline", "jenkins", "github actions",
-            "docker", "container", "kubernetes", "k8s", "terraform", 
-            "ansible", "monitoring", "prometheus", "grafana", "elk",
-            "cloud", "aws", "azure", "gcp", "infrastructure", "deployment"
-        ]
-        
-        message_lower = message.lower()
-        found_keywords = []
+        return self._keyword_matcher.finditer(message)
+    
+    def _extract_keywords(self, message: str) -> List[str]:
+        """
+        Extrait les mots-clés importants d'un message. Si aucun mot-clé n'est
+        trouvé tel quel, les mots proches d'un mot-clé (fautes de frappe) sont
+        retenus, sauf si "typo_tolerance" vaut false dans la configuration.
         
-        for keyword in devops_keywords:
-            if keyword in message_lower:
-                found_keywords.append(keyword)
+        Args:
+            message (str): Message à analyser
+            
+        Returns:
+            List[str]: Mots-clés extraits, dans l'ordre de leur première occurrence
+        """
+        found_keywords = list(dict.fromkeys(match.keyword for match in self._match_keywords(message)))
+        if not found_keywords and self.config.get("typo_tolerance", True):
+            found_keywords = list(dict.fromkeys(
+                match.keyword for match in self._keyword_matcher.fuzzy_finditer(message)
+            ))
         
         # S'il n'y a pas de mots-clés spécifiques, utiliser un mot-clé générique
-        if not found_keywords and "problème" in message_lower:
+        if not found_keywords and "problème" in message.lower():
             found_keywords.append("troubleshooting")
         
         return found_keywords or ["general"]
     
     def _prepare_context(self, message: str, knowledge: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Prépare le contexte pour l'appel à l'API IA.
+        Prépare le contexte pour l'appel à l'API IA. Les passages sont dédoublonnés,
+        classés et réduits sous le budget de la configuration (voir models.context).
         
         Args:
             message (str): Message de l'utilisateur
-            knowledge (Dict[str, Any]): Informations de la base de connaissances
+            knowledge (Dict[str, Any]): Passages classés par mot-clé
             
         Returns:
-            Dict[str, Any]: Contexte pour l'appel API
+            Dict[str, Any]: Contexte pour l'appel API ("knowledge" contient les
+                            passages retenus, "dropped" les passages écartés)
         """
+        budget_chars, passage_chars = budget_from_config(self.config)
+        packed = pack_context(knowledge, budget_chars, passage_chars)
+        if packed["dropped"]:
+            logger.debug("Contexte: %d passage(s) écarté(s) (budget %d caractères)",
+                         len(packed["dropped"]), budget_chars)
+        
         return {
             "message": message,
             "system_prompt": self.get_system_prompt(),
-            "knowledge": knowledge
+            "knowledge": packed["passages"],
+            "dropped": packed["dropped"],
+            "context_stats": packed["stats"]
         }
     
+    def _mock_ai_stream(self, context: Dict[str, Any]) -> Iterator[str]:
+        """
+        Produit la réponse factice ligne par ligne, comme le ferait une API IA
+        en mode streaming.
+        
+        Args:
+            context (Dict[str, Any]): Contexte pour l'appel API
+            
+        Yields:
+            str: Lignes successives de la réponse (fins de ligne comprises)
+        """
+        yield from self._mock_ai_response(context).splitlines(keepends=True)
+    
     def _mock_ai_response(self, context: Dict[str, Any]) -> str:
         """
         Génère une réponse factice pour les tests.
-        À remplacer par l'appel réel à l'API IA.
+        Utilisée lorsqu'aucun moteur de génération ("llm") n'est configuré.
         
         Args:
             context (Dict[str, Any]): Contexte pour l'appel API
@@ -224,20 +630,25 @@ class DevOpsAgent(Agent):
         
         # Vérifier si nous avons des informations dans la base de connaissances
         if knowledge:
-            first_topic = list(knowledge.values())[0]
-            first_result = list(first_topic.values())[0]
+            definitions = [p for p in knowledge if p["subtopic"] == "definition"]
             
-            if isinstance(first_result, dict) and "definition" in first_result:
-                definition = first_result["definition"].strip()
+            if definitions:
+                definition = definitions[0]["text"]
                 return f"D'après ma base de connaissances, je peux vous dire que {definition}\n\nY a-t-il quelque chose de spécifique sur ce sujet que vous aimeriez savoir?"
             
+            best = knowledge[0]
+            source = " › ".join(part for part in (best["topic"], best["subtopic"], best["key"]) if part)
+            return f"D'après ma base de connaissances ({source}) :\n\n{best['text']}\n\nY a-t-il quelque chose de spécifique sur ce sujet que vous aimeriez savoir?"
+            
         # Réponse par défaut
         return "Je suis NOX, votre spécialiste DevOps. Bien que je n'aie pas d'informations spécifiques sur votre demande dans ma base de connaissances actuelle, je peux vous aider avec diverses problématiques DevOps comme CI/CD, containerisation, monitoring, et infrastructure as code. N'hésitez pas à préciser votre question."
 
 
 def create_agent(agent_type: str, name: str, config: Dict[str, Any]) -> Agent:
     """
-    Crée un agent du type spécifié.
+    Crée un agent du type spécifié. Les types sont déclarés dans le registre des
+    plugins (voir models.plugins) ; le module d'un type n'est importé qu'à la
+    création du premier agent de ce type.
     
     Args:
         agent_type (str): Type d'agent à créer
@@ -250,10 +661,16 @@ def create_agent(agent_type: str, name: str, config: Dict[str, Any]) -> Agent:
     Raises:
         ValueError: Si le type d'agent n'est pas reconnu
     """
-    if agent_type.lower() == "devops":
-        return DevOpsAgent(name, config)
-    else:
-        raise ValueError(f"Type d'agent non reconnu: {agent_type}")
+    plugins = get_plugin_registry()
+    try:
+        agent_class = plugins.agent_class(agent_type)
+    except ImportError as e:
+        raise ValueError(f"Type d'agent {agent_type} indisponible: {e}")
+    if agent_class is None:
+        raise ValueError(f"Type d'agent non reconnu: {agent_type} (types disponibles : {', '.join(plugins.agent_types())})")
+    if not (isinstance(agent_class, type) and issubclass(agent_class, Agent)):
+        raise ValueError(f"Le type d'agent {agent_type} ne désigne pas une classe d'agent")
+    return agent_class(name, config)
 
 
 def load_agent_config(config_path: str) -> Dict[str, Any]:
@@ -270,11 +687,21 @@ def load_agent_config(config_path: str) -> Dict[str, Any]:
         with open(config_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
-        logger.error(f"Erreur lors du chargement de la configuration: {str(e)}")
+        logger.error("Erreur lors du chargement de la configuration %s: %s", config_path, e)
         return {}
 
 
 if __name__ == "__main__":
+    try:
+        from .logs import configure_logging
+    except ImportError:
+        from logs import configure_logging
+    configure_logging()
+    
+    # Exécuté directement, ce module n'est pas models.agent : DevOpsAgent est
+    # déclaré avec la classe de ce module plutôt que par son nom complet
+    get_plugin_registry().register_agent_type("devops", DevOpsAgent, ["devops"])
+    
     # Exemple d'utilisation
     config = {
         "system_prompt": "Tu es NOX, un spécialiste DevOps avec expertise en pipelines CI/CD, containerisation, et infrastructure as code."
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Cache LRU borné avec expiration optionnelle (TTL).
+Utilisé par les agents pour mémoriser les résultats de recherche dans leurs
+bases de connaissances.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Cache à éviction LRU, borné en nombre d'entrées, avec durée de vie optionnelle.
+    Les accès sont protégés par un verrou pour pouvoir partager un agent entre
+    plusieurs threads (mode démon).
+    """
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialise le cache.
+
+        Args:
+            max_size (int): Nombre maximal d'entrées (0 désactive le cache)
+            ttl (Optional[float]): Durée de vie d'une entrée en secondes (None = illimitée)
+            clock (Callable[[], float]): Horloge utilisée pour l'expiration
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retourne la valeur associée à la clé, ou default si elle est absente ou expirée.
+
+        Args:
+            key (Hashable): Clé recherchée
+            default (Any): Valeur retournée en cas d'absence
+
+        Returns:
+            Any: Valeur en cache ou default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Ajoute ou remplace une entrée, en évinçant la moins récemment utilisée si besoin.
+
+        Args:
+            key (Hashable): Clé de l'entrée
+            value (Any): Valeur à mémoriser
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Vide le cache sans remettre les compteurs à zéro."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques du cache.
+
+        Returns:
+            Dict[str, Any]: Taille, capacité et compteurs de succès, échecs et évictions
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+"""
+Assemblage du contexte envoyé au modèle de langage.
+Les passages trouvés pour chaque mot-clé sont dédoublonnés (un même passage
+peut répondre à plusieurs mots-clés), classés, réduits à l'extrait pertinent
+puis empaquetés sous un budget de caractères. Les passages écartés sont
+signalés dans le contexte.
+
+La taille du contexte détermine directement la latence et le coût de l'appel
+au modèle ; le budget se règle dans la configuration de l'agent :
+- context_budget_chars : budget en caractères pour les passages ;
+- context_budget_tokens : budget en tokens, converti à CHARS_PER_TOKEN
+  caractères par token (ignoré si context_budget_chars est défini) ;
+- context_passage_chars : taille maximale d'un passage.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Estimation courante pour les modèles de langage (texte latin)
+CHARS_PER_TOKEN = 4
+
+DEFAULT_BUDGET_CHARS = 6000
+DEFAULT_PASSAGE_CHARS = 1500
+# En dessous de cette place restante, un passage est écarté plutôt que tronqué
+MIN_SNIPPET_CHARS = 200
+
+ELLIPSIS = "…"
+
+
+def budget_from_config(config: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Lit le budget de contexte dans la configuration d'un agent.
+
+    Args:
+        config (Dict[str, Any]): Configuration de l'agent
+
+    Returns:
+        Tuple[int, int]: Budget total et taille maximale d'un passage, en caractères
+    """
+    budget = config.get("context_budget_chars")
+    if budget is None and config.get("context_budget_tokens") is not None:
+        budget = config["context_budget_tokens"] * CHARS_PER_TOKEN
+    if budget is None:
+        budget = DEFAULT_BUDGET_CHARS
+    passage_chars = config.get("context_passage_chars", DEFAULT_PASSAGE_CHARS)
+    return int(budget), int(passage_chars)
+
+
+def render_content(content: Any) -> str:
+    """
+    Convertit le contenu d'un passage en texte : les listes deviennent des
+    puces, les dictionnaires du JSON indenté.
+
+    Args:
+        content (Any): Contenu du passage
+
+    Returns:
+        str: Texte du passage
+    """
+    if isinstance(content, str):
+        return content.strip()
+    if isinstance(content, list):
+        return "\n".join(f"- {item}" for item in content)
+    if content is None:
+        return ""
+    return json.dumps(content, ensure_ascii=False, indent=2)
+
+
+def snippet(text: str, terms: Iterable[str], max_chars: int) -> Tuple[str, bool]:
+    """
+    Réduit un texte à au plus max_chars caractères, en partant de la ligne qui
+    contient la première occurrence d'un des termes. La coupe se fait de
+    préférence en fin de ligne ; les parties retirées sont marquées par « … ».
+
+    Args:
+        text (str): Texte à réduire
+        terms (Iterable[str]): Termes recherchés (insensible à la casse)
+        max_chars (int): Taille maximale de l'extrait
+
+    Returns:
+        Tuple[str, bool]: Extrait, et True si le texte a été tronqué
+    """
+    if len(text) <= max_chars:
+        return text, False
+
+    lowered = text.lower()
+    positions = [lowered.find(term.lower()) for term in terms if term]
+    positions = [position for position in positions if position >= 0]
+    start = 0
+    if positions:
+        start = text.rfind("\n", 0, min(positions)) + 1
+        # Garder le début du texte si l'occurrence y tient entièrement
+        if min(positions) < max_chars // 2:
+            start = 0
+
+    room = max_chars - (len(ELLIPSIS) + 1 if start else 0) - len(ELLIPSIS) - 1
+    end = start + max(room, 0)
+    if end >= len(text):
+        end = len(text)
+    else:
+        newline = text.rfind("\n", start, end)
+        if newline > start + room // 2:
+            end = newline
+
+    excerpt = text[start:end].rstrip()
+    if start:
+        excerpt = f"{ELLIPSIS}\n{excerpt}"
+    if end < len(text):
+        excerpt = f"{excerpt}\n{ELLIPSIS}"
+    return excerpt, True
+
+
+def _source(passage: Dict[str, Any]) -> str:
+    return " › ".join(part for part in (passage["topic"], passage["subtopic"], passage["key"]) if part)
+
+
+def merge_passages(knowledge: Dict[str, List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Fusionne les passages trouvés pour plusieurs mots-clés. Un passage trouvé
+    par plusieurs mots-clés n'apparaît qu'une fois, avec la somme de ses scores :
+    il est d'autant mieux classé qu'il répond à une plus grande partie du message.
+
+    Args:
+        knowledge (Dict[str, List[Dict[str, Any]]]): Passages classés par mot-clé
+
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: Passages fusionnés (avec la liste des
+                                          mots-clés "keywords") triés par score
+                                          décroissant, et nombre de doublons retirés
+    """
+    merged: Dict[Tuple[str, Optional[str], Optional[str]], Dict[str, Any]] = {}
+    duplicates = 0
+    for keyword, passages in knowledge.items():
+        for passage in passages:
+            passage_id = (passage["topic"], passage["subtopic"], passage["key"])
+            entry = merged.get(passage_id)
+            if entry is None:
+                merged[passage_id] = dict(passage, keywords=[keyword])
+            else:
+                duplicates += 1
+                entry["score"] = round(entry["score"] + passage["score"], 6)
+                entry["keywords"].append(keyword)
+    ranked = sorted(merged.values(), key=lambda passage: passage["score"], reverse=True)
+    return ranked, duplicates
+
+
+def pack_context(knowledge: Dict[str, List[Dict[str, Any]]], budget_chars: int,
+                 passage_chars: int = DEFAULT_PASSAGE_CHARS) -> Dict[str, Any]:
+    """
+    Empaquette les passages sous le budget : dédoublonnage, classement, extrait
+    pertinent de chaque passage (au plus passage_chars caractères), puis ajout
+    dans l'ordre du classement tant que le budget le permet. Le dernier passage
+    est tronqué s'il reste au moins MIN_SNIPPET_CHARS caractères ; les suivants
+    sont écartés.
+
+    Args:
+        knowledge (Dict[str, List[Dict[str, Any]]]): Passages classés par mot-clé
+        budget_chars (int): Budget total, en caractères de texte de passage
+        passage_chars (int): Taille maximale d'un passage
+
+    Returns:
+        Dict[str, Any]: "passages" retenus (topic, subtopic, key, score, keywords,
+                        text, truncated), "dropped" (passages écartés et raison)
+                        et "stats" (budget, caractères utilisés, tokens estimés,
+                        doublons)
+    """
+    ranked, duplicates = merge_passages(knowledge)
+    packed: List[Dict[str, Any]] = []
+    dropped: List[Dict[str, Any]] = []
+    used = 0
+
+    for passage in ranked:
+        text = render_content(passage["content"])
+        remaining = budget_chars - used
+        # Seule la place restante décide de l'abandon : passage_chars tronque, même sous MIN_SNIPPET_CHARS
+        if not text or remaining < min(len(text), MIN_SNIPPET_CHARS):
+            dropped.append({
+                "source": _source(passage),
+                "score": passage["score"],
+                "chars": len(text),
+                "reason": "empty" if not text else "budget"
+            })
+            continue
+        text, truncated = snippet(text, passage["keywords"], min(passage_chars, remaining))
+        packed.append({
+            "topic": passage["topic"],
+            "subtopic": passage["subtopic"],
+            "key": passage["key"],
+            "score": passage["score"],
+            "keywords": passage["keywords"],
+            "text": text,
+            "truncated": truncated
+        })
+        used += len(text)
+
+    return {
+        "passages": packed,
+        "dropped": dropped,
+        "stats": {
+            "budget_chars": budget_chars,
+            "used_chars": used,
+            "estimated_tokens": -(-used // CHARS_PER_TOKEN),
+            "duplicates": duplicates,
+            "dropped": len(dropped)
+        }
+    }
+
+
+def build_messages(context: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Convertit le contexte préparé par l'agent en messages de chat : le prompt
+    système suivi du contexte de la conversation et des passages retenus, puis
+    le message de l'utilisateur.
+
+    Args:
+        context (Dict[str, Any]): Contexte (message, system_prompt, conversation, knowledge)
+
+    Returns:
+        List[Dict[str, str]]: Messages au format {"role": ..., "content": ...}
+    """
+    system = context.get("system_prompt") or ""
+    if context.get("conversation"):
+        system = f"{system}\n\nContexte de la conversation :\n\n{context['conversation']}".lstrip()
+    passages = context.get("knowledge") or []
+    if passages:
+        blocks = "\n\n".join(f"[{_source(passage)}]\n{passage['text']}" for passage in passages)
+        system = f"{system}\n\nExtraits de la base de connaissances :\n\n{blocks}".lstrip()
+
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": context["message"]})
+    return messages
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+"""
+Compression incrémentale du contexte des conversations.
+
+Les messages transmis par le serveur Node.js se terminent par un bloc
+« Contexte récent du canal: » (une ligne « auteur: texte » par message) qui
+reprend à chaque tour les derniers messages du canal. Pour chaque conversation,
+l'agent garde un état borné :
+- les derniers tours, mot pour mot ;
+- un résumé extractif des tours plus anciens : les phrases les plus
+  informatives, mises à jour quand un tour sort de la fenêtre récente ;
+- les arrivées et départs du canal et les salutations seules, réduits à un
+  décompte au lieu d'occuper le contexte ;
+- les répétitions exactes d'un même message, ignorées.
+
+Chaque tour ne traite que les lignes nouvelles du bloc (celles qui ne
+prolongent pas la fenêtre précédente) : le coût d'un tour est proportionnel
+aux nouveaux messages, et la taille du contexte reste bornée quelle que soit
+la durée de la conversation.
+"""
+
+import re
+import heapq
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Sequence, Tuple
+
+CONTEXT_MARKER = "Contexte récent du canal:"
+
+_LINE_RE = re.compile(r"^\s*([^\s:]+):\s?(.*)$")
+_MENTION_RE = re.compile(r"<@(\w+)>")
+_PRESENCE_RE = re.compile(r"has (joined|left) the channel|a (rejoint|quitté) (le canal|la chaîne)", re.IGNORECASE)
+_WORD_RE = re.compile(r"[^\W_]+(?:[-_./:][^\W_]+)*")
+_SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]*")
+
+GREETINGS = {
+    "salut", "bonjour", "bonsoir", "hello", "hi", "hey", "coucou", "yo", "bienvenu",
+    "bienvenue", "welcome", "merci", "thanks", "ok", "cc", "slt", "re", "guys", "tous",
+    "à", "a", "la", "team", "l", "équipe"
+}
+
+STOPWORDS = {
+    "les", "des", "une", "est", "sont", "pour", "par", "sur", "dans", "avec", "que", "qui",
+    "quoi", "pas", "plus", "mais", "nous", "vous", "ils", "elle", "tout", "tous", "cette",
+    "ces", "son", "ses", "leur", "aussi", "comme", "fait", "faire", "peux", "peut", "veux",
+    "veut", "juste", "avoir", "être", "the", "and", "for", "with", "this", "that", "you",
+    "are", "can", "not", "vasy", "svp", "stp"
+}
+
+DEFAULT_RECENT_TURNS = 8
+DEFAULT_DIGEST_SENTENCES = 6
+DEFAULT_TURN_CHARS = 500
+# Nombre de messages mémorisés pour ignorer les répétitions
+_SEEN_LIMIT = 2000
+
+
+def split_channel_context(message: str) -> Tuple[str, List[str]]:
+    """
+    Sépare la question de l'utilisateur du bloc « Contexte récent du canal ».
+
+    Args:
+        message (str): Message reçu
+
+    Returns:
+        Tuple[str, List[str]]: Question, et lignes non vides du bloc de contexte
+    """
+    question, marker, block = message.partition(CONTEXT_MARKER)
+    if not marker:
+        return message.strip(), []
+    return question.strip(), [line for line in block.splitlines() if line.strip()]
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(_MENTION_RE.sub(" ", text).lower())
+
+
+def is_greeting(text: str) -> bool:
+    """
+    Indique si un message ne contient qu'une salutation (mentions exceptées).
+
+    Args:
+        text (str): Texte du message
+
+    Returns:
+        bool: True pour « salut @x », « bienvenue à tous »...
+    """
+    words = _words(text)
+    return 0 < len(words) <= 4 and all(word in GREETINGS for word in words)
+
+
+def sentence_score(sentence: str) -> int:
+    """
+    Estime l'intérêt d'une phrase pour le résumé : nombre de termes porteurs de
+    sens distincts, avec un bonus pour les termes techniques (chiffres,
+    séparateurs : noms de fichiers, versions, commandes).
+
+    Args:
+        sentence (str): Phrase à évaluer
+
+    Returns:
+        int: Score (0 pour une phrase sans intérêt)
+    """
+    terms = {word for word in _words(sentence) if len(word) > 2 and word not in STOPWORDS}
+    technical = sum(1 for term in terms if any(c.isdigit() or c in "-_./:" for c in term))
+    return len(terms) + 2 * technical
+
+
+class RollingContext:
+    """
+    État compressé d'une conversation, mis à jour tour par tour. Sûr entre threads.
+    """
+
+    def __init__(self, recent_turns: int = DEFAULT_RECENT_TURNS,
+                 digest_sentences: int = DEFAULT_DIGEST_SENTENCES,
+                 turn_chars: int = DEFAULT_TURN_CHARS):
+        """
+        Initialise un état vide.
+
+        Args:
+            recent_turns (int): Nombre de tours gardés mot pour mot
+            digest_sentences (int): Nombre de phrases gardées dans le résumé
+            turn_chars (int): Taille maximale d'un tour, en caractères
+        """
+        self.recent_turns = recent_turns
+        self.digest_sentences = digest_sentences
+        self.turn_chars = turn_chars
+        self.recent: Deque[Tuple[str, str]] = deque()
+        # Tas (score, numéro, auteur, phrase) des phrases les plus informatives
+        self._digest: List[Tuple[int, int, str, str]] = []
+        self._sequence = 0
+        self._window: List[str] = []
+        self._seen: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self.arrivals: "OrderedDict[str, None]" = OrderedDict()
+        self.departures: "OrderedDict[str, None]" = OrderedDict()
+        self.greetings = 0
+        self.repeats = 0
+        self.turns = 0
+        self._lock = threading.Lock()
+
+    def observe_window(self, lines: Sequence[str]) -> int:
+        """
+        Intègre un bloc « Contexte récent du canal ». Seules les lignes qui ne
+        prolongent pas le bloc précédent sont traitées.
+
+        Args:
+            lines (Sequence[str]): Lignes « auteur: texte » du bloc
+
+        Returns:
+            int: Nombre de lignes nouvelles
+        """
+        lines = list(lines)
+        with self._lock:
+            overlap = 0
+            for size in range(min(len(self._window), len(lines)), 0, -1):
+                if self._window[-size:] == lines[:size]:
+                    overlap = size
+                    break
+            new_lines = lines[overlap:]
+            self._window = lines
+            for line in new_lines:
+                match = _LINE_RE.match(line)
+                speaker, text = match.groups() if match else ("", line)
+                self._add(speaker, text)
+            return len(new_lines)
+
+    def add_turn(self, speaker: str, text: str) -> None:
+        """
+        Ajoute un tour hors du bloc de contexte (question directe, réponse de l'agent).
+
+        Args:
+            speaker (str): Auteur du tour
+            text (str): Texte du tour
+        """
+        with self._lock:
+            self._add(speaker, text)
+
+    def _add(self, speaker: str, text: str) -> None:
+        text = text.strip()
+        if not text:
+            return
+        if _PRESENCE_RE.search(text):
+            joined = "left" not in text.lower() and "quitté" not in text.lower()
+            target = self.arrivals if joined else self.departures
+            target[speaker] = None
+            target.move_to_end(speaker)
+            while len(target) > 20:
+                target.popitem(last=False)
+            return
+        if is_greeting(text):
+            self.greetings += 1
+            return
+
+        signature = (speaker, " ".join(_words(text)))
+        if signature in self._seen:
+            self.repeats += 1
+            return
+        self._seen[signature] = None
+        if len(self._seen) > _SEEN_LIMIT:
+            self._seen.popitem(last=False)
+
+        if len(text) > self.turn_chars:
+            text = text[:self.turn_chars].rstrip() + "…"
+        self.recent.append((speaker, text))
+        self.turns += 1
+        while len(self.recent) > self.recent_turns:
+            self._fold(*self.recent.popleft())
+
+    def _fold(self, speaker: str, text: str) -> None:
+        """Fait entrer un tour sorti de la fenêtre récente dans le résumé."""
+        for sentence in _SENTENCE_RE.findall(text):
+            sentence = sentence.strip()
+            score = sentence_score(sentence)
+            if score < 2:
+                continue
+            self._sequence += 1
+            item = (score, self._sequence, speaker, sentence)
+            if len(self._digest) < self.digest_sentences:
+                heapq.heappush(self._digest, item)
+            elif item > self._digest[0]:
+                heapq.heapreplace(self._digest, item)
+
+    def render(self) -> str:
+        """
+        Produit le texte du contexte de conversation : résumé, événements du
+        canal, puis derniers tours.
+
+        Returns:
+            str: Contexte, vide si la conversation n'a encore rien apporté
+        """
+        with self._lock:
+            sections = []
+            if self._digest:
+                digest = sorted(self._digest, key=lambda item: item[1])
+                sections.append("Résumé des échanges précédents :\n" + "\n".join(
+                    f"- {speaker}: {sentence}" for _, _, speaker, sentence in digest
+                ))
+            events = []
+            if self.arrivals:
+                events.append("arrivées : " + ", ".join(self.arrivals))
+            if self.departures:
+                events.append("départs : " + ", ".join(self.departures))
+            if self.greetings:
+                events.append(f"{self.greetings} salutation(s)")
+            if self.repeats:
+                events.append(f"{self.repeats} message(s) répété(s)")
+            if events:
+                sections.append("Canal : " + " ; ".join(events))
+            if self.recent:
+                sections.append("Échanges récents :\n" + "\n".join(
+                    f"{speaker}: {text}" if speaker else text for speaker, text in self.recent
+                ))
+            return "\n\n".join(sections)
+
+    def recent_text(self) -> str:
+        """
+        Retourne le texte des derniers tours, sans les auteurs.
+
+        Returns:
+            str: Textes des tours récents, un par ligne
+        """
+        with self._lock:
+            return "\n".join(text for _, text in self.recent)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retourne les compteurs de l'état.
+
+        Returns:
+            Dict[str, int]: Tours retenus, tours récents, phrases du résumé,
+                            salutations et répétitions ignorées
+        """
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "recent": len(self.recent),
+                "digest": len(self._digest),
+                "greetings": self.greetings,
+                "repeats": self.repeats
+            }
+
+
+def rolling_context_from_config(config: Dict) -> RollingContext:
+    """
+    Crée un état de conversation avec les réglages de la configuration d'un agent.
+
+    Args:
+        config (Dict): Configuration de l'agent (conversation_recent_turns,
+                       conversation_digest_sentences, conversation_turn_chars)
+
+    Returns:
+        RollingContext: État vide
+    """
+    return RollingContext(
+        recent_turns=config.get("conversation_recent_turns", DEFAULT_RECENT_TURNS),
+        digest_sentences=config.get("conversation_digest_sentences", DEFAULT_DIGEST_SENTENCES),
+        turn_chars=config.get("conversation_turn_chars", DEFAULT_TURN_CHARS)
+    )
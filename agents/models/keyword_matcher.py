@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Extraction de mots-clés en une seule passe.
+Le vocabulaire est compilé une fois en une expression régulière unique
+(alternance triée du plus long au plus court) qui respecte le début des mots.
+Comme la recherche par sous-chaîne d'origine, un mot-clé d'au moins
+STEM_LENGTH caractères reconnaît les mots qui le prolongent ("containers",
+"pipelines", "Dockerfile") ; un mot-clé plus court ne tolère qu'un pluriel en
+"s", pour ne pas reconnaître "elk" dans "elkhound".
+
+En repli, fuzzy_finditer() reconnaît les mots-clés d'un seul mot malgré une
+faute de frappe ("kubernets", "terrafrom"), par un index de trigrammes du
+vocabulaire (voir knowledge_base.fuzzy) construit au premier repli. Chaque mot
+du message étant essayé, la correction écarte les mots usuels proches d'un
+mot-clé : la première lettre doit être la même, ou échangée avec la deuxième
+("locker" n'est pas "docker", "odcker" l'est),
+et un mot terminé par une flexion que le mot-clé n'a pas ("contains",
+"contained", "docked") est un autre mot, pas une faute de frappe.
+"""
+
+import os
+import re
+import sys
+from typing import Any, List, Iterable, NamedTuple, Optional
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+# Longueur à partir de laquelle un mot-clé reconnaît aussi les mots qui le prolongent
+STEM_LENGTH = 5
+
+# Terminaisons de flexion (anglais et français) écartées par la correction des fautes de frappe
+_INFLECTIONS = ("s", "ed", "ing", "é", "ée", "és", "ées", "ent")
+
+
+class KeywordMatch(NamedTuple):
+    """Occurrence d'un mot-clé dans un message."""
+    keyword: str
+    start: int
+    end: int
+
+
+class KeywordMatcher:
+    """
+    Reconnaît les mots-clés d'un vocabulaire dans un texte en un seul parcours.
+    Les correspondances sont insensibles à la casse et ne commencent jamais à
+    l'intérieur d'un mot ("aws" ne correspond pas à "laws") ; l'occurrence
+    couvre le mot entier ("deployments" pour "deployment").
+    """
+
+    def __init__(self, vocabulary: Iterable[str]):
+        """
+        Compile le vocabulaire.
+
+        Args:
+            vocabulary (Iterable[str]): Mots-clés à reconnaître
+        """
+        self.keywords: List[str] = []
+        for keyword in vocabulary:
+            normalized = keyword.strip().lower()
+            if normalized and normalized not in self.keywords:
+                self.keywords.append(normalized)
+
+        self._fuzzy: Any = None
+        self._pattern: Optional[re.Pattern] = None
+        if self.keywords:
+            # Les mots-clés les plus longs d'abord : "github actions" avant "github" ;
+            # le second groupe est la fin du mot, vérifiée ensuite pour les mots-clés courts
+            alternation = "|".join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+            self._pattern = re.compile(rf"(?<!\w)({alternation})(\w*)", re.IGNORECASE)
+
+    def finditer(self, text: str) -> List[KeywordMatch]:
+        """
+        Retourne toutes les occurrences des mots-clés dans le texte.
+
+        Args:
+            text (str): Texte à analyser
+
+        Returns:
+            List[KeywordMatch]: Occurrences, dans l'ordre du texte
+        """
+        if self._pattern is None:
+            return []
+        matches = []
+        for match in self._pattern.finditer(text):
+            keyword, rest = match.groups()
+            if rest and len(keyword) < STEM_LENGTH and rest not in ("s", "S"):
+                continue
+            matches.append(KeywordMatch(keyword.lower(), match.start(), match.end()))
+        return matches
+
+    def extract(self, text: str) -> List[str]:
+        """
+        Retourne les mots-clés distincts présents dans le texte.
+
+        Args:
+            text (str): Texte à analyser
+
+        Returns:
+            List[str]: Mots-clés, dans l'ordre de leur première occurrence
+        """
+        return list(dict.fromkeys(match.keyword for match in self.finditer(text)))
+
+    def fuzzy_finditer(self, text: str) -> List[KeywordMatch]:
+        """
+        Retourne les mots du texte proches d'un mot-clé d'un seul mot (distance
+        d'édition bornée, voir knowledge_base.fuzzy). À utiliser en repli,
+        quand finditer() ne trouve rien.
+
+        Args:
+            text (str): Texte à analyser
+
+        Returns:
+            List[KeywordMatch]: Occurrences (mot-clé corrigé, début, fin), dans l'ordre du texte
+        """
+        if self._fuzzy is None:
+            # Importé au premier repli seulement (démarrage à froid)
+            try:
+                from knowledge_base.fuzzy import FuzzyIndex
+            except ImportError:
+                # Exécution directe du module : le répertoire agents/ n'est pas dans le chemin
+                sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+                from knowledge_base.fuzzy import FuzzyIndex
+            self._fuzzy = FuzzyIndex(keyword for keyword in self.keywords if _WORD_RE.fullmatch(keyword))
+        matches = []
+        for match in _WORD_RE.finditer(text):
+            word = match.group(0).lower()
+            for keyword, _ in self._fuzzy.lookup(word):
+                if _plausible_typo(word, keyword):
+                    matches.append(KeywordMatch(keyword, match.start(), match.end()))
+                    break
+        return matches
+
+
+def _plausible_typo(word: str, keyword: str) -> bool:
+    """
+    Indique si un mot proche d'un mot-clé en est vraisemblablement une faute de
+    frappe, plutôt qu'un autre mot (voir fuzzy_finditer).
+
+    Args:
+        word (str): Mot du message, en minuscules
+        keyword (str): Mot-clé proche
+
+    Returns:
+        bool: True si la correction est retenue
+    """
+    # Première lettre identique, ou inversée avec la deuxième ("odcker")
+    if word[0] != keyword[0] and word[:2] != keyword[1::-1]:
+        return False
+    return not any(word.endswith(ending) and not keyword.endswith(ending) for ending in _INFLECTIONS)
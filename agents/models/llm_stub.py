@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+"""
+Serveur factice compatible OpenAI, pour tester models.openai_backend hors ligne.
+
+Répond à POST /v1/chat/completions (ou /chat/completions) en JSON, ou en
+streaming (événements SSE en encodage chunked) si la requête contient
+"stream": true. Les connexions sont gardées ouvertes (keep-alive), et
+GET /stats retourne les compteurs (connexions, requêtes, échecs simulés, pic
+de requêtes simultanées) pour vérifier la réutilisation des connexions et le
+plafond de concurrence.
+
+Options de simulation : --latency (délai avant la réponse), --token-delay
+(délai entre deux morceaux), --fail-rate et --fail-status (échecs aléatoires,
+pour tester les nouvelles tentatives).
+
+Usage :
+    python agents/models/llm_stub.py --port 8089
+puis, dans la configuration de l'agent :
+    "llm": {"backend": "openai", "base_url": "http://127.0.0.1:8089/v1"}
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+
+class StubServer:
+    """
+    Serveur HTTP/1.1 minimal imitant l'API chat completions.
+    """
+
+    def __init__(self, latency: float = 0.0, token_delay: float = 0.0, fail_rate: float = 0.0,
+                 fail_status: int = 503, seed: Optional[int] = None):
+        """
+        Initialise le serveur.
+
+        Args:
+            latency (float): Délai avant la réponse, en secondes
+            token_delay (float): Délai entre deux morceaux en streaming, en secondes
+            fail_rate (float): Proportion de requêtes en échec (entre 0 et 1)
+            fail_status (int): Statut HTTP des échecs simulés
+            seed (Optional[int]): Graine du tirage des échecs
+        """
+        self.latency = latency
+        self.token_delay = token_delay
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self._random = random.Random(seed)
+        self.connections = 0
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retourne les compteurs du serveur.
+
+        Returns:
+            Dict[str, int]: Connexions, requêtes, échecs simulés et pic de requêtes simultanées
+        """
+        return {
+            "connections": self.connections,
+            "requests": self.requests,
+            "failures": self.failures,
+            "max_in_flight": self.max_in_flight
+        }
+
+    @staticmethod
+    def answer(messages: List[Dict[str, Any]]) -> str:
+        """
+        Construit la réponse factice : rappel du dernier message de l'utilisateur
+        et nombre d'extraits de contexte reçus.
+
+        Args:
+            messages (List[Dict[str, Any]]): Messages de la requête
+
+        Returns:
+            str: Réponse
+        """
+        user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+        passages = len(re.findall(r"^\[.+\]$", system, re.MULTILINE))
+        return f"Réponse simulée à « {user} » ({passages} extrait(s) de contexte)."
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Traite les requêtes successives d'une connexion."""
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+
+                await self._dispatch(writer, method, path, body)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, writer: asyncio.StreamWriter, method: str, path: str, body: bytes) -> None:
+        if method == "GET" and path == "/stats":
+            await self._write_json(writer, 200, self.stats())
+            return
+        if method != "POST" or not path.endswith("/chat/completions"):
+            await self._write_json(writer, 404, {"error": {"message": f"{method} {path} introuvable"}})
+            return
+
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.fail_rate and self._random.random() < self.fail_rate:
+                self.failures += 1
+                await self._write_json(writer, self.fail_status, {"error": {"message": "Échec simulé"}})
+                return
+
+            try:
+                request = json.loads(body)
+                text = self.answer(request["messages"])
+            except (ValueError, KeyError, TypeError):
+                await self._write_json(writer, 400, {"error": {"message": "Requête invalide"}})
+                return
+
+            model = request.get("model", "stub")
+            if request.get("stream"):
+                await self._write_stream(writer, model, text)
+            else:
+                await self._write_json(writer, 200, {
+                    "id": f"chatcmpl-stub-{self.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": "stop"
+                    }]
+                })
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    async def _write_json(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} Stub\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, model: str, text: str) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n"
+        )
+
+        async def send(data: str) -> None:
+            chunk = f"data: {data}\n\n".encode("utf-8")
+            writer.write(f"{len(chunk):x}\r\n".encode("latin-1") + chunk + b"\r\n")
+            await writer.drain()
+
+        for token in re.findall(r"\S+\s*", text):
+            await send(json.dumps({
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }))
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+        await send("[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """
+        Démarre l'écoute dans la boucle asyncio courante.
+
+        Args:
+            host (str): Adresse d'écoute
+            port (int): Port d'écoute (0 pour un port libre)
+
+        Returns:
+            asyncio.AbstractServer: Serveur démarré
+        """
+        return await asyncio.start_server(self.handle, host=host, port=port)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    stub = StubServer(args.latency, args.token_delay, args.fail_rate, args.fail_status, args.seed)
+    server = await stub.start(args.host, args.port)
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f"Serveur factice en écoute sur http://{host}:{port}/v1", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serveur factice compatible OpenAI (chat completions)")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=8089, help="Port d'écoute")
+    parser.add_argument("--latency", type=float, default=0.0, help="Délai avant la réponse, en secondes")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Délai entre deux morceaux, en secondes")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Proportion de requêtes en échec")
+    parser.add_argument("--fail-status", type=int, default=503, help="Statut HTTP des échecs simulés")
+    parser.add_argument("--seed", type=int, help="Graine du tirage des échecs")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
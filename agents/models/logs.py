@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+"""
+Journalisation des agents hors du chemin des requêtes.
+
+Les enregistrements du logger "agent" passent par une file bornée : le thread
+qui traite une requête ne fait que filtrer (niveau, échantillonnage) et déposer
+l'enregistrement, sans formatage ni écriture. Un thread d'arrière-plan formate
+les enregistrements (messages ``%`` évalués à ce moment seulement) et les écrit
+sur la sortie d'erreur ou dans un fichier, jamais sur la sortie standard, qui
+porte les réponses JSON d'agent_server.py. Si la file est pleine,
+l'enregistrement est abandonné et compté plutôt que de bloquer la requête.
+
+Format "json" (par défaut) : un objet par ligne avec ts, level, logger, msg et
+les champs passés par ``extra=`` ; format "text" : une ligne lisible.
+
+Réglages (arguments de configure_logging, ou variables d'environnement) :
+- JAMONO_LOG_LEVEL : DEBUG, INFO (par défaut), WARNING, ERROR ou OFF ;
+- JAMONO_LOG_FILE : fichier de destination (sortie d'erreur par défaut) ;
+- JAMONO_LOG_FORMAT : json ou text ;
+- JAMONO_LOG_SAMPLE : proportion gardée par niveau, ex. "DEBUG=0.01,INFO=0.1"
+  (les niveaux non cités sont tous gardés) ;
+- JAMONO_LOG_QUEUE : taille de la file (10000 par défaut).
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+LOGGER_NAME = "agent"
+DEFAULT_LEVEL = "INFO"
+DEFAULT_FORMAT = "json"
+DEFAULT_QUEUE_SIZE = 10000
+# Niveau qui désactive la journalisation
+OFF = logging.CRITICAL + 10
+
+# logging.handlers n'est pas utilisé : son import (socket, pickle) pèse sur le
+# démarrage à froid du mode commande
+
+# Attributs standard d'un LogRecord (les autres viennent de ``extra=``)
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formate un enregistrement en objet JSON sur une ligne.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Garde une proportion fixe des enregistrements de certains niveaux (un sur
+    N, de façon déterministe).
+    """
+
+    def __init__(self, rates: Dict[int, float]):
+        """
+        Args:
+            rates (Dict[int, float]): Proportion gardée (entre 0 et 1) par niveau
+        """
+        super().__init__()
+        self.periods = {level: (0 if rate <= 0 else max(1, round(1 / rate))) for level, rate in rates.items()}
+        self.counters = {level: 0 for level in rates}
+        self.sampled_out = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        period = self.periods.get(record.levelno)
+        if period is None or period == 1:
+            return True
+        with self._lock:
+            if period:
+                count = self.counters[record.levelno]
+                self.counters[record.levelno] = count + 1
+                if count % period == 0:
+                    return True
+            self.sampled_out += 1
+            return False
+
+
+class NonBlockingQueueHandler(logging.Handler):
+    """
+    Dépose les enregistrements dans une file bornée sans les formater ; les
+    enregistrements sont abandonnés (et comptés) si la file est pleine.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[Optional[logging.LogRecord]]"):
+        super().__init__()
+        self.queue = log_queue
+        self.dropped = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Le formatage est laissé au thread d'écriture. Seule la trace d'une
+        # exception doit être capturée tant que la pile existe encore.
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Writer:
+    """
+    Thread d'écriture : formate et écrit les enregistrements de la file.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[Optional[logging.LogRecord]]", target: logging.Handler):
+        self.queue = log_queue
+        self.target = target
+        self._thread = threading.Thread(target=self._run, name="agent-log-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            record = self.queue.get()
+            if record is None:
+                break
+            self.target.handle(record)
+
+    def stop(self) -> None:
+        """Écrit les enregistrements en attente, puis arrête le thread."""
+        self.queue.put(None)
+        self._thread.join()
+        self.target.close()
+
+
+def parse_sample(spec: str) -> Dict[int, float]:
+    """
+    Lit une spécification d'échantillonnage.
+
+    Args:
+        spec (str): Couples NIVEAU=proportion séparés par des virgules (ex. "INFO=0.1")
+
+    Returns:
+        Dict[int, float]: Proportion gardée par niveau
+
+    Raises:
+        ValueError: Si un niveau ou une proportion n'est pas valide
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        level = logging.getLevelName(name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Niveau de journalisation inconnu: {name}")
+        rates[level] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+def _parse_level(level: str) -> int:
+    if level.upper() == "OFF":
+        return OFF
+    value = logging.getLevelName(level.upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Niveau de journalisation inconnu: {level}")
+    return value
+
+
+_writer: Optional[_Writer] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+_sampler: Optional[SamplingFilter] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging(level: Optional[str] = None, destination: Optional[str] = None,
+                      fmt: Optional[str] = None, sample: Optional[str] = None,
+                      queue_size: Optional[int] = None) -> logging.Logger:
+    """
+    Configure le logger "agent" : file bornée et thread d'écriture. Un nouvel
+    appel remplace la configuration précédente (après écriture des
+    enregistrements en attente).
+
+    Args:
+        level (Optional[str]): Niveau minimal, ou "OFF" (JAMONO_LOG_LEVEL, INFO par défaut)
+        destination (Optional[str]): Fichier de destination, ou "-" pour la sortie
+                                     d'erreur (JAMONO_LOG_FILE, sortie d'erreur par défaut)
+        fmt (Optional[str]): "json" ou "text" (JAMONO_LOG_FORMAT, json par défaut)
+        sample (Optional[str]): Échantillonnage par niveau (JAMONO_LOG_SAMPLE)
+        queue_size (Optional[int]): Taille de la file (JAMONO_LOG_QUEUE)
+
+    Returns:
+        logging.Logger: Logger "agent"
+
+    Raises:
+        ValueError: Si un réglage n'est pas valide
+    """
+    global _writer, _handler, _sampler
+
+    level_value = _parse_level(level or os.environ.get("JAMONO_LOG_LEVEL", DEFAULT_LEVEL))
+    destination = destination or os.environ.get("JAMONO_LOG_FILE") or "-"
+    fmt = (fmt or os.environ.get("JAMONO_LOG_FORMAT", DEFAULT_FORMAT)).lower()
+    if fmt not in ("json", "text"):
+        raise ValueError(f"Format de journalisation inconnu: {fmt}")
+    rates = parse_sample(sample if sample is not None else os.environ.get("JAMONO_LOG_SAMPLE", ""))
+    queue_size = queue_size or int(os.environ.get("JAMONO_LOG_QUEUE", DEFAULT_QUEUE_SIZE))
+
+    logger = logging.getLogger(LOGGER_NAME)
+    with _configure_lock:
+        _shutdown()
+        logger.setLevel(level_value)
+        logger.propagate = False
+        if level_value >= OFF:
+            logger.addHandler(logging.NullHandler())
+            return logger
+
+        target = logging.StreamHandler(sys.stderr) if destination == "-" else logging.FileHandler(destination, encoding="utf-8")
+        target.setFormatter(StructuredFormatter() if fmt == "json" else
+                            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+        _handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+        if rates:
+            _sampler = SamplingFilter(rates)
+            _handler.addFilter(_sampler)
+        _writer = _Writer(_handler.queue, target)
+        logger.addHandler(_handler)
+    return logger
+
+
+def _shutdown() -> None:
+    """Écrit les enregistrements en attente et retire la configuration courante."""
+    global _writer, _handler, _sampler
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    if _writer is not None:
+        _writer.stop()
+    _writer = _handler = _sampler = None
+
+
+def shutdown_logging() -> None:
+    """Écrit les enregistrements en attente et arrête le thread d'écriture."""
+    with _configure_lock:
+        _shutdown()
+
+
+def logging_stats() -> Dict[str, int]:
+    """
+    Retourne les compteurs de la journalisation.
+
+    Returns:
+        Dict[str, int]: Enregistrements en attente, abandonnés (file pleine) et
+                        écartés par l'échantillonnage
+    """
+    handler, sampler = _handler, _sampler
+    return {
+        "queued": handler.queue.qsize() if handler is not None else 0,
+        "dropped": handler.dropped if handler is not None else 0,
+        "sampled_out": sampler.sampled_out if sampler is not None else 0
+    }
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+"""
+Mesures du traitement des messages.
+
+RequestMetrics collecte, pour un message, la durée de chaque étape
+(conversation, mots-clés, recherche, contexte, génération), le délai avant le
+premier morceau de réponse et des compteurs (mots-clés, passages trouvés,
+taille du contexte). Les agents reçoivent NULL_METRICS quand les mesures ne
+sont pas demandées : ses méthodes ne font rien, sans lecture d'horloge.
+
+MetricsRegistry agrège les mesures des modes démon et lot en histogrammes,
+exposés au format texte de Prometheus.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+STAGES = ("conversation", "keywords", "search", "context", "generation")
+
+# Bornes des histogrammes : durées en secondes, puis compteurs
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+KEYWORD_BUCKETS = (0, 1, 2, 3, 5, 8, 13)
+HIT_BUCKETS = (0, 1, 2, 5, 10, 20, 50)
+BYTE_BUCKETS = (256, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+
+class RequestMetrics:
+    """
+    Mesures du traitement d'un message. Un objet par message, utilisé par un seul thread.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        """Démarre la mesure."""
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.first_chunk: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.cache_hit = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Mesure la durée d'une étape (cumulée si l'étape se répète).
+
+        Args:
+            name (str): Nom de l'étape (voir STAGES)
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def timed(self, name: str, chunks: Iterator[str]) -> Iterator[str]:
+        """
+        Mesure une étape qui produit la réponse par morceaux : seul le temps passé
+        à produire les morceaux compte, pas celui de leur consommation.
+
+        Args:
+            name (str): Nom de l'étape
+            chunks (Iterator[str]): Morceaux produits par l'étape
+
+        Yields:
+            str: Mêmes morceaux
+        """
+        iterator = iter(chunks)
+        while True:
+            started = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+            if self.first_chunk is None:
+                self.first_chunk = time.perf_counter()
+            yield chunk
+
+    def count(self, name: str, value: int) -> None:
+        """
+        Ajoute une valeur à un compteur.
+
+        Args:
+            name (str): Nom du compteur (keywords, hits, passages, context_bytes...)
+            value (int): Valeur à ajouter
+        """
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def mark_cache_hit(self) -> None:
+        """Indique que la réponse a été servie par le cache de réponses."""
+        self.cache_hit = True
+
+    def finish(self) -> None:
+        """Termine la mesure."""
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    def total(self) -> float:
+        """
+        Retourne la durée totale, en secondes (jusqu'à maintenant si la mesure n'est pas terminée).
+
+        Returns:
+            float: Durée totale
+        """
+        return (self.finished or time.perf_counter()) - self.started
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Retourne les mesures sous la forme du champ "metrics" des réponses.
+
+        Returns:
+            Dict[str, Any]: total_ms, first_chunk_ms, stages_ms, cache_hit et compteurs
+        """
+        result: Dict[str, Any] = {
+            "total_ms": round(self.total() * 1000, 3),
+            "first_chunk_ms": None if self.first_chunk is None else round((self.first_chunk - self.started) * 1000, 3),
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            "cache_hit": self.cache_hit
+        }
+        result.update(self.counts)
+        return result
+
+
+class _NullMetrics:
+    """Mesures désactivées : aucune méthode ne lit l'horloge."""
+
+    enabled = False
+
+    def stage(self, name: str):
+        return _NULL_STAGE
+
+    def timed(self, name: str, chunks: Iterator[str]) -> Iterator[str]:
+        return chunks
+
+    def count(self, name: str, value: int) -> None:
+        pass
+
+    def mark_cache_hit(self) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+class _NullStage:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+_NULL_STAGE = _NullStage()
+NULL_METRICS = _NullMetrics()
+
+
+class Histogram:
+    """
+    Histogramme à bornes fixes, par combinaison d'étiquettes, sûr entre threads.
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], label_names: Sequence[str] = ()):
+        """
+        Initialise l'histogramme.
+
+        Args:
+            name (str): Nom de la métrique
+            help_text (str): Description (ligne HELP)
+            buckets (Sequence[float]): Bornes supérieures croissantes
+            label_names (Sequence[str]): Noms des étiquettes
+        """
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        # Étiquettes -> [effectifs par borne (+Inf compris), somme, nombre]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Enregistre une observation.
+
+        Args:
+            value (float): Valeur observée
+            *labels (str): Valeurs des étiquettes, dans l'ordre de label_names
+        """
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        """
+        Retourne les lignes de l'histogramme au format texte de Prometheus.
+
+        Returns:
+            List[str]: Lignes HELP, TYPE puis séries
+        """
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, [list(values[0]), values[1], values[2]]) for labels, values in self._series.items())
+        for labels, (counts, total, count) in series:
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = ",".join(pairs + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{suffix} {total:g}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """
+    Agrégation des mesures des messages traités par un processus.
+    """
+
+    def __init__(self):
+        """Crée les histogrammes."""
+        self.request_seconds = Histogram(
+            "jamono_agent_request_seconds", "Durée de traitement d'un message",
+            SECONDS_BUCKETS, ("agent", "cache"))
+        self.first_chunk_seconds = Histogram(
+            "jamono_agent_first_chunk_seconds", "Délai avant le premier morceau de réponse",
+            SECONDS_BUCKETS, ("agent",))
+        self.stage_seconds = Histogram(
+            "jamono_agent_stage_seconds", "Durée de chaque étape du traitement d'un message",
+            SECONDS_BUCKETS, ("agent", "stage"))
+        self.keywords = Histogram(
+            "jamono_agent_keywords", "Nombre de mots-clés extraits par message", KEYWORD_BUCKETS, ("agent",))
+        self.hits = Histogram(
+            "jamono_agent_knowledge_hits", "Nombre de passages trouvés par message", HIT_BUCKETS, ("agent",))
+        self.context_bytes = Histogram(
+            "jamono_agent_context_bytes", "Taille du contexte transmis au modèle, en octets", BYTE_BUCKETS, ("agent",))
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, agent: str, metrics: RequestMetrics) -> None:
+        """
+        Ajoute les mesures d'un message aux histogrammes.
+
+        Args:
+            agent (str): Nom de l'agent
+            metrics (RequestMetrics): Mesures du message
+        """
+        self.request_seconds.observe(metrics.total(), agent, "hit" if metrics.cache_hit else "miss")
+        if metrics.first_chunk is not None:
+            self.first_chunk_seconds.observe(metrics.first_chunk - metrics.started, agent)
+        for stage, seconds in metrics.stages.items():
+            self.stage_seconds.observe(seconds, agent, stage)
+        if metrics.cache_hit:
+            return
+        self.keywords.observe(metrics.counts.get("keywords", 0), agent)
+        self.hits.observe(metrics.counts.get("hits", 0), agent)
+        self.context_bytes.observe(metrics.counts.get("context_bytes", 0), agent)
+
+    def record_error(self) -> None:
+        """Compte un message en erreur."""
+        with self._lock:
+            self.errors += 1
+
+    def render(self) -> str:
+        """
+        Retourne toutes les métriques au format texte de Prometheus.
+
+        Returns:
+            str: Exposition complète, terminée par un saut de ligne
+        """
+        lines: List[str] = []
+        for histogram in (self.request_seconds, self.first_chunk_seconds, self.stage_seconds,
+                          self.keywords, self.hits, self.context_bytes):
+            lines.extend(histogram.render())
+        lines.append("# HELP jamono_agent_errors_total Nombre de messages en erreur")
+        lines.append("# TYPE jamono_agent_errors_total counter")
+        lines.append(f"jamono_agent_errors_total {self.errors}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,603 @@
+#!/usr/bin/env python
+"""
+Moteur de génération pour les API compatibles OpenAI (POST {base_url}/chat/completions).
+
+Le client HTTP/1.1 est écrit sur asyncio (bibliothèque standard uniquement) :
+- les connexions sont gardées ouvertes (keep-alive) dans un pool partagé par
+  tous les agents du processus, au lieu d'une connexion par message ;
+- chaque requête a un délai de connexion et un délai de réponse (délai entre
+  deux morceaux en streaming) ;
+- les échecs transitoires (connexion, délai dépassé, statuts 408/409/429/5xx)
+  sont réessayés au plus max_retries fois, avec un délai exponentiel aléatoire
+  (« full jitter ») ou le délai demandé par l'en-tête Retry-After ; une réponse
+  en streaming n'est plus réessayée une fois le premier morceau transmis ;
+- le nombre de requêtes en cours est plafonné pour tout le processus
+  (MAX_IN_FLIGHT, variable d'environnement JAMONO_LLM_MAX_IN_FLIGHT).
+
+Toutes les entrées-sorties s'exécutent dans une boucle asyncio dédiée, dans un
+thread d'arrière-plan : les appelants synchrones (Agent.process_message) comme
+les coroutines d'autres boucles (acomplete) partagent ainsi le même pool et le
+même plafond.
+
+Configuration de l'agent (clé "llm") :
+    {"backend": "openai", "base_url": "https://api.openai.com/v1",
+     "model": "gpt-4o", "api_key_env": "OPENAI_API_KEY", "timeout": 30,
+     "connect_timeout": 5, "max_retries": 2, "temperature": 0.3,
+     "max_tokens": null}
+
+Le serveur factice models/llm_stub.py permet de tester ce moteur hors ligne.
+"""
+
+import os
+import ssl
+import json
+import time
+import queue
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    from .agent import LLMBackend
+    from .context import build_messages
+except ImportError:
+    # Exécution directe du module
+    from agent import LLMBackend
+    from context import build_messages
+
+logger = logging.getLogger("agent")
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-4o"
+
+# Plafond du nombre de requêtes en cours, pour tout le processus
+MAX_IN_FLIGHT = int(os.environ.get("JAMONO_LLM_MAX_IN_FLIGHT", "8"))
+
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+# Taille maximale lue d'un corps de réponse en erreur
+_ERROR_BODY_LIMIT = 4096
+
+
+class LLMError(Exception):
+    """Échec d'un appel au modèle de langage."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retryable: bool = False,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class _Connection:
+    """Connexion HTTP/1.1 ouverte vers un hôte."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class ConnectionPool:
+    """
+    Pool de connexions keep-alive, par (schéma, hôte, port). À utiliser depuis
+    une seule boucle asyncio.
+    """
+
+    def __init__(self, max_idle_per_host: int = 8, idle_timeout: float = 30.0):
+        """
+        Initialise un pool vide.
+
+        Args:
+            max_idle_per_host (int): Nombre maximal de connexions inactives gardées par hôte
+            idle_timeout (float): Durée au-delà de laquelle une connexion inactive est fermée, en secondes
+        """
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout = idle_timeout
+        self._idle: Dict[Tuple[str, str, int], List[_Connection]] = {}
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self, key: Tuple[str, str, int], connect_timeout: float) -> _Connection:
+        """
+        Retourne une connexion inactive encore valide, ou en ouvre une nouvelle.
+
+        Args:
+            key (Tuple[str, str, int]): Schéma, hôte et port
+            connect_timeout (float): Délai de connexion, en secondes
+
+        Returns:
+            _Connection: Connexion prête pour une requête
+        """
+        idle = self._idle.get(key)
+        now = time.monotonic()
+        while idle:
+            connection = idle.pop()
+            if not connection.reader.at_eof() and now - connection.last_used < self.idle_timeout:
+                connection.reused = True
+                self.reused += 1
+                return connection
+            connection.close()
+
+        scheme, host, port = key
+        ssl_context = ssl.create_default_context() if scheme == "https" else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=ssl_context), connect_timeout
+        )
+        self.opened += 1
+        return _Connection(reader, writer)
+
+    def release(self, key: Tuple[str, str, int], connection: _Connection, reusable: bool) -> None:
+        """
+        Rend une connexion au pool, ou la ferme si elle ne peut pas être réutilisée.
+
+        Args:
+            key (Tuple[str, str, int]): Schéma, hôte et port
+            connection (_Connection): Connexion à rendre
+            reusable (bool): La réponse a été lue entièrement et le serveur garde la connexion
+        """
+        idle = self._idle.setdefault(key, [])
+        if reusable and len(idle) < self.max_idle_per_host:
+            connection.last_used = time.monotonic()
+            idle.append(connection)
+        else:
+            connection.close()
+
+    def close(self) -> None:
+        """Ferme toutes les connexions inactives."""
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.close()
+        self._idle.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retourne les compteurs du pool.
+
+        Returns:
+            Dict[str, int]: Connexions ouvertes, réutilisées et inactives
+        """
+        return {
+            "opened": self.opened,
+            "reused": self.reused,
+            "idle": sum(len(idle) for idle in self._idle.values())
+        }
+
+
+class _BackgroundLoop:
+    """
+    Boucle asyncio exécutée dans un thread démon, avec le pool de connexions et
+    le plafond de requêtes partagés par tous les moteurs du processus.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.pool = ConnectionPool()
+        self.limiter: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.thread = threading.Thread(target=self._run, name="llm-backend", daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coroutine) -> "asyncio.Future":
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+
+_background: Optional[_BackgroundLoop] = None
+_background_lock = threading.Lock()
+
+
+def _get_background() -> _BackgroundLoop:
+    global _background
+    if _background is None:
+        with _background_lock:
+            if _background is None:
+                _background = _BackgroundLoop()
+    return _background
+
+
+def set_max_in_flight(limit: int) -> None:
+    """
+    Modifie le plafond de requêtes en cours. À appeler avant la première requête.
+
+    Args:
+        limit (int): Nombre maximal de requêtes simultanées pour tout le processus
+    """
+    global MAX_IN_FLIGHT
+    MAX_IN_FLIGHT = limit
+
+
+def pool_stats() -> Dict[str, int]:
+    """
+    Retourne les compteurs du pool de connexions partagé.
+
+    Returns:
+        Dict[str, int]: Connexions ouvertes, réutilisées, inactives et requêtes en cours
+    """
+    if _background is None:
+        return {"opened": 0, "reused": 0, "idle": 0, "in_flight": 0}
+    return dict(_background.pool.stats(), in_flight=_background.in_flight)
+
+
+class _InFlight:
+    """Contexte asynchrone qui réserve une place sous le plafond MAX_IN_FLIGHT."""
+
+    def __init__(self, background: _BackgroundLoop):
+        self.background = background
+
+    async def __aenter__(self) -> None:
+        if self.background.limiter is None:
+            self.background.limiter = asyncio.Semaphore(MAX_IN_FLIGHT)
+        await self.background.limiter.acquire()
+        self.background.in_flight += 1
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.background.in_flight -= 1
+        self.background.limiter.release()
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[str, int, Dict[str, str]]:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connexion fermée par le serveur")
+    version, status, _ = (line.decode("latin-1").rstrip("\r\n") + "  ").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return version, int(status), headers
+
+
+async def _iter_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> AsyncIterator[bytes]:
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            line = await reader.readline()
+            if not line.endswith(b"\n"):
+                # Sans le morceau final de taille 0, la réponse est tronquée
+                raise LLMError("Connexion interrompue avant la fin de la réponse", retryable=True)
+            try:
+                size = int(line.split(b";")[0].strip(), 16)
+            except ValueError:
+                raise LLMError(f"Taille de morceau invalide: {line[:50]!r}")
+            if size == 0:
+                # Fin du corps, suivie d'éventuels en-têtes de fin
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            data = await reader.readexactly(size)
+            await reader.readexactly(2)
+            yield data
+    elif "content-length" in headers:
+        length = int(headers["content-length"])
+        if length:
+            yield await reader.readexactly(length)
+    else:
+        # Corps délimité par la fermeture de la connexion
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                return
+            yield data
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    Moteur de génération pour une API compatible OpenAI (chat completions).
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, model: str = DEFAULT_MODEL,
+                 api_key: Optional[str] = None, timeout: float = 30.0, connect_timeout: float = 5.0,
+                 max_retries: int = 2, backoff: float = 0.5, max_backoff: float = 8.0,
+                 temperature: Optional[float] = None, max_tokens: Optional[int] = None):
+        """
+        Initialise le moteur (aucune connexion n'est ouverte avant la première requête).
+
+        Args:
+            base_url (str): URL de base de l'API (ex. https://api.openai.com/v1)
+            model (str): Modèle à utiliser
+            api_key (Optional[str]): Clé d'API (en-tête Authorization: Bearer)
+            timeout (float): Délai de réponse, en secondes (entre deux morceaux en streaming)
+            connect_timeout (float): Délai de connexion, en secondes
+            max_retries (int): Nombre maximal de nouvelles tentatives
+            backoff (float): Délai de base entre deux tentatives, en secondes
+            max_backoff (float): Délai maximal entre deux tentatives, en secondes
+            temperature (Optional[float]): Température d'échantillonnage
+            max_tokens (Optional[int]): Nombre maximal de tokens générés
+        """
+        url = urlsplit(base_url.rstrip("/"))
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"URL d'API non valide: {base_url}")
+        self._key = (url.scheme, url.hostname, url.port or (443 if url.scheme == "https" else 80))
+        self._host = url.netloc
+        self._path = f"{url.path}/chat/completions"
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    @classmethod
+    def from_config(cls, settings: Dict[str, Any]) -> "OpenAICompatibleBackend":
+        """
+        Crée le moteur à partir de la clé "llm" de la configuration de l'agent.
+
+        Args:
+            settings (Dict[str, Any]): Paramètres du moteur
+
+        Returns:
+            OpenAICompatibleBackend: Moteur configuré
+        """
+        api_key = settings.get("api_key")
+        if api_key is None:
+            api_key = os.environ.get(settings.get("api_key_env", "OPENAI_API_KEY"))
+        return cls(
+            base_url=settings.get("base_url", DEFAULT_BASE_URL),
+            model=settings.get("model", DEFAULT_MODEL),
+            api_key=api_key,
+            timeout=settings.get("timeout", 30.0),
+            connect_timeout=settings.get("connect_timeout", 5.0),
+            max_retries=settings.get("max_retries", 2),
+            backoff=settings.get("backoff", 0.5),
+            max_backoff=settings.get("max_backoff", 8.0),
+            temperature=settings.get("temperature"),
+            max_tokens=settings.get("max_tokens")
+        )
+
+    def _payload(self, context: Dict[str, Any], stream: bool) -> bytes:
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": build_messages(context),
+            "stream": stream
+        }
+        if self.temperature is not None:
+            payload["temperature"] = self.temperature
+        if self.max_tokens is not None:
+            payload["max_tokens"] = self.max_tokens
+        return json.dumps(payload).encode("utf-8")
+
+    def _request_head(self, body: bytes) -> bytes:
+        lines = [
+            f"POST {self._path} HTTP/1.1",
+            f"Host: {self._host}",
+            "Content-Type: application/json",
+            "Accept: application/json, text/event-stream",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive"
+        ]
+        if self.api_key:
+            lines.append(f"Authorization: Bearer {self.api_key}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    def _delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    async def _send(self, body: bytes) -> Tuple[_Connection, Dict[str, str], bool]:
+        """
+        Envoie la requête et lit l'en-tête de la réponse. Une connexion réutilisée
+        que le serveur a fermée entre-temps est remplacée sans compter de tentative.
+        """
+        pool = _get_background().pool
+        while True:
+            connection = await pool.acquire(self._key, self.connect_timeout)
+            try:
+                connection.writer.write(self._request_head(body) + body)
+                await connection.writer.drain()
+                version, status, headers = await asyncio.wait_for(_read_head(connection.reader), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                connection.close()
+                if connection.reused:
+                    continue
+                raise LLMError(f"Connexion interrompue: {e}", retryable=True)
+            except BaseException:
+                connection.close()
+                raise
+
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close" and (
+                "content-length" in headers or headers.get("transfer-encoding", "").lower() == "chunked"
+            )
+            if status != 200:
+                error_body = b""
+                try:
+                    async for data in _iter_body(connection.reader, headers):
+                        error_body += data
+                        if len(error_body) > _ERROR_BODY_LIMIT:
+                            keep_alive = False
+                            break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    keep_alive = False
+                pool.release(self._key, connection, keep_alive)
+                raise LLMError(
+                    f"Erreur HTTP {status}: {error_body[:500].decode('utf-8', 'replace')}",
+                    status=status,
+                    retryable=status in RETRY_STATUSES,
+                    retry_after=_parse_retry_after(headers.get("retry-after"))
+                )
+            return connection, headers, keep_alive
+
+    async def _complete_once(self, body: bytes) -> str:
+        pool = _get_background().pool
+        connection, headers, keep_alive = await self._send(body)
+        completed = False
+        try:
+            data = b"".join([chunk async for chunk in _iter_body(connection.reader, headers)])
+            completed = True
+        finally:
+            pool.release(self._key, connection, keep_alive and completed)
+        try:
+            return json.loads(data)["choices"][0]["message"]["content"] or ""
+        except (ValueError, KeyError, IndexError, TypeError):
+            raise LLMError(f"Réponse inattendue de l'API: {data[:500].decode('utf-8', 'replace')}")
+
+    async def _complete(self, context: Dict[str, Any]) -> str:
+        body = self._payload(context, stream=False)
+        attempt = 0
+        while True:
+            try:
+                async with _InFlight(_get_background()):
+                    return await asyncio.wait_for(self._complete_once(body), self.timeout)
+            except asyncio.TimeoutError:
+                error = LLMError(f"Délai de réponse dépassé ({self.timeout} s)", retryable=True)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                error = LLMError(f"Erreur de connexion: {e}", retryable=True)
+            except LLMError as e:
+                error = e
+            if not error.retryable or attempt >= self.max_retries:
+                raise error
+            attempt += 1
+            delay = self._delay(attempt, error.retry_after)
+            logger.warning("Appel au modèle échoué (%s), nouvelle tentative %d dans %.2f s", error, attempt, delay)
+            await asyncio.sleep(delay)
+
+    async def _stream_once(self, body: bytes) -> AsyncIterator[str]:
+        pool = _get_background().pool
+        connection, headers, keep_alive = await self._send(body)
+        completed = False
+        try:
+            chunks = _iter_body(connection.reader, headers).__aiter__()
+            buffer = b""
+            while not completed:
+                try:
+                    data = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                except StopAsyncIteration:
+                    completed = True
+                    break
+                buffer += data
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    line = line.strip()
+                    if not line.startswith(b"data:"):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == b"[DONE]":
+                        continue
+                    try:
+                        choice = json.loads(payload)["choices"][0]
+                    except (ValueError, KeyError, IndexError, TypeError):
+                        raise LLMError(f"Événement inattendu de l'API: {payload[:200].decode('utf-8', 'replace')}")
+                    delta = (choice.get("delta") or {}).get("content")
+                    if delta:
+                        yield delta
+        finally:
+            pool.release(self._key, connection, keep_alive and completed)
+
+    async def _stream(self, context: Dict[str, Any]) -> AsyncIterator[str]:
+        body = self._payload(context, stream=True)
+        attempt = 0
+        while True:
+            emitted = False
+            try:
+                async with _InFlight(_get_background()):
+                    async for delta in self._stream_once(body):
+                        emitted = True
+                        yield delta
+                return
+            except asyncio.TimeoutError:
+                error = LLMError(f"Délai de réponse dépassé ({self.timeout} s)", retryable=True)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                error = LLMError(f"Erreur de connexion: {e}", retryable=True)
+            except LLMError as e:
+                error = e
+            # Une réponse déjà partiellement transmise ne peut pas être reprise
+            if emitted or not error.retryable or attempt >= self.max_retries:
+                raise error
+            attempt += 1
+            delay = self._delay(attempt, error.retry_after)
+            logger.warning("Appel au modèle échoué (%s), nouvelle tentative %d dans %.2f s", error, attempt, delay)
+            await asyncio.sleep(delay)
+
+    def complete(self, context: Dict[str, Any]) -> str:
+        """
+        Génère la réponse complète (appel bloquant).
+
+        Args:
+            context (Dict[str, Any]): Contexte préparé par l'agent
+
+        Returns:
+            str: Réponse du modèle
+
+        Raises:
+            LLMError: Si l'appel échoue après les nouvelles tentatives
+        """
+        return _get_background().submit(self._complete(context)).result()
+
+    async def acomplete(self, context: Dict[str, Any]) -> str:
+        """
+        Génère la réponse complète depuis une coroutine, quelle que soit sa boucle
+        asyncio (la requête s'exécute dans la boucle partagée du moteur).
+
+        Args:
+            context (Dict[str, Any]): Contexte préparé par l'agent
+
+        Returns:
+            str: Réponse du modèle
+
+        Raises:
+            LLMError: Si l'appel échoue après les nouvelles tentatives
+        """
+        return await asyncio.wrap_future(_get_background().submit(self._complete(context)))
+
+    def stream(self, context: Dict[str, Any]) -> Iterator[str]:
+        """
+        Génère la réponse par morceaux (itérateur bloquant). Si l'appelant
+        s'interrompt avant la fin, la requête est annulée.
+
+        Args:
+            context (Dict[str, Any]): Contexte préparé par l'agent
+
+        Yields:
+            str: Morceaux successifs de la réponse
+
+        Raises:
+            LLMError: Si l'appel échoue
+        """
+        items: "queue.Queue[Any]" = queue.Queue()
+        finished = object()
+
+        async def pump() -> None:
+            try:
+                async for delta in self._stream(context):
+                    items.put(delta)
+            except BaseException as e:
+                items.put(e)
+                raise
+            else:
+                items.put(finished)
+
+        future = _get_background().submit(pump())
+        try:
+            while True:
+                item = items.get()
+                if item is finished:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
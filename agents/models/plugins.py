@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+"""
+Registre des types d'agents et des bases de connaissances.
+
+Les types d'agents (devops, cloud, security...) et les bases de connaissances
+sont déclarés par nom, sans être importés :
+- dans le manifeste config/plugins.json, et dans les manifestes listés par
+  JAMONO_PLUGINS (chemins séparés par os.pathsep, les derniers l'emportent) :
+      {
+        "agent_types": {
+          "devops": {"class": "models.agent:DevOpsAgent", "knowledge_bases": ["devops"]}
+        },
+        "knowledge_bases": {"devops": "knowledge_base.devops_knowledge_base"}
+      }
+- par des paquets installés, via les points d'entrée "jamono.agent_types"
+  (valeur ``module:Classe``) et "jamono.knowledge_bases" (valeur ``module``),
+  consultés seulement pour un nom absent des manifestes ;
+- par programme, avec register_agent_type() et register_knowledge_base().
+
+Le module d'un type d'agent n'est importé qu'à la création du premier agent de
+ce type : le démarrage ne dépend pas du nombre de types déclarés. Les modules
+des bases de connaissances sont importés à la première recherche (voir
+knowledge_base.lazy).
+"""
+
+import os
+import sys
+import json
+import importlib
+import threading
+from typing import Any, Dict, List, Optional
+
+# Manifeste des types d'agents et des bases de connaissances fournis avec le projet
+PLUGIN_MANIFEST = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "plugins.json")
+
+# Groupes de points d'entrée des paquets installés
+AGENT_TYPES_GROUP = "jamono.agent_types"
+KNOWLEDGE_BASES_GROUP = "jamono.knowledge_bases"
+
+
+def _entry_points(group: str) -> List[Any]:
+    # importlib.metadata parcourt les paquets installés : importé seulement au besoin
+    from importlib import metadata
+    try:
+        return list(metadata.entry_points(group=group))
+    except TypeError:
+        # Python < 3.10
+        return list(metadata.entry_points().get(group, []))
+
+
+def import_target(target: str) -> Any:
+    """
+    Importe l'objet désigné par ``module:attribut`` (ou un module).
+
+    Args:
+        target (str): Cible au format module:attribut
+
+    Returns:
+        Any: Objet importé
+
+    Raises:
+        ImportError: Si le module ou l'attribut n'existe pas
+    """
+    module_name, _, attribute = target.partition(":")
+    module = sys.modules.get(module_name) or importlib.import_module(module_name)
+    if not attribute:
+        return module
+    try:
+        value = module
+        for part in attribute.split("."):
+            value = getattr(value, part)
+        return value
+    except AttributeError:
+        raise ImportError(f"{attribute} introuvable dans {module_name}")
+
+
+class PluginRegistry:
+    """
+    Déclarations des types d'agents et des bases de connaissances, résolues à la demande.
+    """
+
+    def __init__(self, manifests: Optional[List[str]] = None):
+        """
+        Initialise le registre (les manifestes sont lus au premier accès).
+
+        Args:
+            manifests (Optional[List[str]]): Manifestes à lire (PLUGIN_MANIFEST puis
+                                             ceux de JAMONO_PLUGINS par défaut)
+        """
+        if manifests is None:
+            manifests = [PLUGIN_MANIFEST] + [
+                path for path in os.environ.get("JAMONO_PLUGINS", "").split(os.pathsep) if path
+            ]
+        self.manifests = manifests
+        self._agent_types: Optional[Dict[str, Dict[str, Any]]] = None
+        # Nom -> module (None : absent des déclarations, les points d'entrée ont été consultés)
+        self._knowledge_bases: Dict[str, Optional[str]] = {}
+        self._classes: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._agent_types is None:
+            with self._lock:
+                if self._agent_types is None:
+                    agent_types: Dict[str, Dict[str, Any]] = {}
+                    for path in self.manifests:
+                        self._read_manifest(path, agent_types)
+                    self._agent_types = agent_types
+        return self._agent_types
+
+    def _read_manifest(self, path: str, agent_types: Dict[str, Dict[str, Any]]) -> None:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            raise ValueError(f"Manifeste de plugins invalide {path}: {e}")
+        for name, declaration in manifest.get("agent_types", {}).items():
+            if isinstance(declaration, str):
+                declaration = {"class": declaration}
+            agent_types[name.lower()] = dict(declaration)
+        for name, module_name in manifest.get("knowledge_bases", {}).items():
+            self._knowledge_bases[name.lower()] = module_name
+
+    def register_agent_type(self, name: str, target: Any, knowledge_bases: Optional[List[str]] = None,
+                            **extra: Any) -> None:
+        """
+        Déclare un type d'agent (remplace une déclaration existante).
+
+        Args:
+            name (str): Nom du type (champ "type" des configurations)
+            target (Any): Classe d'agent, ou son chemin ``module:Classe``
+            knowledge_bases (Optional[List[str]]): Bases de connaissances par défaut des agents de ce type
+            **extra (Any): Autres champs de la déclaration (description...)
+        """
+        declaration = dict(extra)
+        declaration["class"] = target if isinstance(target, str) else f"{target.__module__}:{target.__qualname__}"
+        if knowledge_bases is not None:
+            declaration["knowledge_bases"] = list(knowledge_bases)
+        with self._lock:
+            self._load()[name.lower()] = declaration
+            if isinstance(target, str):
+                self._classes.pop(name.lower(), None)
+            else:
+                self._classes[name.lower()] = target
+
+    def register_knowledge_base(self, name: str, module_name: str) -> None:
+        """
+        Déclare une base de connaissances sous forme de module Python.
+
+        Args:
+            name (str): Nom de la base (champ "knowledge_bases" des configurations)
+            module_name (str): Nom complet du module
+        """
+        with self._lock:
+            self._load()
+            self._knowledge_bases[name.lower()] = module_name
+
+    def agent_type(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne la déclaration d'un type d'agent, sans importer son module.
+
+        Args:
+            name (str): Nom du type
+
+        Returns:
+            Optional[Dict[str, Any]]: Déclaration ("class", "knowledge_bases"...), ou None si inconnu
+        """
+        key = name.lower()
+        agent_types = self._load()
+        declaration = agent_types.get(key)
+        if declaration is None:
+            for entry_point in _entry_points(AGENT_TYPES_GROUP):
+                if entry_point.name.lower() == key:
+                    declaration = {"class": entry_point.value}
+                    with self._lock:
+                        agent_types.setdefault(key, declaration)
+                    break
+        return declaration
+
+    def agent_class(self, name: str) -> Optional[Any]:
+        """
+        Retourne la classe d'un type d'agent, importée à la première demande.
+
+        Args:
+            name (str): Nom du type
+
+        Returns:
+            Optional[Any]: Classe d'agent, ou None si le type est inconnu
+
+        Raises:
+            ImportError: Si le module déclaré ne peut pas être importé
+        """
+        key = name.lower()
+        cls = self._classes.get(key)
+        if cls is None:
+            declaration = self.agent_type(key)
+            if declaration is None:
+                return None
+            with self._lock:
+                cls = self._classes.get(key)
+                if cls is None:
+                    cls = import_target(declaration["class"])
+                    self._classes[key] = cls
+        return cls
+
+    def default_knowledge_bases(self, name: str) -> List[str]:
+        """
+        Retourne les bases de connaissances d'un agent dont la configuration n'en
+        liste pas : celles de la déclaration, sinon l'attribut
+        ``default_knowledge_bases`` de la classe.
+
+        Args:
+            name (str): Nom du type
+
+        Returns:
+            List[str]: Noms des bases de connaissances
+        """
+        declaration = self.agent_type(name) or {}
+        if "knowledge_bases" in declaration:
+            return list(declaration["knowledge_bases"])
+        cls = self.agent_class(name)
+        return list(getattr(cls, "default_knowledge_bases", []) or [])
+
+    def knowledge_base_module(self, name: str) -> Optional[str]:
+        """
+        Retourne le module d'une base de connaissances déclarée, sans l'importer.
+
+        Args:
+            name (str): Nom de la base
+
+        Returns:
+            Optional[str]: Nom complet du module, ou None si la base n'est pas
+                           déclarée comme module (base de fichiers par exemple)
+        """
+        key = name.lower()
+        self._load()
+        if key not in self._knowledge_bases:
+            module_name = None
+            for entry_point in _entry_points(KNOWLEDGE_BASES_GROUP):
+                if entry_point.name.lower() == key:
+                    module_name = entry_point.value.partition(":")[0]
+                    break
+            with self._lock:
+                self._knowledge_bases.setdefault(key, module_name)
+        return self._knowledge_bases[key]
+
+    def agent_types(self) -> List[str]:
+        """
+        Retourne les noms de tous les types d'agents déclarés (manifestes et points d'entrée).
+
+        Returns:
+            List[str]: Noms triés
+        """
+        names = set(self._load())
+        names.update(entry_point.name.lower() for entry_point in _entry_points(AGENT_TYPES_GROUP))
+        return sorted(names)
+
+    def knowledge_bases(self) -> List[str]:
+        """
+        Retourne les noms de toutes les bases de connaissances déclarées comme modules.
+
+        Returns:
+            List[str]: Noms triés
+        """
+        self._load()
+        names = {name for name, module_name in self._knowledge_bases.items() if module_name}
+        names.update(entry_point.name.lower() for entry_point in _entry_points(KNOWLEDGE_BASES_GROUP))
+        return sorted(names)
+
+    def loaded_agent_types(self) -> List[str]:
+        """
+        Retourne les types d'agents dont la classe a déjà été importée.
+
+        Returns:
+            List[str]: Noms triés
+        """
+        return sorted(self._classes)
+
+
+_registry: Optional[PluginRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_plugin_registry() -> PluginRegistry:
+    """
+    Retourne le registre des plugins du processus.
+
+    Returns:
+        PluginRegistry: Registre partagé
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PluginRegistry()
+    return _registry
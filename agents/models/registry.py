@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Registre des instances d'agents.
+Dans un processus long (mode démon, mode lot), les agents sont partagés entre
+les requêtes : une instance est identifiée par l'empreinte de son type, de son
+nom et de sa configuration, et n'est construite qu'une seule fois.
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from .agent import Agent
+except ImportError:
+    # Exécution directe du module
+    from agent import Agent
+
+
+def agent_fingerprint(agent_type: str, name: str, config: Dict[str, Any]) -> str:
+    """
+    Calcule l'empreinte d'un agent à partir de son type, de son nom et de sa configuration.
+
+    Args:
+        agent_type (str): Type d'agent
+        name (str): Nom de l'agent
+        config (Dict[str, Any]): Configuration de l'agent
+
+    Returns:
+        str: Empreinte SHA-256 hexadécimale, indépendante de l'ordre des clés
+    """
+    payload = json.dumps([agent_type.lower(), name, config], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AgentRegistry:
+    """
+    Registre borné d'agents initialisés, avec éviction LRU au-delà de max_instances.
+    """
+
+    def __init__(self, factory: Callable[[str, str, Dict[str, Any]], Agent], max_instances: int = 32):
+        """
+        Initialise le registre.
+
+        Args:
+            factory (Callable): Fonction (agent_type, name, config) -> Agent qui crée
+                                un agent avec ses bases de connaissances
+            max_instances (int): Nombre maximal d'agents conservés en mémoire
+        """
+        self.factory = factory
+        self.max_instances = max_instances
+        self._agents: "OrderedDict[str, Agent]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def get(self, agent_type: str, name: str, config: Dict[str, Any]) -> Agent:
+        """
+        Retourne l'agent correspondant, en le créant s'il n'est pas déjà enregistré.
+        La création se fait hors du verrou du registre ; si deux requêtes créent
+        le même agent en même temps, la première enregistrée est gardée.
+
+        Args:
+            agent_type (str): Type d'agent
+            name (str): Nom de l'agent
+            config (Dict[str, Any]): Configuration de l'agent
+
+        Returns:
+            Agent: Instance partagée de l'agent
+        """
+        fingerprint = agent_fingerprint(agent_type, name, config)
+        with self._lock:
+            agent = self._agents.get(fingerprint)
+            if agent is not None:
+                self._agents.move_to_end(fingerprint)
+                self.reused += 1
+                return agent
+
+        # Construction hors du verrou : un agent long à créer ne bloque pas les autres requêtes
+        built = self.factory(agent_type, name, config)
+        with self._lock:
+            agent = self._agents.get(fingerprint)
+            if agent is not None:
+                # Créé entre-temps par une requête concurrente : l'instance enregistrée est partagée
+                self._agents.move_to_end(fingerprint)
+                self.reused += 1
+                return agent
+            agent = built
+            self._agents[fingerprint] = agent
+            self.created += 1
+            while len(self._agents) > self.max_instances:
+                self._agents.popitem(last=False)
+                self.evicted += 1
+            return agent
+
+    def evict(self, agent_type: str, name: str, config: Dict[str, Any]) -> bool:
+        """
+        Retire explicitement un agent du registre.
+
+        Args:
+            agent_type (str): Type d'agent
+            name (str): Nom de l'agent
+            config (Dict[str, Any]): Configuration de l'agent
+
+        Returns:
+            bool: True si un agent a été retiré
+        """
+        with self._lock:
+            removed = self._agents.pop(agent_fingerprint(agent_type, name, config), None)
+            if removed is not None:
+                self.evicted += 1
+            return removed is not None
+
+    def clear(self) -> None:
+        """Retire tous les agents du registre."""
+        with self._lock:
+            self.evicted += len(self._agents)
+            self._agents.clear()
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques du registre.
+
+        Returns:
+            Dict[str, Any]: Nombre d'agents actifs et compteurs de créations, réutilisations et évictions
+        """
+        with self._lock:
+            return {
+                "live": len(self._agents),
+                "max_instances": self.max_instances,
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted
+            }
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+"""
+Cache persistant des réponses des agents (SQLite).
+
+Une réponse est retrouvée par une clé calculée à partir du message normalisé,
+de l'empreinte de l'agent (type, nom et configuration, donc prompt système
+compris), de l'empreinte du contenu de ses bases de connaissances et de l'état
+de la conversation (résumé et derniers tours, vides hors conversation) : une
+modification de la configuration ou des connaissances change la clé, et les
+anciennes réponses ne sont plus jamais servies (elles disparaissent ensuite
+par éviction). Le même message dans deux conversations différentes n'obtient
+donc pas la même réponse.
+
+Les entrées expirent après ``ttl`` secondes ; au-delà de ``max_entries``, les
+entrées les moins récemment servies sont supprimées. La base est en mode WAL
+et peut être partagée entre plusieurs processus.
+
+Configuration de l'agent (clé "response_cache") :
+    {"path": "agents/cache/responses.sqlite", "ttl": 86400, "max_entries": 10000}
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "responses.sqlite")
+DEFAULT_MAX_ENTRIES = 10000
+
+# Ponctuation finale et espaces avant ponctuation (typographie française)
+_TRAILING_PUNCTUATION_RE = re.compile(r"[\s?!.…]+$")
+_SPACE_BEFORE_PUNCTUATION_RE = re.compile(r"\s+([?!:;,.…])")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Normalise un message pour le cache : forme Unicode NFKC, casse ignorée,
+    espaces regroupés, ponctuation finale retirée ("Qui es tu ?" et
+    "qui es  tu" donnent la même clé).
+
+    Args:
+        message (str): Message de l'utilisateur
+
+    Returns:
+        str: Message normalisé
+    """
+    text = " ".join(unicodedata.normalize("NFKC", message).casefold().split())
+    text = _SPACE_BEFORE_PUNCTUATION_RE.sub(r"\1", text)
+    return _TRAILING_PUNCTUATION_RE.sub("", text)
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Calcule une clé de cache à partir de ses composantes.
+
+    Args:
+        *parts (Any): Composantes de la clé (converties en texte)
+
+    Returns:
+        str: Empreinte SHA-256 hexadécimale
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache de réponses persistant dans une base SQLite, sûr entre threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl: Optional[float] = None, clock: Callable[[], float] = time.time):
+        """
+        Ouvre (ou crée) la base du cache.
+
+        Args:
+            path (str): Chemin du fichier SQLite (":memory:" pour un cache non persistant)
+            max_entries (int): Nombre maximal d'entrées
+            ttl (Optional[float]): Durée de validité d'une entrée, en secondes (None : illimitée)
+            clock (Callable[[], float]): Horloge murale (remplaçable pour les essais)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Retourne la réponse associée à une clé, si elle existe et n'a pas expiré.
+
+        Args:
+            key (str): Clé de cache
+
+        Returns:
+            Optional[str]: Réponse en cache, ou None
+        """
+        now = self._clock()
+        with self._lock:
+            row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self.hits += 1
+            return response
+
+    def put(self, key: str, response: str) -> None:
+        """
+        Enregistre une réponse, puis applique l'expiration et la limite de taille.
+
+        Args:
+            key (str): Clé de cache
+            response (str): Réponse à enregistrer
+        """
+        now = self._clock()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used, hits) VALUES (?, ?, ?, ?, 0)",
+                (key, response, now, now)
+            )
+            if self.ttl is not None:
+                self.expirations += self._db.execute(
+                    "DELETE FROM responses WHERE created < ?", (now - self.ttl,)
+                ).rowcount
+            excess = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.evictions += self._db.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_used LIMIT ?)", (excess,)
+                ).rowcount
+
+    def clear(self) -> None:
+        """Supprime toutes les entrées."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques du cache (compteurs du processus courant).
+
+        Returns:
+            Dict[str, Any]: Chemin, taille, limite et compteurs de succès, échecs,
+                            expirations et évictions
+        """
+        return {
+            "path": self.path,
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "evictions": self.evictions
+        }
+
+    def close(self) -> None:
+        """Ferme la base."""
+        with self._lock:
+            self._db.close()
+
+
+# Caches ouverts, partagés par les agents qui utilisent le même fichier
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def open_response_cache(settings: Any) -> Optional[ResponseCache]:
+    """
+    Retourne le cache décrit par la clé "response_cache" de la configuration
+    d'un agent. Les agents qui désignent le même fichier partagent le même cache.
+
+    Args:
+        settings (Any): True (emplacement par défaut), ou dictionnaire (path,
+                        ttl, max_entries) ; None ou False désactive le cache
+
+    Returns:
+        Optional[ResponseCache]: Cache ouvert, ou None
+    """
+    if not settings:
+        return None
+    if settings is True:
+        settings = {}
+    path = settings.get("path", DEFAULT_PATH)
+    real_path = path if path == ":memory:" else os.path.realpath(path)
+    with _caches_lock:
+        cache = _caches.get(real_path)
+        if cache is None:
+            cache = ResponseCache(path, settings.get("max_entries", DEFAULT_MAX_ENTRIES), settings.get("ttl"))
+            _caches[real_path] = cache
+        return cache
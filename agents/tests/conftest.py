@@ -0,0 +1,11 @@
+"""
+Configuration commune des tests : le répertoire agents/ est placé dans le
+chemin d'import, comme pour agent_server.py (imports ``models.*``, ``knowledge_base.*``).
+"""
+
+import os
+import sys
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if AGENTS_DIR not in sys.path:
+    sys.path.insert(0, AGENTS_DIR)
@@ -0,0 +1,34 @@
+"""
+Tests de l'agent DevOps (models/agent.py).
+"""
+
+from agent_server import load_agent
+
+
+def _agent(tmp_path):
+    return load_agent("devops", "Cache", {"response_cache": {"path": str(tmp_path / "responses.sqlite")}})
+
+
+def test_response_cache_depends_on_conversation(tmp_path):
+    agent = _agent(tmp_path)
+    agent.process_message("Mon conteneur docker ne démarre pas", "a")
+    agent.process_message("Mon pod kubernetes crashe", "b")
+
+    answer_a = agent.process_message("Et ensuite ?", "a")
+    answer_b = agent.process_message("Et ensuite ?", "b")
+
+    uncached = load_agent("devops", "Cache", {})
+    uncached.process_message("Mon pod kubernetes crashe", "b")
+
+    assert answer_a != answer_b
+    assert answer_b == uncached.process_message("Et ensuite ?", "b")
+    assert agent.response_cache_stats()["hits"] == 0
+
+
+def test_response_cache_serves_stateless_messages(tmp_path):
+    agent = _agent(tmp_path)
+    first = agent.process_message("Comment déployer avec terraform ?")
+    second = agent.process_message("Comment déployer avec terraform ?")
+
+    assert first == second
+    assert agent.response_cache_stats()["hits"] == 1
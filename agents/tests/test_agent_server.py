@@ -0,0 +1,126 @@
+"""
+Tests de l'interface en ligne de commande et du mode démon (agent_server.py).
+"""
+
+import os
+import sys
+import json
+import socket
+import subprocess
+
+import pytest
+
+AGENT_SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent_server.py")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def daemon():
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, AGENT_SERVER, "--serve", "--port", str(port), "--log-level", "OFF"],
+        stderr=subprocess.PIPE, text=True
+    )
+    try:
+        # Le serveur annonce son adresse une fois l'agent par défaut préchauffé
+        for line in process.stderr:
+            if "en écoute" in line:
+                break
+        else:
+            pytest.fail("Le mode démon n'a pas démarré")
+        yield port
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        process.stderr.close()
+
+
+def _exchange(port, lines):
+    with socket.create_connection(("127.0.0.1", port), timeout=30) as sock:
+        for line in lines:
+            sock.sendall(line + b"\n")
+        reader = sock.makefile("rb")
+        return [json.loads(reader.readline()) for _ in lines]
+
+
+def test_serve_rejects_oversized_request_and_keeps_connection(daemon):
+    import agent_server
+    oversized = json.dumps({"id": 1, "message": "x" * (agent_server.MAX_REQUEST_BYTES + 1)}).encode("utf-8")
+    normal = json.dumps({"id": 2, "message": "Comment utiliser docker ?"}).encode("utf-8")
+
+    first, second = _exchange(daemon, [oversized, normal])
+
+    assert "trop volumineuse" in first["error"]
+    assert second["id"] == 2 and "response" in second
+
+
+def test_serve_accepts_long_channel_context(daemon):
+    history = "\n".join(f"alice: message {i} sur le déploiement du cluster" for i in range(3000))
+    message = f"Comment utiliser docker ?\n\nContexte récent du canal:\n{history}"
+    request = json.dumps({"id": 3, "message": message}).encode("utf-8")
+    assert len(request) > 64 * 1024
+
+    result, = _exchange(daemon, [request])
+
+    assert result["id"] == 3 and "response" in result
+
+
+# Marge sur STARTUP_BUDGET_MS, pour les machines d'intégration continue chargées ou plus lentes
+STARTUP_BUDGET_MARGIN = 1.5
+
+
+def _run_with_budget(budget_ms):
+    return subprocess.run(
+        [sys.executable, AGENT_SERVER, "--message", "Comment utiliser docker ?",
+         "--startup-report", "--startup-budget", str(budget_ms)],
+        capture_output=True, text=True, timeout=60
+    )
+
+
+def _response(stdout):
+    # La réponse est la dernière ligne de la sortie standard
+    return json.loads(stdout.splitlines()[-1])
+
+
+def _startup_report(stderr):
+    reports = [json.loads(line)["startup_report"] for line in stderr.splitlines() if line.startswith('{"startup_report"')]
+    assert len(reports) == 1, stderr
+    return reports[0]
+
+
+def test_startup_within_budget_exits_normally():
+    result = _run_with_budget(60000)
+
+    assert result.returncode == 0, result.stderr
+    assert "response" in _response(result.stdout)
+    report = _startup_report(result.stderr)
+    assert report["within_budget"] is True and report["budget_ms"] == 60000
+
+
+def test_startup_over_budget_exits_with_code_3():
+    result = _run_with_budget(0.001)
+
+    assert result.returncode == 3
+    # La réponse est tout de même écrite : seul le code de sortie signale le dépassement
+    assert "response" in _response(result.stdout)
+    report = _startup_report(result.stderr)
+    assert report["within_budget"] is False and report["total_ms"] > 0.001
+    assert "Budget de démarrage dépassé" in result.stderr
+
+
+def test_cold_start_meets_the_reference_budget():
+    import agent_server
+    budget_ms = agent_server.STARTUP_BUDGET_MS * STARTUP_BUDGET_MARGIN
+    # Meilleur de trois démarrages : un démarrage ralenti par la machine n'est pas une régression
+    totals = []
+    for _ in range(3):
+        result = _run_with_budget(budget_ms)
+        totals.append(_startup_report(result.stderr)["total_ms"])
+        if result.returncode == 0:
+            break
+    assert result.returncode == 0, f"démarrages en {totals} ms pour un budget de {budget_ms} ms"
@@ -0,0 +1,65 @@
+"""
+Tests de l'assemblage du contexte (models/context.py).
+"""
+
+from models.context import ELLIPSIS, MIN_SNIPPET_CHARS, merge_passages, pack_context, snippet
+
+
+def _passage(topic, content, score=1.0, key=None):
+    return {"topic": topic, "subtopic": None, "key": key, "score": score, "content": content}
+
+
+def test_passages_found_by_several_keywords_are_merged():
+    shared = _passage("docker", "Les conteneurs Docker tournent sur Kubernetes.", 1.0)
+    ranked, duplicates = merge_passages({
+        "docker": [shared, _passage("compose", "docker compose up", 1.5)],
+        "kubernetes": [dict(shared, score=0.75)],
+    })
+
+    assert duplicates == 1
+    assert [(passage["topic"], passage["score"]) for passage in ranked] == [("docker", 1.75), ("compose", 1.5)]
+    assert ranked[0]["keywords"] == ["docker", "kubernetes"]
+
+
+def test_passages_are_packed_in_rank_order_under_the_budget():
+    packed = pack_context({"docker": [
+        _passage("b", "b" * 300, 1.0),
+        _passage("a", "a" * 300, 2.0),
+        _passage("c", "c" * 300, 0.5),
+        _passage("vide", "", 3.0),
+    ]}, budget_chars=700)
+
+    assert [passage["topic"] for passage in packed["passages"]] == ["a", "b"]
+    assert not any(passage["truncated"] for passage in packed["passages"])
+    # Il reste 100 caractères, moins que MIN_SNIPPET_CHARS : le passage est écarté plutôt que tronqué
+    assert [(entry["source"], entry["reason"]) for entry in packed["dropped"]] == [("vide", "empty"), ("c", "budget")]
+    assert packed["stats"]["used_chars"] == 600 and packed["stats"]["estimated_tokens"] == 150
+
+
+def test_last_passage_is_truncated_to_the_remaining_budget():
+    lines = "\n".join(f"ligne {i} de la procédure" for i in range(40))
+    packed = pack_context({"docker": [_passage("a", "a" * 300, 2.0), _passage("b", lines, 1.0)]},
+                          budget_chars=300 + MIN_SNIPPET_CHARS)
+
+    last = packed["passages"][-1]
+    assert last["topic"] == "b" and last["truncated"]
+    assert last["text"].endswith(ELLIPSIS)
+    assert packed["stats"]["used_chars"] <= 300 + MIN_SNIPPET_CHARS
+
+
+def test_passage_cap_below_the_minimum_snippet_truncates():
+    packed = pack_context({"docker": [_passage("a", "x" * 600)]}, budget_chars=6000, passage_chars=150)
+
+    passage, = packed["passages"]
+    assert passage["truncated"] and len(passage["text"]) <= 150
+    assert packed["dropped"] == []
+
+
+def test_snippet_starts_at_the_line_of_the_first_match():
+    text = "\n".join(["introduction " * 5] * 20 + ["kubectl rollout restart deployment/api"] + ["suite"] * 20)
+
+    excerpt, truncated = snippet(text, ["rollout"], 120)
+
+    assert truncated and len(excerpt) <= 120
+    assert excerpt.startswith(f"{ELLIPSIS}\nkubectl rollout restart")
+    assert snippet("court", ["rollout"], 120) == ("court", False)
@@ -0,0 +1,93 @@
+"""
+Tests des bases de connaissances sous forme de fichiers
+(knowledge_base/file_knowledge_base.py, knowledge_base/loader.py).
+"""
+
+import os
+
+import pytest
+
+from knowledge_base.file_knowledge_base import FileKnowledgeBase
+from knowledge_base.loader import load_knowledge_base
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    # Date de modification distincte même sur les systèmes de fichiers à faible résolution
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def knowledge_dir(tmp_path):
+    directory = tmp_path / "knowledge"
+    directory.mkdir()
+    (directory / "docker.md").write_text("# Docker\n\n## Commandes\n\n- docker build\n", encoding="utf-8")
+    (directory / "git.md").write_text("# Git\n\n## Commandes\n\n- git rebase\n", encoding="utf-8")
+    return directory
+
+
+def test_modified_file_is_reloaded(knowledge_dir):
+    knowledge_base = FileKnowledgeBase(str(knowledge_dir), check_interval=0)
+    version = knowledge_base.get_version()
+    git_index = knowledge_base._segments[str(knowledge_dir / "git.md")][2]
+
+    _write(knowledge_dir / "docker.md", "# Docker\n\n## Commandes\n\n- docker build\n- docker compose up\n")
+
+    assert knowledge_base.search_knowledge_base("docker") == {
+        "docker": {"commandes": ["docker build", "docker compose up"]}}
+    assert knowledge_base.get_version() == version + 1
+    # Seul le fichier modifié est réindexé
+    assert knowledge_base._segments[str(knowledge_dir / "git.md")][2] is git_index
+
+
+def test_removed_file_is_dropped(knowledge_dir):
+    knowledge_base = FileKnowledgeBase(str(knowledge_dir), check_interval=0)
+
+    os.remove(knowledge_dir / "git.md")
+
+    assert knowledge_base.get_all_topics() == ["docker"]
+
+
+def test_changes_wait_for_the_check_interval(knowledge_dir):
+    knowledge_base = FileKnowledgeBase(str(knowledge_dir), check_interval=3600)
+    version = knowledge_base.get_version()
+
+    _write(knowledge_dir / "docker.md", "# Docker\n\n## Commandes\n\n- docker run\n")
+
+    assert knowledge_base.get_version() == version
+    assert knowledge_base.refresh(force=True) is True
+    assert knowledge_base.search_knowledge_base("docker") == {"docker": {"commandes": ["docker run"]}}
+
+
+def test_vector_search_follows_reloads(knowledge_dir):
+    pytest.importorskip("numpy")
+    knowledge_base = FileKnowledgeBase(str(knowledge_dir), check_interval=0)
+    assert knowledge_base.search_vector("docker build", 1)[0]["content"] == ["docker build"]
+
+    _write(knowledge_dir / "docker.md", "# Docker\n\n## Commandes\n\n- docker buildx bake\n")
+
+    assert knowledge_base.search_vector("docker buildx", 1)[0]["content"] == ["docker buildx bake"]
+    assert set(knowledge_base._vector_indexes) == set(knowledge_base._segments)
+
+
+def test_names_resolve_inside_the_knowledge_dir(knowledge_dir):
+    (knowledge_dir / "equipe").mkdir()
+    (knowledge_dir / "equipe" / "runbooks.md").write_text("# Astreinte\n\n- escalade\n", encoding="utf-8")
+
+    docker = load_knowledge_base("docker", knowledge_dir=str(knowledge_dir))
+
+    assert load_knowledge_base("docker", knowledge_dir=str(knowledge_dir)) is docker
+    assert load_knowledge_base("equipe/runbooks", knowledge_dir=str(knowledge_dir)).get_all_topics() == ["astreinte"]
+    with pytest.raises(ValueError, match="inconnue"):
+        load_knowledge_base("kubernetes", knowledge_dir=str(knowledge_dir))
+
+
+@pytest.mark.parametrize("name", ["/etc/passwd", "../secrets", "equipe/../../secrets", ".", "lien"])
+def test_names_leaving_the_knowledge_dir_are_rejected(knowledge_dir, name):
+    secrets = knowledge_dir.parent / "secrets.md"
+    secrets.write_text("# Secrets\n\n- mot de passe\n", encoding="utf-8")
+    (knowledge_dir / "lien.md").symlink_to(secrets)
+
+    with pytest.raises(ValueError, match="hors du répertoire"):
+        load_knowledge_base(name, knowledge_dir=str(knowledge_dir))
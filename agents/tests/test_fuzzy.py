@@ -0,0 +1,81 @@
+"""
+Tests de la recherche tolérante aux fautes de frappe (knowledge_base/fuzzy.py).
+"""
+
+import random
+
+from knowledge_base import fuzzy
+from knowledge_base.fuzzy import MAX_CANDIDATES, FuzzyIndex, bounded_distance
+
+
+def _distance(a, b):
+    # Référence : distance d'édition complète, transposition de deux lettres voisines comprise
+    rows = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            rows[i][j] = min(rows[i - 1][j] + 1, rows[i][j - 1] + 1, rows[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                rows[i][j] = min(rows[i][j], rows[i - 2][j - 2] + 1)
+    return rows[-1][-1]
+
+
+def _vocabulary(size, seed=7):
+    generator = random.Random(seed)
+    return ["".join(generator.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(generator.randint(5, 12)))
+            for _ in range(size)]
+
+
+def test_bounded_distance_matches_the_full_distance():
+    generator = random.Random(1)
+    for _ in range(3000):
+        a = "".join(generator.choice("abc") for _ in range(generator.randint(0, 7)))
+        b = "".join(generator.choice("abc") for _ in range(generator.randint(0, 7)))
+        limit = generator.randint(0, 3)
+        assert bounded_distance(a, b, limit) == min(_distance(a, b), limit + 1), (a, b, limit)
+
+
+def test_lookup_finds_the_closest_words():
+    index = FuzzyIndex(_vocabulary(20000) + ["kubernetes", "terraform", "prometheus"])
+    assert index.lookup("kubernets") == [("kubernetes", 1)]
+    assert index.lookup("kubrnetse") == [("kubernetes", 2)]
+    assert index.lookup("terafrom") == [("terraform", 2)]
+    assert index.correct("promthues") == "prometheus"
+    assert index.lookup("xyzzyplugh") == []
+
+
+def test_one_typo_lookups_agree_with_a_full_scan():
+    words = _vocabulary(3000)
+    index = FuzzyIndex(words)
+    generator = random.Random(2)
+    for _ in range(200):
+        word = generator.choice(words)
+        position = generator.randrange(len(word))
+        typo = word[:position] + generator.choice("abcdefghijklmnopqrstuvwxyz") + word[position + 1:]
+        if typo in index:
+            continue
+        expected = [(candidate, 1) for candidate in words if bounded_distance(typo, candidate, 1) == 1]
+        assert index.lookup(typo) == list(dict.fromkeys(expected)), typo
+
+
+def test_ties_follow_the_vocabulary_order():
+    assert FuzzyIndex(["clouds", "cloud", "clod"]).lookup("cluod") == [("cloud", 1), ("clod", 1)]
+    assert FuzzyIndex(["clod", "clouds", "cloud"]).lookup("cluod") == [("clod", 1), ("cloud", 1)]
+    assert FuzzyIndex(["deploys", "deploy"]).lookup("deplyo", 2) == [("deploy", 1)]
+    assert FuzzyIndex(["kubectl", "kubectx"]).lookup("kubectz") == [("kubectl", 1), ("kubectx", 1)]
+    assert FuzzyIndex(["kubectx", "kubectl"]).lookup("kubectz") == [("kubectx", 1), ("kubectl", 1)]
+
+
+def test_distance_checks_are_bounded(monkeypatch):
+    # Des milliers de mots partagent le suffixe du mot recherché
+    generator = random.Random(3)
+    words = ["".join(generator.choice("bcdfgklmnprstv") for _ in range(4)) + "ation" for _ in range(5000)]
+    index = FuzzyIndex(words + ["configuration"])
+    calls = []
+
+    def counting(a, b, limit):
+        calls.append(b)
+        return bounded_distance(a, b, limit)
+
+    monkeypatch.setattr(fuzzy, "bounded_distance", counting)
+    assert index.correct("confgiuraton") == "configuration"
+    assert len(calls) <= 2 * MAX_CANDIDATES
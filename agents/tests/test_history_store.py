@@ -0,0 +1,82 @@
+"""
+Tests de l'historique des conversations (history/store.py).
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+from history.store import HistoryStore
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _crash_after(path, statements):
+    # Écrit dans un autre processus, qui s'arrête brutalement sans fermer la base
+    code = "\n".join([
+        "import os, sys",
+        f"sys.path.insert(0, {AGENTS_DIR!r})",
+        "from history.store import HistoryStore",
+        f"store = HistoryStore({path!r})",
+        *statements,
+        "os._exit(0)",
+    ])
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_append_and_lookup(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite"))
+    for i in range(6):
+        store.append(1, "user" if i % 2 == 0 else "assistant", f"message {i}", channel="ops",
+                     timestamp=1000 + i)
+    store.append(1, "system", "rappel", channel="ops", timestamp=1006)
+    store.append(1, "user", "ailleurs", channel="dev", timestamp=1003.5, metadata={"author": "U42"})
+    store.append(2, "user", "autre agent", channel="ops", timestamp=1001)
+
+    assert [m["content"] for m in store.last(1, 2, channel="ops")] == ["message 5", "rappel"]
+    assert [m["content"] for m in store.last_exchanges(1, 1, channel="ops")] == ["message 4", "message 5"]
+    assert [m["content"] for m in store.range(1, 1002, 1004)] == ["message 2", "message 3", "ailleurs"]
+    dev, = store.last(1, 5, channel="dev")
+    assert dev["metadata"] == {"author": "U42"} and dev["timestamp"] == "1970-01-01T00:16:43.500Z"
+    assert store.count(1) == 8 and store.count(1, "ops") == 7
+    assert store.channels(1) == ["dev", "ops"]
+
+
+def test_invalid_batch_adds_nothing(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite"))
+    with pytest.raises(ValueError):
+        store.append_many([{"agent_id": 1, "role": "user", "content": "a"},
+                           {"agent_id": 1, "role": "bot", "content": "b"}])
+    assert store.count(1) == 0
+
+
+def test_recovery_after_truncated_write(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    _crash_after(path, [f"store.append(1, 'user', 'message {i}', timestamp={1000 + i})" for i in range(20)])
+    # Dernière écriture du journal WAL interrompue en cours de page
+    wal = path + "-wal"
+    with open(wal, "r+b") as f:
+        f.truncate(os.path.getsize(wal) - 100)
+
+    store = HistoryStore(path)
+
+    assert [m["content"] for m in store.range(1)] == [f"message {i}" for i in range(19)]
+    store.append(1, "assistant", "reprise", timestamp=2000)
+    assert store.last(1, 1)[0]["content"] == "reprise"
+    assert store.count(1) == 20
+
+
+def test_interrupted_transaction_is_rolled_back(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    _crash_after(path, [
+        "store.append(1, 'user', 'validé', timestamp=1000)",
+        "store._db.execute('BEGIN')",
+        "store._db.execute(\"INSERT INTO messages (agent_id, channel, role, content, ts) "
+        "VALUES ('1', '', 'user', 'perdu', 1001)\")",
+    ])
+
+    store = HistoryStore(path)
+
+    assert [m["content"] for m in store.range(1)] == ["validé"]
@@ -0,0 +1,63 @@
+"""
+Tests de l'extraction de mots-clés (models/keyword_matcher.py).
+"""
+
+import os
+import sys
+import subprocess
+
+from models.agent import DEFAULT_DEVOPS_KEYWORDS
+from models.keyword_matcher import KeywordMatcher
+
+
+def _matcher():
+    return KeywordMatcher(DEFAULT_DEVOPS_KEYWORDS)
+
+
+def test_inflected_words_match_like_the_substring_baseline():
+    matcher = _matcher()
+    assert matcher.extract("Our containers and pipelines") == ["container", "pipeline"]
+    assert matcher.extract("Two deployments failed") == ["deployment"]
+    assert matcher.extract("The Dockerfile does not build") == ["docker"]
+    assert matcher.extract("Migrating our GKE clouds") == ["cloud"]
+
+
+def test_match_covers_the_whole_word():
+    match, = _matcher().finditer("Les Dockerfiles du projet")
+    assert (match.keyword, match.start, match.end) == ("docker", 4, 15)
+
+
+def test_short_keywords_keep_word_boundaries():
+    matcher = _matcher()
+    assert matcher.extract("the laws of physics") == []
+    assert matcher.extract("an elkhound") == []
+    assert matcher.extract("AWS and two k8s clusters") == ["aws", "k8s"]
+    assert matcher.extract("ELKs") == ["elk"]
+
+
+def test_longest_keyword_wins():
+    matcher = KeywordMatcher(["github", "github actions"])
+    assert matcher.extract("Configurer GitHub Actions") == ["github actions"]
+
+
+def test_fuzzy_fallback_corrects_typos():
+    matcher = _matcher()
+    for typo, keyword in [("kubernets", "kubernetes"), ("terrafrom", "terraform"), ("promethus", "prometheus"),
+                          ("jenkisn", "jenkins"), ("dokcer", "docker"), ("odcker", "docker")]:
+        assert [match.keyword for match in matcher.fuzzy_finditer(f"Problème avec {typo}")] == [keyword]
+
+
+def test_fuzzy_fallback_ignores_ordinary_words():
+    matcher = _matcher()
+    for text in ["my file contains an error", "the contained blast", "the boat docked",
+                 "open the locker", "a rocker", "full employment", "Bonjour, comment allez-vous ?"]:
+        assert matcher.fuzzy_finditer(text) == [], text
+
+
+def test_fuzzy_fallback_when_run_from_the_models_directory():
+    # Comme "python models/agent.py" : seul models/ est dans le chemin d'import
+    models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+    code = "import keyword_matcher; " \
+           "print([m.keyword for m in keyword_matcher.KeywordMatcher(['kubernetes']).fuzzy_finditer('kubernets')])"
+    output = subprocess.run([sys.executable, "-c", code], cwd=models_dir, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "['kubernetes']"
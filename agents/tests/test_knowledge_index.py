@@ -0,0 +1,37 @@
+"""
+Tests des index de bases de connaissances (knowledge_base/index.py, knowledge_base/kbpack.py).
+"""
+
+import pytest
+
+from knowledge_base.devops_knowledge_data import DEVOPS_KNOWLEDGE
+from knowledge_base.index import KnowledgeIndex
+from knowledge_base.kbpack import PackedKnowledgeIndex, build_pack
+
+
+@pytest.fixture(scope="module")
+def indexes(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("kbpack") / "devops.kbpack")
+    build_pack(DEVOPS_KNOWLEDGE, path)
+    packed = PackedKnowledgeIndex(path)
+    yield KnowledgeIndex(DEVOPS_KNOWLEDGE), packed
+    packed.close()
+
+
+def test_typo_correction(indexes):
+    memory, packed = indexes
+    for index in indexes:
+        assert index.correct("kubernets") == "kubernetes"
+        assert index.correct("terrafrom") == "terraform"
+        assert index.correct("kubernetes") is None
+
+
+def test_pack_corrects_like_memory(indexes):
+    memory, packed = indexes
+    # Une lettre retirée de chaque terme : de nombreux candidats à égalité
+    queries = [term[:-2] + term[-1] for term in memory.terms() if len(term) >= 6]
+    assert queries
+    for query in queries:
+        assert packed.correct(query) == memory.correct(query), query
+    assert packed.correct("c_confi") == memory.correct("c_confi")
+    assert packed.rank("c_confi", 3) == memory.rank("c_confi", 3)
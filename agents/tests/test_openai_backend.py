@@ -0,0 +1,171 @@
+"""
+Tests du moteur compatible OpenAI (models/openai_backend.py) face au serveur
+factice models/llm_stub.py.
+"""
+
+import json
+import asyncio
+import threading
+
+import pytest
+
+from models import openai_backend
+from models.context import build_messages
+from models.llm_stub import StubServer
+from models.openai_backend import LLMError, OpenAICompatibleBackend
+
+CONTEXT = {"message": "Comment redémarrer un pod ?", "system_prompt": "Tu es un expert DevOps."}
+
+
+class _DroppingStub(StubServer):
+    """Serveur factice qui coupe la connexion au milieu des premières réponses en streaming."""
+
+    def __init__(self, drops=1, after_delta=True, **options):
+        super().__init__(**options)
+        self.drops = drops
+        self.after_delta = after_delta
+
+    async def _write_stream(self, writer, model, text):
+        if not self.drops:
+            return await super()._write_stream(writer, model, text)
+        self.drops -= 1
+        event = json.dumps({"choices": [{"index": 0, "delta": {"content": "partielle "}}]})
+        # Un événement complet, ou une ligne d'événement coupée avant sa fin
+        chunk = f"data: {event}\n\n".encode("utf-8") if self.after_delta else b"data: {"
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Transfer-Encoding: chunked\r\n\r\n" + f"{len(chunk):x}\r\n".encode("latin-1") + chunk + b"\r\n")
+        await writer.drain()
+        writer.transport.abort()
+
+
+@pytest.fixture
+def stub_factory():
+    """Démarre des serveurs factices dans une boucle asyncio dédiée, comme un serveur distant."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    servers = []
+
+    def start(stub_class=StubServer, **options):
+        stub = stub_class(**options)
+        server = asyncio.run_coroutine_threadsafe(stub.start("127.0.0.1", 0), loop).result()
+        servers.append(server)
+        return stub, server.sockets[0].getsockname()[1]
+
+    yield start
+
+    async def shutdown():
+        # Ferme aussi les connexions gardées ouvertes par le pool du moteur
+        for server in servers:
+            server.close()
+        handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+def _backend(port, **options):
+    settings = {"base_url": f"http://127.0.0.1:{port}/v1", "api_key": "test", "backoff": 0.01}
+    settings.update(options)
+    return OpenAICompatibleBackend.from_config(settings)
+
+
+def test_stream_yields_the_answer_in_pieces(stub_factory):
+    stub, port = stub_factory()
+    backend = _backend(port)
+
+    deltas = list(backend.stream(CONTEXT))
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == StubServer.answer(build_messages(CONTEXT))
+    assert backend.complete(CONTEXT) == "".join(deltas)
+
+
+def test_transient_failures_are_retried(stub_factory):
+    stub, port = stub_factory(fail_rate=0.5, fail_status=503, seed=4)
+    backend = _backend(port, max_retries=8)
+
+    answers = [backend.complete(CONTEXT) for _ in range(10)]
+
+    assert answers == [StubServer.answer(build_messages(CONTEXT))] * 10
+    stats = stub.stats()
+    assert stats["failures"] > 0
+    assert stats["requests"] == 10 + stats["failures"]
+
+
+def test_retries_are_bounded(stub_factory):
+    stub, port = stub_factory(fail_rate=1.0, fail_status=503)
+
+    with pytest.raises(LLMError) as error:
+        _backend(port, max_retries=2).complete(CONTEXT)
+
+    assert error.value.status == 503 and error.value.retryable
+    assert stub.stats()["requests"] == 3
+
+
+def test_client_errors_are_not_retried(stub_factory):
+    stub, port = stub_factory(fail_rate=1.0, fail_status=400)
+
+    with pytest.raises(LLMError) as error:
+        list(_backend(port, max_retries=2).stream(CONTEXT))
+
+    assert error.value.status == 400 and not error.value.retryable
+    assert stub.stats()["requests"] == 1
+
+
+def test_dropped_stream_raises_instead_of_truncating(stub_factory):
+    stub, port = stub_factory(_DroppingStub, drops=1, after_delta=True)
+    deltas = []
+
+    with pytest.raises(LLMError) as error:
+        for delta in _backend(port, max_retries=2).stream(CONTEXT):
+            deltas.append(delta)
+
+    # Un morceau déjà transmis ne peut pas être repris : l'erreur remonte au lieu d'une réponse tronquée
+    assert deltas == ["partielle "]
+    assert error.value.retryable
+    assert stub.stats()["requests"] == 1
+
+
+def test_stream_dropped_before_any_delta_is_retried(stub_factory):
+    stub, port = stub_factory(_DroppingStub, drops=1, after_delta=False)
+
+    deltas = list(_backend(port, max_retries=2).stream(CONTEXT))
+
+    assert "".join(deltas) == StubServer.answer(build_messages(CONTEXT))
+    assert stub.stats()["requests"] == 2
+
+
+def test_sequential_requests_reuse_one_connection(stub_factory):
+    stub, port = stub_factory()
+    backend = _backend(port)
+
+    for _ in range(5):
+        backend.complete(CONTEXT)
+        list(backend.stream(CONTEXT))
+
+    assert stub.stats()["requests"] == 10
+    assert stub.stats()["connections"] == 1
+
+
+def test_concurrent_requests_stay_under_the_in_flight_cap(stub_factory):
+    stub, port = stub_factory(latency=0.05)
+    backend = _backend(port)
+    count = 3 * openai_backend.MAX_IN_FLIGHT
+
+    async def burst():
+        return await asyncio.gather(*(backend.acomplete(CONTEXT) for _ in range(count)))
+
+    answers = asyncio.run(burst())
+
+    assert len(answers) == count
+    stats = stub.stats()
+    assert stats["requests"] == count
+    assert stats["max_in_flight"] == openai_backend.MAX_IN_FLIGHT
+    # Une connexion par requête simultanée au plus, réutilisées ensuite
+    assert stats["connections"] <= openai_backend.MAX_IN_FLIGHT
@@ -0,0 +1,107 @@
+"""
+Tests du registre des agents (models/registry.py) et de l'éviction en mode démon.
+"""
+
+import threading
+
+import agent_server
+from models.registry import AgentRegistry, agent_fingerprint
+
+
+class _Factory:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, agent_type, name, config):
+        self.calls.append((agent_type, name))
+        return object()
+
+
+def test_agents_are_shared_by_fingerprint():
+    factory = _Factory()
+    registry = AgentRegistry(factory)
+
+    first = registry.get("devops", "Nox", {"a": 1, "b": 2})
+
+    assert registry.get("DevOps", "Nox", {"b": 2, "a": 1}) is first
+    assert registry.get("devops", "Nox", {"a": 1}) is not first
+    assert agent_fingerprint("devops", "Nox", {"a": 1, "b": 2}) == agent_fingerprint("DEVOPS", "Nox", {"b": 2, "a": 1})
+    assert len(factory.calls) == 2
+    assert registry.stats()["created"] == 2 and registry.stats()["reused"] == 1
+
+
+def test_least_recently_used_agent_is_evicted():
+    registry = AgentRegistry(_Factory(), max_instances=2)
+    a = registry.get("devops", "A", {})
+    registry.get("devops", "B", {})
+    # A est réutilisé : B devient le moins récemment utilisé
+    registry.get("devops", "A", {})
+
+    registry.get("devops", "C", {})
+
+    assert len(registry) == 2 and registry.stats()["evicted"] == 1
+    assert registry.get("devops", "A", {}) is a
+    assert registry.stats()["created"] == 3
+    registry.get("devops", "B", {})
+    assert registry.stats()["created"] == 4
+
+
+def test_explicit_eviction():
+    registry = AgentRegistry(_Factory())
+    agent = registry.get("devops", "A", {"x": 1})
+
+    assert registry.evict("devops", "A", {"x": 1}) is True
+    assert registry.evict("devops", "A", {"x": 1}) is False
+    assert registry.get("devops", "A", {"x": 1}) is not agent
+
+
+def test_slow_build_does_not_block_other_lookups():
+    started, release = threading.Event(), threading.Event()
+
+    def factory(agent_type, name, config):
+        if name == "Lent":
+            started.set()
+            release.wait(10)
+        return object()
+
+    registry = AgentRegistry(factory)
+    cached = registry.get("devops", "Rapide", {})
+    builder = threading.Thread(target=registry.get, args=("devops", "Lent", {}))
+    builder.start()
+    try:
+        assert started.wait(10)
+        lookup = []
+        reader = threading.Thread(target=lambda: lookup.append(registry.get("devops", "Rapide", {})))
+        reader.start()
+        reader.join(2)
+        assert lookup == [cached]
+    finally:
+        release.set()
+        builder.join(10)
+    assert len(registry) == 2
+
+
+def test_concurrent_builds_share_one_instance():
+    barrier = threading.Barrier(4)
+
+    def factory(agent_type, name, config):
+        barrier.wait(10)
+        return object()
+
+    registry = AgentRegistry(factory)
+    agents = []
+    threads = [threading.Thread(target=lambda: agents.append(registry.get("devops", "A", {}))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert len(agents) == 4 and all(agent is agents[0] for agent in agents)
+    assert registry.stats()["created"] == 1 and registry.stats()["reused"] == 3
+
+
+def test_evict_op_resolves_the_default_agent():
+    assert "response" in agent_server.handle_request({"message": "Comment utiliser docker ?"})
+
+    assert agent_server.handle_request({"op": "evict"}) == {"evicted": True}
+    assert agent_server.handle_request({"op": "evict", "id": 7}) == {"evicted": False, "id": 7}
@@ -0,0 +1,98 @@
+"""
+Tests du cache persistant des réponses (models/response_cache.py).
+"""
+
+import os
+
+from knowledge_base.file_knowledge_base import FileKnowledgeBase
+from models.agent import DevOpsAgent
+from models.response_cache import ResponseCache, make_key, normalize_message
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_equivalent_messages_share_a_key():
+    assert normalize_message("Qui es tu ?") == normalize_message("qui es  tu")
+    assert make_key(normalize_message("Qui es tu ?"), "agent") == make_key("qui es tu", "agent")
+    assert make_key("a", "bc") != make_key("ab", "c")
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    clock = _Clock()
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttl=100, clock=clock)
+    cache.put("k", "réponse")
+
+    clock.now += 100
+    assert cache.get("k") == "réponse"
+    clock.now += 1
+    assert cache.get("k") is None
+
+    assert len(cache) == 0
+    assert cache.stats()["expirations"] == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_put_purges_expired_entries(tmp_path):
+    clock = _Clock()
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttl=100, clock=clock)
+    cache.put("ancienne", "a")
+    clock.now += 101
+    cache.put("récente", "b")
+
+    assert len(cache) == 1
+    assert cache.expirations == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    clock = _Clock()
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_entries=3, clock=clock)
+    for key in ("a", "b", "c"):
+        cache.put(key, key.upper())
+        clock.now += 1
+    assert cache.get("a") == "A"
+    clock.now += 1
+
+    cache.put("d", "D")
+
+    assert len(cache) == 3
+    assert cache.evictions == 1
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["A", "C", "D"]
+
+
+def test_entries_persist_in_the_database_file(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    writer = ResponseCache(path)
+    writer.put("k", "réponse")
+    writer.close()
+
+    assert ResponseCache(path).get("k") == "réponse"
+
+
+def test_knowledge_change_invalidates_answers(tmp_path):
+    knowledge_dir = tmp_path / "knowledge"
+    knowledge_dir.mkdir()
+    document = knowledge_dir / "docker.md"
+    document.write_text("# Docker\n\n## Commandes\n\n- docker build\n- docker run\n", encoding="utf-8")
+    agent = DevOpsAgent("Cache", {"response_cache": {"path": str(tmp_path / "responses.sqlite")}})
+    agent.add_knowledge_base(FileKnowledgeBase(str(knowledge_dir), check_interval=0))
+
+    before = agent.process_message("Quelles commandes docker ?")
+    assert agent.process_message("Quelles commandes docker ?") == before
+    assert agent.response_cache_stats()["hits"] == 1
+
+    document.write_text("# Docker\n\n## Commandes\n\n- docker build\n- docker run\n- docker compose\n",
+                        encoding="utf-8")
+    # Date de modification distincte même sur les systèmes de fichiers à faible résolution
+    stat = os.stat(document)
+    os.utime(document, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    after = agent.process_message("Quelles commandes docker ?")
+    assert "docker compose" in after and "docker compose" not in before
+    assert agent.response_cache_stats()["hits"] == 1
@@ -0,0 +1,89 @@
+"""
+Tests de l'index partagé entre processus (knowledge_base/shared_index.py).
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+from knowledge_base.shared_index import SharedIndex, publish_index, read_manifest
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _knowledge(tool):
+    return {tool: {"definition": f"{tool} est un outil de déploiement", "commandes": [f"{tool} apply"]}}
+
+
+def _topics(index, query):
+    return [passage["topic"] for passage in index.rank(query, 3)]
+
+
+def test_reader_opens_the_published_version(tmp_path):
+    reader = SharedIndex(str(tmp_path), "kb", check_interval=0)
+    assert reader.version is None and reader.index() is None
+
+    manifest = publish_index(_knowledge("helm"), str(tmp_path), "kb", b"\x01\x02", vectors=False)
+
+    assert manifest["version"] == 1 and read_manifest(str(tmp_path), "kb") == manifest
+    assert reader.version == 1 and reader.digest == "0102"
+    assert _topics(reader.index(), "déploiement") == ["helm"]
+
+
+def test_reader_switches_to_a_new_version(tmp_path):
+    directory = str(tmp_path)
+    publish_index(_knowledge("helm"), directory, "kb", vectors=False)
+    reader = SharedIndex(directory, "kb", check_interval=3600)
+    assert reader.version == 1
+
+    publish_index(_knowledge("argocd"), directory, "kb", vectors=False)
+
+    # Le manifeste n'est relu qu'après check_interval, ou sur demande
+    assert reader.version == 1
+    assert reader.refresh() is True
+    assert reader.version == 2 and _topics(reader.index(), "déploiement") == ["argocd"]
+    assert reader.stats()["switches"] == 1
+    assert reader.refresh() is False
+
+
+def test_old_version_stays_readable_while_new_ones_are_published(tmp_path):
+    directory = str(tmp_path)
+    publish_index(_knowledge("helm"), directory, "kb", vectors=False)
+    reader = SharedIndex(directory, "kb", check_interval=0)
+    # Requête en cours sur la version 1
+    old = reader.index()
+
+    publish_index(_knowledge("argocd"), directory, "kb", vectors=False)
+    publish_index(_knowledge("flux"), directory, "kb", vectors=False)
+
+    # Seules les versions N et N - 1 restent publiées
+    assert sorted(os.listdir(directory)) == ["kb-v2.kbpack", "kb-v3.kbpack", "kb.json"]
+    assert _topics(old, "déploiement") == ["helm"]
+    assert reader.version == 3 and _topics(reader.index(), "déploiement") == ["flux"]
+
+
+def test_publication_from_another_process(tmp_path):
+    directory = str(tmp_path)
+    reader = SharedIndex(directory, "devops", check_interval=0)
+
+    subprocess.run(
+        [sys.executable, "-m", "knowledge_base.shared_index", "publish", directory, "--no-vectors"],
+        cwd=AGENTS_DIR, check=True, capture_output=True
+    )
+
+    assert reader.version == 1
+    assert _topics(reader.index(), "kubernetes pod")
+
+
+def test_vectors_follow_the_published_version(tmp_path):
+    pytest.importorskip("numpy")
+    directory = str(tmp_path)
+    publish_index(_knowledge("helm"), directory, "kb")
+    reader = SharedIndex(directory, "kb", check_interval=0)
+    assert reader.vector_index().search("helm apply", 1)[0]["topic"] == "helm"
+
+    publish_index(_knowledge("argocd"), directory, "kb")
+
+    assert reader.vector_index().search("argocd apply", 1)[0]["topic"] == "argocd"
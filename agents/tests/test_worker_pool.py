@@ -0,0 +1,75 @@
+"""
+Tests du pool de processus de travail (worker_pool.py).
+"""
+
+import asyncio
+
+from models.llm_stub import StubServer
+from worker_pool import WorkerPool
+
+
+def _request(index, base_url):
+    return {
+        "id": index,
+        "agent_type": "devops",
+        "agent_name": "Pool",
+        "config": {"llm": {"backend": "openai", "base_url": base_url, "api_key": "test", "max_retries": 0}},
+        "message": f"Mon pod kubernetes {index} redémarre en boucle"
+    }
+
+
+def test_saturated_pool_does_not_kill_workers():
+    # 16 requêtes de 0,1 s pour 2 processus et un délai de 0,5 s : les dernières
+    # attendent plus longtemps que le délai, sans que les processus soient en cause
+    async def scenario():
+        stub = StubServer(latency=0.1)
+        server = await stub.start()
+        port = server.sockets[0].getsockname()[1]
+        base_url = f"http://127.0.0.1:{port}/v1"
+        pool = WorkerPool(2, "nox", timeout=0.5)
+        await pool.start()
+        try:
+            pids = [worker.process.pid for worker in pool._workers]
+            results = await asyncio.gather(*(pool.submit(_request(i, base_url)) for i in range(16)))
+            return results, pool.stats(), pids
+        finally:
+            await pool.close()
+            server.close()
+            await server.wait_closed()
+
+    results, stats, pids = asyncio.run(scenario())
+
+    assert sorted(result["id"] for result in results) == list(range(16))
+    answered = [result for result in results if "response" in result]
+    expired = [result for result in results if "error" in result]
+    assert len(answered) >= 8
+    assert all(result["error"].startswith("Délai d'attente dépassé") for result in expired)
+    assert stats["expired"] == len(expired)
+    assert stats["timeouts"] == 0
+    assert stats["restarts"] == 0
+    assert [worker["pid"] for worker in stats["workers"]] == pids
+    assert sum(worker["requests"] for worker in stats["workers"]) == len(answered)
+
+
+def test_request_timeout_counts_from_dispatch():
+    # Chaque requête dure 0,3 s et patiente derrière la précédente : seul le
+    # traitement compte dans le délai de 0,5 s
+    async def scenario():
+        stub = StubServer(latency=0.3)
+        server = await stub.start()
+        port = server.sockets[0].getsockname()[1]
+        base_url = f"http://127.0.0.1:{port}/v1"
+        pool = WorkerPool(1, "nox", timeout=0.5)
+        await pool.start()
+        try:
+            results = await asyncio.gather(*(pool.submit(_request(i, base_url)) for i in range(2)))
+            return results, pool.stats()
+        finally:
+            await pool.close()
+            server.close()
+            await server.wait_closed()
+
+    results, stats = asyncio.run(scenario())
+
+    assert all("response" in result for result in results)
+    assert stats["timeouts"] == 0 and stats["expired"] == 0 and stats["restarts"] == 0
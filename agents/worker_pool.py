@@ -0,0 +1,435 @@
+#!/usr/bin/env python
+"""
+Pool de processus de travail pour le mode démon d'agent_server.py (``--workers N``).
+
+La recherche, l'extraction des mots-clés et la préparation du contexte sont du
+calcul Python, limité à un cœur par processus par le GIL. Le pool répartit les
+requêtes entre N processus (un par cœur), chacun avec son propre registre
+d'agents :
+- les processus sont préchauffés au démarrage (agent par défaut créé et base de
+  connaissances indexée) avant de recevoir des requêtes ;
+- chaque processus traite une requête à la fois ; les requêtes en attente sont
+  placées dans une file bornée, et une requête qui la trouve pleine est refusée
+  immédiatement plutôt que d'allonger l'attente de toutes les autres ;
+- chaque requête a un délai maximal (``timeout`` de la requête, ou celui du
+  pool), compté à partir de sa transmission à un processus : au-delà, le
+  processus est arrêté et remplacé. Une requête restée en file d'attente plus
+  longtemps que ce délai reçoit une erreur sans être transmise, et le processus
+  qui la prend en charge passe à la suivante ;
+- un processus qui s'arrête anormalement est remplacé automatiquement ; la
+  requête en cours reçoit une erreur.
+
+Les mesures des messages (models.metrics) sont renvoyées au processus principal
+avec chaque réponse et agrégées dans son registre.
+
+Avec un répertoire d'index partagé (``shared_index``), les index des bases
+de connaissances déclarées (voir models.plugins) y sont publiés une fois au démarrage, par un processus dédié, puis
+projetés en mémoire par tous les processus de travail au lieu d'être construits
+par chacun (voir knowledge_base.shared_index). Une version publiée ensuite dans
+ce répertoire est prise en compte par les processus sans redémarrage.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import multiprocessing
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+DEFAULT_QUEUE_PER_WORKER = 8
+DEFAULT_TIMEOUT = 30.0
+# Délai maximal de démarrage et de préchauffage d'un processus
+STARTUP_TIMEOUT = 120.0
+
+logger = logging.getLogger("agent")
+
+
+class _MetricsForwarder:
+    """
+    Remplace le registre des mesures dans un processus de travail : les mesures
+    sont gardées jusqu'à l'envoi de la réponse, puis agrégées par le processus principal.
+    """
+
+    def __init__(self):
+        self.observations: List[Tuple[str, Any]] = []
+        self.errors = 0
+
+    def observe(self, agent: str, metrics: Any) -> None:
+        self.observations.append((agent, metrics))
+
+    def record_error(self) -> None:
+        self.errors += 1
+
+    def render(self) -> str:
+        return ""
+
+    def drain(self) -> Tuple[List[Tuple[str, Any]], int]:
+        drained = (self.observations, self.errors)
+        self.observations, self.errors = [], 0
+        return drained
+
+
+def _publish_main(directory: str) -> None:
+    """Publie les index partagés (processus dédié, dont la mémoire est rendue à la fin)."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from knowledge_base.loader import publish_shared_indexes
+    from models.plugins import get_plugin_registry
+
+    plugins = get_plugin_registry()
+    publish_shared_indexes(directory, {name: plugins.knowledge_base_module(name) for name in plugins.knowledge_bases()})
+
+
+def _worker_main(conn: Any, default_agent: str, max_agents: int, log_settings: Tuple[Any, ...],
+                 shared_index: Optional[str] = None) -> None:
+    """
+    Boucle d'un processus de travail : préchauffage, puis une requête à la fois.
+    Messages reçus : (type, requête) avec type "request", "stream" ou "broadcast".
+    Messages envoyés : ("ready", pid), ("item", objet) pour chaque morceau d'une
+    requête en streaming, puis ("result", objet ou None, mesures).
+    """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if shared_index:
+        os.environ["JAMONO_SHARED_INDEX"] = shared_index
+    import agent_server
+    from models.logs import configure_logging
+
+    configure_logging(*log_settings)
+    agent_server._max_agents = max_agents
+    forwarder = _MetricsForwarder()
+    agent_server._metrics_registry = forwarder
+
+    # Préchauffage : agent par défaut et index de sa base de connaissances
+    agent = agent_server.get_agent(None, None, {}, default_agent)
+    agent.search_knowledge("kubernetes")
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            kind, request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if kind == "stream":
+            for item in agent_server.handle_request_stream(request, default_agent):
+                conn.send(("item", item))
+            conn.send(("result", None, forwarder.drain()))
+        else:
+            result = agent_server.handle_request(request, default_agent)
+            conn.send(("result", result, forwarder.drain()))
+
+
+class WorkerCrashed(Exception):
+    """Le processus de travail s'est arrêté pendant le traitement d'une requête."""
+
+
+class _Worker:
+    """Processus de travail et extrémité locale de son canal."""
+
+    def __init__(self, process: Any, conn: Any):
+        self.process = process
+        self.conn = conn
+        self.requests = 0
+
+    async def recv(self, deadline: Optional[float]) -> Any:
+        """
+        Attend le prochain message du processus, sans bloquer la boucle asyncio.
+
+        Raises:
+            asyncio.TimeoutError: Si le délai est dépassé
+            WorkerCrashed: Si le processus s'est arrêté
+        """
+        loop = asyncio.get_running_loop()
+        if not self.conn.poll():
+            readable = loop.create_future()
+            fd = self.conn.fileno()
+            loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+            try:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                await asyncio.wait_for(readable, timeout)
+            finally:
+                loop.remove_reader(fd)
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise WorkerCrashed(str(e) or "canal fermé")
+
+    def kill(self) -> None:
+        """Arrête le processus."""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Pool de processus préchauffés, piloté depuis la boucle asyncio du mode démon.
+    """
+
+    def __init__(self, size: int, default_agent: str, max_agents: int = 32,
+                 queue_size: Optional[int] = None, timeout: float = DEFAULT_TIMEOUT,
+                 log_settings: Tuple[Any, ...] = (), registry: Any = None,
+                 shared_index: Optional[str] = None):
+        """
+        Prépare le pool (les processus sont lancés par start()).
+
+        Args:
+            size (int): Nombre de processus (nombre de cœurs en général)
+            default_agent (str): Agent par défaut des requêtes sans type
+            max_agents (int): Nombre maximal d'agents gardés par processus
+            queue_size (Optional[int]): Nombre maximal de requêtes en attente
+                                        (DEFAULT_QUEUE_PER_WORKER par processus par défaut)
+            timeout (float): Délai maximal par requête, en secondes
+            log_settings (Tuple[Any, ...]): Arguments de configure_logging pour les processus
+            registry (Any): Registre où agréger les mesures (MetricsRegistry), ou None
+            shared_index (Optional[str]): Répertoire des index partagés entre les
+                                          processus, ou None (index propre à chacun)
+        """
+        self.size = size
+        self.default_agent = default_agent
+        self.max_agents = max_agents
+        self.queue_size = queue_size or size * DEFAULT_QUEUE_PER_WORKER
+        self.timeout = timeout
+        self.log_settings = log_settings
+        self.registry = registry
+        self.shared_index = shared_index
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[Optional[_Worker]] = [None] * size
+        self._jobs: Optional[asyncio.Queue] = None
+        self._slots: List[asyncio.Task] = []
+        # Un verrou par processus : un seul échange à la fois sur chaque canal
+        self._locks: List[asyncio.Lock] = []
+        self.busy = 0
+        self.restarts = 0
+        self.timeouts = 0
+        self.expired = 0
+        self.rejected = 0
+
+    async def start(self) -> None:
+        """Publie les index partagés, puis lance et préchauffe les processus, en parallèle."""
+        if self.shared_index:
+            await asyncio.get_running_loop().run_in_executor(None, self._publish_shared)
+        self._jobs = asyncio.Queue(maxsize=self.queue_size)
+        self._locks = [asyncio.Lock() for _ in range(self.size)]
+        await asyncio.gather(*(self._spawn(i) for i in range(self.size)))
+        self._slots = [asyncio.create_task(self._run_slot(i)) for i in range(self.size)]
+
+    def _publish_shared(self) -> None:
+        process = self._context.Process(target=_publish_main, args=(self.shared_index,),
+                                        name="agent-index-publisher", daemon=True)
+        process.start()
+        process.join(STARTUP_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        if process.exitcode != 0:
+            raise RuntimeError(f"Publication des index partagés impossible dans {self.shared_index}")
+
+    async def _spawn(self, index: int) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.default_agent, self.max_agents, self.log_settings, self.shared_index),
+            name=f"agent-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        try:
+            message = await worker.recv(time.monotonic() + STARTUP_TIMEOUT)
+        except (asyncio.TimeoutError, WorkerCrashed):
+            worker.kill()
+            raise RuntimeError(f"Le processus de travail {index} n'a pas pu démarrer")
+        if message[0] != "ready":
+            worker.kill()
+            raise RuntimeError(f"Réponse inattendue du processus de travail {index}: {message!r}")
+        self._workers[index] = worker
+        return worker
+
+    async def _restart(self, index: int) -> None:
+        worker = self._workers[index]
+        if worker is not None:
+            worker.kill()
+        self._workers[index] = None
+        self.restarts += 1
+        while True:
+            try:
+                await self._spawn(index)
+                return
+            except RuntimeError as e:
+                logger.warning("%s, nouvel essai dans 1 s", e)
+                await asyncio.sleep(1.0)
+
+    async def _run_slot(self, index: int) -> None:
+        while True:
+            kind, request, timeout, queued_at, items = await self._jobs.get()
+            if time.monotonic() - queued_at >= timeout:
+                # Délai écoulé dans la file : le client n'attend plus la réponse
+                self.expired += 1
+                items.put_nowait(_envelope(request, {"error": "Délai d'attente dépassé, serveur saturé"}))
+                items.put_nowait(None)
+                continue
+            self.busy += 1
+            try:
+                async with self._locks[index]:
+                    await self._execute(index, kind, request, timeout, items)
+            finally:
+                self.busy -= 1
+                items.put_nowait(None)
+
+    async def _execute(self, index: int, kind: str, request: Dict[str, Any], timeout: float,
+                       items: asyncio.Queue) -> None:
+        """
+        Transmet une requête à un processus et relaie ses réponses vers ``items``
+        (le délai ``timeout`` court à partir de la transmission).
+        """
+        worker = self._workers[index]
+        try:
+            worker.conn.send((kind, request))
+        except (OSError, ValueError):
+            # Processus arrêté pendant qu'il attendait : la requête n'a pas été
+            # traitée et peut être confiée au remplaçant
+            await self._restart(index)
+            worker = self._workers[index]
+            worker.conn.send((kind, request))
+
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                message = await worker.recv(deadline)
+                if message[0] == "item":
+                    items.put_nowait(message[1])
+                    continue
+                _, result, (observations, errors) = message
+                self._record(observations, errors)
+                if result is not None:
+                    items.put_nowait(result)
+                worker.requests += 1
+                return
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            items.put_nowait(_envelope(request, {"error": "Délai de traitement dépassé"}))
+            await self._restart(index)
+        except WorkerCrashed:
+            items.put_nowait(_envelope(request, {"error": "Le processus de travail s'est arrêté pendant le traitement"}))
+            await self._restart(index)
+
+    def _record(self, observations: List[Tuple[str, Any]], errors: int) -> None:
+        if self.registry is None:
+            return
+        for agent, metrics in observations:
+            self.registry.observe(agent, metrics)
+        for _ in range(errors):
+            self.registry.record_error()
+
+    def _enqueue(self, kind: str, request: Dict[str, Any]) -> Optional[asyncio.Queue]:
+        timeout = request.get("timeout", self.timeout) if isinstance(request, dict) else self.timeout
+        try:
+            timeout = float(timeout)
+        except (TypeError, ValueError):
+            timeout = self.timeout
+        items: asyncio.Queue = asyncio.Queue()
+        try:
+            self._jobs.put_nowait((kind, request, timeout, time.monotonic(), items))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return None
+        return items
+
+    async def submit(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Traite une requête dans un processus de travail.
+
+        Args:
+            request (Dict[str, Any]): Requête du mode démon
+
+        Returns:
+            Dict[str, Any]: Enveloppe de réponse (comme handle_request)
+        """
+        items = self._enqueue("request", request)
+        if items is None:
+            return _envelope(request, {"error": "Serveur saturé, réessayez plus tard"})
+        result = await items.get()
+        while await items.get() is not None:
+            pass
+        return result
+
+    async def stream(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Traite une requête en streaming dans un processus de travail.
+
+        Args:
+            request (Dict[str, Any]): Requête du mode démon
+
+        Yields:
+            Dict[str, Any]: Objets à écrire (comme handle_request_stream)
+        """
+        items = self._enqueue("stream", request)
+        if items is None:
+            yield _envelope(request, {"error": "Serveur saturé, réessayez plus tard"})
+            return
+        while True:
+            item = await items.get()
+            if item is None:
+                return
+            yield item
+
+    async def broadcast(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Transmet une requête à tous les processus (éviction d'un agent par
+        exemple), après les requêtes déjà en cours sur chacun.
+
+        Args:
+            request (Dict[str, Any]): Requête du mode démon
+
+        Returns:
+            List[Dict[str, Any]]: Réponse de chaque processus
+        """
+        results = []
+        for index in range(self.size):
+            items: asyncio.Queue = asyncio.Queue()
+            # Hors file d'attente : exécuté par le processus dès qu'il est libre
+            async with self._locks[index]:
+                await self._execute(index, "broadcast", request, self.timeout, items)
+            results.append(items.get_nowait() if not items.empty() else {})
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne l'état du pool.
+
+        Returns:
+            Dict[str, Any]: Processus, requêtes en attente et en cours, redémarrages,
+                            délais dépassés (en traitement et en file d'attente),
+                            requêtes refusées et répertoire des index partagés
+        """
+        return {
+            "workers": [
+                {"pid": worker.process.pid, "requests": worker.requests} if worker is not None else None
+                for worker in self._workers
+            ],
+            "queued": self._jobs.qsize() if self._jobs is not None else 0,
+            "queue_size": self.queue_size,
+            "busy": self.busy,
+            "restarts": self.restarts,
+            "timeouts": self.timeouts,
+            "expired": self.expired,
+            "rejected": self.rejected,
+            "shared_index": self.shared_index
+        }
+
+    async def close(self) -> None:
+        """Arrête les processus."""
+        for slot in self._slots:
+            slot.cancel()
+        await asyncio.gather(*self._slots, return_exceptions=True)
+        for worker in self._workers:
+            if worker is not None:
+                worker.kill()
+
+
+def _envelope(request: Any, result: Dict[str, Any]) -> Dict[str, Any]:
+    if isinstance(request, dict) and "id" in request:
+        result["id"] = request["id"]
+    return result
@@ -3,7 +3,7 @@
  * Ce module gère la communication entre le serveur Node.js et les scripts Python
  */
 
-import { spawn } from 'child_process';
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
 import path from 'path';
 import { Agent } from '../shared/schema';
 
@@ -12,6 +12,41 @@ interface AgentResponse {
   error?: string;
 }
 
+/**
+ * Lance le script Python de l'agent pour un message
+ * @param agent L'agent qui va traiter le message
+ * @param message Le message à traiter
+ * @param extraArgs Options supplémentaires pour agent_server.py (ex. --stream)
+ * @returns Le processus Python lancé
+ */
+function spawnAgentProcess(
+  agent: Agent,
+  message: string,
+  extraArgs: string[] = []
+): ChildProcessWithoutNullStreams {
+  // Chemin vers le script Python
+  const scriptPath = path.join(process.cwd(), 'agents', 'agent_server.py');
+  
+  // Configuration en JSON pour l'agent
+  const agentConfig = {
+    system_prompt: agent.systemPrompt,
+    name: agent.name,
+    skills: agent.skills,
+    bio: agent.bio
+  };
+  
+  // Arguments pour le script Python
+  const args = [
+    '--agent-type', 'devops', // Pour l'instant on suppose que c'est un agent DevOps
+    '--agent-name', agent.name,
+    '--config', JSON.stringify(agentConfig),
+    '--message', message,
+    ...extraArgs
+  ];
+  
+  return spawn('python3', [scriptPath, ...args]);
+}
+
 /**
  * Exécute le script Python de l'agent et traite un message
  * @param agent L'agent qui va traiter le message
@@ -20,27 +55,8 @@ interface AgentResponse {
  */
 export async function processAgentMessage(agent: Agent, message: string): Promise<string> {
   return new Promise((resolve, reject) => {
-    // Chemin vers le script Python
-    const scriptPath = path.join(process.cwd(), 'agents', 'agent_server.py');
-    
-    // Configuration en JSON pour l'agent
-    const agentConfig = {
-      system_prompt: agent.systemPrompt,
-      name: agent.name,
-      skills: agent.skills,
-      bio: agent.bio
-    };
-    
-    // Arguments pour le script Python
-    const args = [
-      '--agent-type', 'devops', // Pour l'instant on suppose que c'est un agent DevOps
-      '--agent-name', agent.name,
-      '--config', JSON.stringify(agentConfig),
-      '--message', message
-    ];
-    
     // Exécution du script Python
-    const pythonProcess = spawn('python3', [scriptPath, ...args]);
+    const pythonProcess = spawnAgentProcess(agent, message);
     
     let responseData = '';
     let errorData = '';
@@ -86,6 +102,86 @@ export async function processAgentMessage(agent: Agent, message: string): Promis
   });
 }
 
+interface AgentStreamEvent {
+  delta?: string;
+  done?: boolean;
+  error?: string;
+}
+
+/**
+ * Exécute le script Python de l'agent en mode streaming (--stream)
+ * @param agent L'agent qui va traiter le message
+ * @param message Le message à traiter
+ * @param onDelta Appelé pour chaque morceau de la réponse, dès sa réception
+ * @returns La réponse complète de l'agent
+ */
+export async function streamAgentMessage(
+  agent: Agent,
+  message: string,
+  onDelta: (delta: string) => void
+): Promise<string> {
+  return new Promise((resolve, reject) => {
+    const pythonProcess = spawnAgentProcess(agent, message, ['--stream']);
+    
+    let buffer = '';
+    let response = '';
+    let done = false;
+    let streamError: string | null = null;
+    let errorData = '';
+    
+    // Une ligne JSON par événement : {"delta": ...}, puis {"done": true} ou {"error": ...}
+    const handleLine = (line: string) => {
+      if (!line.trim()) {
+        return;
+      }
+      let event: AgentStreamEvent;
+      try {
+        event = JSON.parse(line);
+      } catch {
+        // Ligne qui n'est pas un événement (journalisation par exemple)
+        return;
+      }
+      if (typeof event.delta === 'string') {
+        response += event.delta;
+        onDelta(event.delta);
+      } else if (event.error) {
+        streamError = event.error;
+      } else if (event.done) {
+        done = true;
+      }
+    };
+    
+    pythonProcess.stdout.on('data', (data) => {
+      buffer += data.toString();
+      const lines = buffer.split('\n');
+      buffer = lines.pop() ?? '';
+      lines.forEach(handleLine);
+    });
+    
+    pythonProcess.stderr.on('data', (data) => {
+      errorData += data.toString();
+      console.error(`Erreur Python: ${data}`);
+    });
+    
+    pythonProcess.on('close', (code) => {
+      handleLine(buffer);
+      if (streamError) {
+        return reject(new Error(streamError));
+      }
+      if (code !== 0 || !done) {
+        console.error(`Le script Python s'est terminé avec le code ${code}`);
+        return reject(new Error(`Erreur lors de l'exécution du script Python: ${errorData}`));
+      }
+      resolve(response);
+    });
+    
+    pythonProcess.on('error', (err) => {
+      console.error('Erreur lors du lancement du script Python:', err);
+      reject(err);
+    });
+  });
+}
+
 /**
  * Vérifie que l'environnement Python est correctement configuré
  * @returns True si Python est disponible, false sinon
@@ -3,7 +3,7 @@ import { createServer, type Server } from "http";
 import { storage } from "./storage";
 import { z } from "zod";
 import OpenAI from "openai";
-import { processAgentMessage, checkPythonEnvironment, initializePythonAgents } from "./python_agent";
+import { streamAgentMessage, checkPythonEnvironment, initializePythonAgents } from "./python_agent";
 import { setupSlackRoutes } from "./slack";
 import { setupSlackEvents } from "./slack-events";
 import { agentOrchestrator } from "./orchestrator";
@@ -649,15 +649,20 @@ export async function registerRoutes(app: Express): Promise<Server> {
         
         const messageWithContext = contextForPython + lastUserMessage;
         
-        // Process the message using Python agent
-        const response = await processAgentMessage(agent!, messageWithContext);
+        // Stream the Python agent's answer as it is produced, like the OpenAI path
+        const response = await streamAgentMessage(agent!, messageWithContext, (delta) => {
+          if (!res.headersSent) {
+            res.setHeader('Content-Type', 'text/event-stream');
+            res.setHeader('Cache-Control', 'no-cache');
+            res.setHeader('Connection', 'keep-alive');
+          }
+          res.write(delta);
+        });
         
         // Save the conversation exchange to history
         await conversationHistoryManager.saveExchange(agentId, lastUserMessage, response);
         
-        // Set appropriate headers for response
-        res.setHeader('Content-Type', 'text/plain');
-        res.send(response);
+        res.end();
       };
 
       // Check if Python agents are available
@@ -665,9 +670,15 @@ export async function registerRoutes(app: Express): Promise<Server> {
         try {
           await usePythonAgent();
         } catch (error) {
-          console.error("Error with Python agent, falling back to OpenAI:", error);
-          // If Python agent fails, fall back to OpenAI
-          await useOpenAI();
+          if (res.headersSent) {
+            // Part of the answer was already streamed: it cannot be replaced
+            console.error("Error with Python agent after streaming started:", error);
+            res.end();
+          } else {
+            console.error("Error with Python agent, falling back to OpenAI:", error);
+            // If Python agent fails, fall back to OpenAI
+            await useOpenAI();
+          }
         }
       } else {
         // Use OpenAI directly if Python agents are not available